@@ -1,4 +1,5 @@
 import argparse
+import copy
 import csv
 import datetime
 import json
@@ -6,16 +7,28 @@ import logging
 import os
 import secrets
 from collections import OrderedDict, defaultdict, deque
-from functools import lru_cache
+from functools import lru_cache, partial
 
 from bs4 import BeautifulSoup
 
+from wta_scrapper.archive import PageReference
+from wta_scrapper.blocks import find_blocks, map_blocks, read_block
+from wta_scrapper.dedup import Deduplicator
+from wta_scrapper.memory import MemoryLimitExceeded, MemoryTracker
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.metrics import metrics as default_metrics
+from wta_scrapper.metrics import timed
 from wta_scrapper.mixins import Mixins
 from wta_scrapper.models import Query
+from wta_scrapper.pool import StringPool
 from wta_scrapper.score import Score
-from wta_scrapper.utils import BASE_DIR, autodiscover
+from wta_scrapper.spec import find_first
+from wta_scrapper.tracing import get_span, traced
+from wta_scrapper.utils import (BASE_DIR, DateRange, autodiscover, get_owner_key,
+                                split_results)
 
 
+@lru_cache(maxsize=None)
 def init_logger(name):
     logger = logging.Logger(name)
 
@@ -29,25 +42,135 @@ def init_logger(name):
     return logger
 
 
+def _get_span_tournament(values):
+    """
+    Return the name of the tournament of the values
+    returned by the parsing methods as span attributes. The
+    footer returns the ranking alone when it is called without
+    a tournament in which case there is no name to return
+    """
+    if not isinstance(values, dict) or not values:
+        return {}
+
+    name, details = list(values.items())[-1]
+    if not isinstance(details, dict):
+        return {}
+    return {'tournament': name}
+
+
 class MatchScrapper(Mixins):
-    def __init__(self, filename=None):
+    """
+    Parameters
+    ----------
+
+    - `filename` name of the HTML file to parse in the html folder or
+    a `PageReference` to a page stored in a `PageArchive`
+
+    - `stats` an optional `CareerStats` instance that gets updated with the
+    tournaments each time `build` or `loads` is called. The values built
+    without `player_name` are not added and a warning is logged
+
+    - `metrics` the `Metrics` instance in which the time spent in each stage
+    is recorded. Defaults to the instance shared by the process
+
+    - `workers` parse the tournaments of the page in parallel using this number
+    of processes. The page is memory mapped and only the tournament blocks are
+    parsed, which means that `soup` is not available in this mode
+
+    - `executor` an optional executor to use for the parallel mode
+
+    - `tracer` an optional `Tracer` that records the spans of each stage
+    if the page is sampled
+
+    - `plan` an optional `ParsePlan` compiled from a declarative spec of the
+    page. The tournaments are then located and parsed with the rules of the
+    spec instead of the criteria passed to `build`
+
+    - `string_pool` the `StringPool` used to intern the values that repeat across
+    matches. Defaults to a pool owned by the scrapper which is released with it.
+    Pass the same pool to scrappers whose results are kept together
+
+    - `low_memory` release each tournament of the parse tree once it was parsed
+    and the whole tree after `build` which means that `soup` is None afterwards
+
+    - `memory_limit` maximum number of bytes that the page can use. `build` raises
+    `MemoryLimitExceeded` above it. The memory used by the page is measured with
+    tracemalloc and given in `memory_report` when either option is used. The tree
+    read when the scrapper is created counts towards the limit but the limit is only
+    checked by `build`, before each tournament, which means that a page is always
+    read entirely. The measure stops at the end of `build` or with `close` for a
+    scrapper that is not built
+    """
+    def __init__(self, filename=None, stats=None, metrics=None,
+                 workers=None, executor=None, tracer=None, plan=None,
+                 low_memory=False, memory_limit=None, string_pool=None):
         self.explorer = autodiscover()
+        self.string_pool = string_pool if string_pool is not None else StringPool()
+        self.plan = plan
+        self.low_memory = low_memory
+        self.memory_report = None
+        self.stats = stats
+        self.metrics = metrics if metrics is not None else default_metrics
+        self.workers = workers
+        self.executor = executor
+        self.path = None
+
+        self.trace = None
+        if tracer is not None:
+            self.trace = tracer.start_trace('page', filename=filename)
 
         self.logger = init_logger(self.__class__.__name__)
 
-        if filename is not None:
-            with open(self.explorer(filename=filename), 'r') as _file:
-                soup = BeautifulSoup(_file, 'html.parser')
+        # Started before reading the page so
+        # that the tree is part of the measure
+        self.memory = None
+        if low_memory or memory_limit is not None:
+            self.memory = MemoryTracker(limit=memory_limit)
+            self.memory.start()
 
-            self.soup = soup
+        try:
+            self._read(filename)
+        except BaseException:
+            # Otherwise tracemalloc would keep tracing the
+            # process since there is no scrapper to build
+            self.close()
+            raise
         self.tournaments = []
 
     def __enter__(self):
         return self.tournaments
 
     def __exit__(self, type, value, traceback):
+        self.close()
         return False
 
+    def _read(self, filename):
+        is_reference = isinstance(filename, PageReference)
+        if filename is not None and (self.workers is not None or self.executor is not None):
+            if is_reference:
+                raise ValueError('Pages from an archive cannot be parsed in parallel')
+            self.path = self.explorer(filename=filename)
+            self.metrics.increment('pages')
+        elif filename is not None:
+            with self.metrics.time('read'), get_span(self, 'read'):
+                if is_reference:
+                    soup = BeautifulSoup(filename.read(), 'html.parser')
+                else:
+                    with open(self.explorer(filename=filename), 'r') as _file:
+                        soup = BeautifulSoup(_file, 'html.parser')
+
+            self.soup = soup
+            self.metrics.increment('pages')
+
+    def close(self):
+        """
+        Stop measuring the memory of the page when the scrapper
+        was created with `low_memory` or `memory_limit`. This is
+        done by `build` and is only needed when it is not called
+        """
+        if self.memory is not None and self.memory_report is None:
+            self.memory_report = self.memory.stop()
+
     def __getitem__(self, index):
         return self.tournaments[0][index]
 
@@ -55,9 +178,11 @@ class MatchScrapper(Mixins):
         keys = list(self.tournaments.keys())
         return value in keys
 
+    @timed('build')
+    @traced('build', attributes=lambda self, values: {'tournaments': max(self.number_of_tournaments - 1, 0)})
     def build(self, f, player_name=None, 
               year=None, date_as_string=True, 
-              map_to_keys: dict = {}, **kwargs):
+              map_to_keys: dict = {}, since=None, until=None, **kwargs):
         """
         Main entrypoint for creating a new matches JSON file
 
@@ -71,7 +196,12 @@ class MatchScrapper(Mixins):
         
         - `player_name` name of the player to appear in the final returned value
         
-        - `year` you can provide an explicity year to use for the returned values
+        - `year` you can provide an explicity year to use for the returned values. Only the
+        tournaments of that year are parsed
+        
+        - `since` and `until` only parse the tournaments that end within these dates
+        e.g. since='2021-01-01'. The page goes from the most recent to the oldest tournament
+        which is why the parsing stops at the first tournament that ended before `since`
             
         - `date_as_string` indicates whether the final date should be a string
 
@@ -92,57 +222,200 @@ class MatchScrapper(Mixins):
         change in the future.
 
         """
-        divs = self.soup.find_all('div')
-
         self.logger.info('Started.')
+        date_range = None
+        if since is not None or until is not None or year is not None:
+            date_range = DateRange(since=since, until=until, year=year)
 
-        content = self._filter(divs, f)
-        if content:
-            base = None
-            for element in content:
-                header = element.find_next('div')
-                if header is not None:
-                    if not header.is_empty_element:
-                        attrs = header.get_attribute_list('class')[0]
-                        if 'header' in attrs:
-                            base = self._parse_tournament_header(header)
-
-                    if base is not None:
-                        # Construct the matches
-                        table = element.find('table')
-                        if not table.is_empty_element and table is not None:
-                            updated_tournament = self._parse_matches(
-                                table.find('tbody').find_all('tr'),
-                                using=base
-                            )
-                        else:
-                            updated_tournament = base
-
-                        # Finally, integrate the footer
-                        divs = header.parent.select('div')
-                        footer = self._filter(divs, 'footer')
-                        if footer:
-                            updated_tournament = self._parse_footer(footer[-1], using=updated_tournament)
-
-                        self.tournaments.append(updated_tournament)
-                        # IMPORTANT: Reset the base in order to
-                        # prevent the app from appending content
-                        # to self.tournaments on each iteration
-                        base = None
-
-
-            self._finalize(
-                player_name=player_name, 
-                year=year, 
+        try:
+            self._build(
+                f,
+                date_range=date_range,
+                player_name=player_name,
+                year=year,
                 date_as_string=date_as_string,
                 map_to_keys=map_to_keys,
                 **kwargs
             )
+        except MemoryLimitExceeded:
+            self.metrics.increment('memory_limit_exceeded')
+            raise
+        finally:
+            if self.memory is not None:
+                self.memory_report = self.memory.stop()
+                self.logger.info(f"Peak memory of the page: {self.memory_report['peak']} bytes")
+        return self.tournaments
+
+    def _build(self, f, date_range=None, **kwargs):
+        if self.path is not None:
+            # With a plan, the blocks are the tournaments of its spec
+            criteria = f if self.plan is None else self.plan.get_block_class()
+            with self.metrics.time('read'):
+                content = find_blocks(self.path, criteria=criteria)
+        elif getattr(self, 'soup', None) is None:
+            raise ValueError('There is no page to parse or it was released in low memory mode')
+        elif self.plan is not None:
+            content = self.plan.find_tournaments(self.soup)
+        else:
+            divs = self.soup.find_all('div')
+            content = self._filter(divs, f)
+
+        if content:
+            if self.path is not None:
+                self._build_in_parallel(content, date_range=date_range)
+            else:
+                self._build_serially(content, date_range=date_range)
+
+            self._finalize(**kwargs)
+            self._update_stats(self.tournaments)
+
+            if self.low_memory and self.path is None:
+                self.soup.decompose()
+                self.soup = None
         else:
             message = f'Could not find any matching tag in HTML page using the following criteria: {f}'
             self.logger.info(message)
             print(message)
-        return self.tournaments
+            self.metrics.increment('empty_pages')
+
+    def _build_serially(self, content, date_range=None):
+        for element in content:
+            # In low memory mode, the elements that are within
+            # a tournament that was parsed are already released
+            if self.low_memory and element.decomposed:
+                continue
+
+            try:
+                tournament = self._build_tournament(element, date_range=date_range)
+            except Exception:
+                self.metrics.increment('parse_failures')
+                raise
+
+            if tournament is not None:
+                self.tournaments.append(tournament)
+
+            if self.low_memory:
+                element.decompose()
+
+            if self.memory is not None:
+                self.memory.check()
+
+            if date_range is not None and date_range.passed:
+                self.logger.info('Reached the tournaments before the requested dates')
+                break
+
+    def _build_tournament(self, element, date_range=None):
+        """
+        Parse the header, the matches and the footer
+        of a single tournament block of the page
+
+        Result
+        ------
+
+        Returns the tournament or None if the block has no header
+        or if the tournament is not within the date range
+        """
+        if self.plan is not None:
+            return self.plan.parse_tournament(element, self, date_range=date_range)
+
+        base = None
+        header = element.find_next('div')
+        if header is not None:
+            if not header.is_empty_element:
+                attrs = header.get_attribute_list('class')[0]
+                if 'header' in attrs:
+                    base = self._parse_tournament_header(header)
+
+            if base is not None and not self._is_in_range(base, date_range):
+                return None
+
+            if base is not None:
+                # Construct the matches
+                table = element.find('table')
+                if not table.is_empty_element and table is not None:
+                    updated_tournament = self._parse_matches(
+                        table.find('tbody').find_all('tr'),
+                        using=base
+                    )
+                else:
+                    updated_tournament = base
+
+                # Finally, integrate the footer
+                divs = header.parent.select('div')
+                footer = self._filter(divs, 'footer')
+                if footer:
+                    updated_tournament = self._parse_footer(footer[-1], using=updated_tournament)
+                return updated_tournament
+        return None
+
+    def _update_stats(self, values):
+        """
+        Add the values to the statistics if the scrapper has
+        some. The statistics are those of a player which is why
+        they are not updated for values without one
+        """
+        if self.stats is None:
+            return
+
+        _, metadata = split_results(values)
+        if get_owner_key(metadata) is None:
+            self.logger.warning(
+                'The statistics were not updated because the values '
+                'have no player. Pass player_name to build'
+            )
+            return
+        self.stats.add(values)
+
+    def _is_in_range(self, tournament, date_range):
+        """
+        Check the date of the header of a tournament before
+        its matches are parsed
+        """
+        if date_range is None:
+            return True
+
+        details = tournament[list(tournament.keys())[-1]]
+        date = details.get('date')
+        if date_range.accepts(self._parse_date(date) if date else None):
+            return True
+
+        self.metrics.increment('skipped_tournaments')
+        return False
+
+    def _build_in_parallel(self, blocks, date_range=None):
+        """
+        Parse the tournament blocks of the page across the workers
+        and append the tournaments in the order of the page so that
+        `_finalize` can assign the same ids as when parsing the soup.
+        The workers use the plan and the date range of the scrapper
+        and the blocks after the first tournament that ends before
+        the range are not parsed
+        """
+        self.logger.info(f'Parsing {len(blocks)} blocks in parallel')
+        try:
+            tournaments = map_blocks(
+                partial(parse_tournament_block, plan=self.plan, date_range=date_range),
+                self.path,
+                blocks,
+                workers=self.workers,
+                executor=self.executor,
+                stop=None if date_range is None else lambda result: result[2]
+            )
+        except Exception:
+            self.metrics.increment('parse_failures')
+            raise
+
+        for tournament, worker_metrics, passed in tournaments:
+            # The stages of the workers are recorded
+            # in their own process or thread
+            self.metrics.merge(worker_metrics)
+
+            if tournament is not None:
+                self.tournaments.append(tournament)
+
+            if passed:
+                date_range.passed = True
+                self.logger.info('Reached the tournaments before the requested dates')
 
     @property
     def number_of_tournaments(self):
@@ -219,6 +492,8 @@ class MatchScrapper(Mixins):
         """
         return OrderedDict(**kwargs)
 
+    @timed('footer')
+    @traced('footer', attributes=lambda self, values: _get_span_tournament(values))
     def _parse_footer(self, footer, using=None):
         """
         Parse the footer element in order to return
@@ -274,6 +549,8 @@ class MatchScrapper(Mixins):
             return using
         return player_rank_during_tournament
 
+    @timed('header')
+    @traced('header', attributes=lambda self, values: _get_span_tournament(values))
     def _parse_tournament_header(self, header):
         """
         Parse the header for each tournaments
@@ -312,6 +589,10 @@ class MatchScrapper(Mixins):
             return False
         return base
 
+    @timed('matches')
+    @traced('matches', attributes=lambda self, values: {
+        **_get_span_tournament(values), 'matches': len(values['matches'])
+    })
     def _parse_matches(self, matches, using=None):
         """
         Parses the matches from the table
@@ -398,6 +679,8 @@ class MatchScrapper(Mixins):
         current_date = datetime.datetime.now().date()
         return current_date.year - d.year
 
+    @timed('finalize')
+    @traced('finalize', attributes=lambda self, values: {'tournaments': max(self.number_of_tournaments - 1, 0)})
     def _finalize(self, **kwargs):
         """
         Voluntarily, the initital dictionnaries that were created by tournament
@@ -412,6 +695,9 @@ class MatchScrapper(Mixins):
         tournaments_count = len(pre_final_dict)
         self.logger.info(f'Finalizing for {tournaments_count} tournaments')
 
+        number_of_matches = 0
+        number_of_missing_fields = 0
+
         # Some of the tournaments names are very long
         # and not really adequate for being a dictionnary
         # key. This offers the possibility to map a specific
@@ -468,15 +754,21 @@ class MatchScrapper(Mixins):
                         blank_dict[key]['year'] = None
 
                     blank_dict[key]['ranking'] = values['ranking']
+                    if values.get('missing_fields'):
+                        number_of_missing_fields += 1
 
                     matches_count = len(matches)
+                    number_of_matches += matches_count
                     for i, match in enumerate(matches):
                         match['details'] = self._deep_clean_multiple(match['details'])
                         match['id'] = matches_count - i
 
             tournaments.append(blank_dict)
         tournaments.append(kwargs)
-        self.tournaments = tournaments
+        self.tournaments = self.string_pool.intern_values(tournaments)
+        self.metrics.increment('tournaments', tournaments_count)
+        self.metrics.increment('matches', number_of_matches)
+        self.metrics.increment('missing_fields', number_of_missing_fields)
         self.logger.info('Adapting...')
         self.logger.info((f'Found and built {len(self.tournaments) - 1} tournaments'))
         self.logger.info("Call 'write_values_to_file' if you wish to output the values to a file")
@@ -491,6 +783,8 @@ class MatchScrapper(Mixins):
     def get_tournaments(self):
         return self.tournaments
 
+    @timed('write')
+    @traced('write')
     def write_values_to_file(self, values=None, file_format='json', **kwargs):
         """
         Write the parsed values to a file of type JSON or CSV
@@ -526,6 +820,7 @@ class MatchScrapper(Mixins):
                 if 'header' in kwargs:
                     values.insert(0, kwargs['header'])
                 writer.write_rows(values)
+        self.metrics.increment('files_written')
         self.logger.info(f'Created file {file_to_write}')
 
     def load(self, filename):
@@ -536,11 +831,11 @@ class MatchScrapper(Mixins):
             filename = f'{filename}.json'
 
         with open(f'data/{filename}', 'r') as f:
-            data = json.load(f)
+            data = self.string_pool.intern_values(json.load(f))
         self.logger.info(f'Loading {filename}')
         return Query(data)
 
-    def loads(self, *filenames):
+    def loads(self, *filenames, deduplicate=False):
         """
         Load multiple JSON files
 
@@ -548,13 +843,24 @@ class MatchScrapper(Mixins):
         ----------
 
             filenames (list): files to load
+
+            deduplicate (bool, optional): remove the matches that appear on
+            the pages of both players. The report is stored in `deduplication`
         """
         data = []
         concat_tournaments = []
         for name in filenames:
             data.append(self.load(name))
 
+        if deduplicate:
+            deduplicator = Deduplicator()
+            data = [Query(deduplicator.filter(model)) for model in data]
+            self.deduplication = deduplicator.report()
+            self.logger.info(f'Removed {len(deduplicator.collisions)} duplicate matches')
+
         for model in data:
+            self._update_stats(model)
+
             for tournamnent in model.tournaments:
                 concat_tournaments.append(tournamnent)
         
@@ -564,6 +870,42 @@ class MatchScrapper(Mixins):
         self.tournaments = concat_tournaments
 
 
+def parse_tournament_block(path, start, end, plan=None, date_range=None):
+    """
+    Parse a single tournament block of an HTML file. This
+    is the function that is called by the workers in parallel mode
+
+    Parameters
+
+        plan (ParsePlan, optional): the plan of the scrapper
+        date_range (DateRange, optional): the dates of the tournaments to keep
+
+    Returns
+
+        tuple: (tournament or None, the metrics recorded by the worker,
+        whether the tournament ends before the date range)
+    """
+    metrics = Metrics()
+    scrapper = MatchScrapper(metrics=metrics, plan=plan)
+    soup = BeautifulSoup(read_block(path, start, end), 'html.parser')
+    if plan is not None:
+        element = find_first(soup, plan.is_tournament)
+    else:
+        element = soup.find('div')
+
+    if element is None:
+        return None, metrics.export(), False
+
+    # The range is copied since the threads of
+    # an executor would share the same instance
+    if date_range is not None:
+        date_range = copy.copy(date_range)
+        date_range.passed = False
+
+    tournament = scrapper._build_tournament(element, date_range=date_range)
+    return tournament, metrics.export(), date_range is not None and date_range.passed
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Parse an HTML page for WTA matches')
     parser.add_argument('-n', '--filename', type=str, required=True, help='The HTML file to parse')
@@ -573,9 +915,10 @@ if __name__ == "__main__":
 
     parser.add_argument('--player', type=str, help='Name of the player to parse file for')
     parser.add_argument('--year', type=int, help='Year of the tournaments')
+    parser.add_argument('--workers', type=int, help='Parse the tournaments in parallel using this number of processes')
     parsed_arguments = parser.parse_args()
     
-    scrapper = MatchScrapper(filename=parsed_arguments.filename)
+    scrapper = MatchScrapper(filename=parsed_arguments.filename, workers=parsed_arguments.workers)
     scrapper.build(
         parsed_arguments.filter, 
         player_name=parsed_arguments.player, 
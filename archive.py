@@ -0,0 +1,284 @@
+import argparse
+import datetime
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import zlib
+
+# The file starts with the header and ends with the
+# index of the pages followed by the footer that
+# gives the position of the index
+HEADER = b'WTAPACK1'
+
+FOOTER_MAGIC = b'WTAINDEX'
+
+FOOTER = struct.Struct('<QQ8s')
+
+
+class ArchiveError(Exception):
+    pass
+
+
+def get_slug(filename):
+    """
+    Return the slug of a saved page e.g. html/eugenie_bouchard.html -> eugenie_bouchard
+    """
+    return os.path.splitext(os.path.basename(filename))[0]
+
+
+class PageReference:
+    """
+    A page of an archive. The reference only contains the position
+    of the page which means that it can be sent to other processes
+    and read without loading the index again
+    """
+    def __init__(self, path, entry):
+        self.path = path
+        self.entry = entry
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.slug}, {self.date})'
+
+    def __eq__(self, other):
+        return isinstance(other, PageReference) and (self.path, self.entry) == (other.path, other.entry)
+
+    def __hash__(self):
+        return hash((self.path, self.entry['offset']))
+
+    @property
+    def slug(self):
+        return self.entry['slug']
+
+    @property
+    def date(self):
+        return self.entry['date']
+
+    @property
+    def hash(self):
+        return self.entry['hash']
+
+    def read(self):
+        """
+        Return the HTML of the page
+        """
+        with open(self.path, 'rb') as f:
+            f.seek(self.entry['offset'])
+            content = zlib.decompress(f.read(self.entry['size']))
+
+        if hashlib.sha256(content).hexdigest() != self.entry['hash']:
+            raise ArchiveError(f'The page {self.slug} of {self.path} is corrupted')
+        return content.decode('utf-8')
+
+
+class PageArchive:
+    """
+    Stores the saved HTML pages in a single file. Each page is
+    compressed on its own and the index at the end of the file
+    gives the position of each page which means that a page can be
+    read without decompressing the others
+
+    The file is only ever appended to. New pages are written after
+    the existing ones followed by a new index and the previous index
+    is ignored. A write that was interrupted leaves the last complete
+    index which is why the archive can still be read
+
+        with PageArchive('pages.pack') as archive:
+            archive.add('eugenie_bouchard', html, date='2021-01-15')
+
+        reference = PageArchive('pages.pack').get('eugenie_bouchard')
+        scrapper = MatchScrapper(filename=reference)
+
+    Parameters
+
+        path (str): path to the archive, created if it does not exist
+        level (int, optional): the zlib compression level. Defaults to 6
+    """
+    def __init__(self, path, level=6):
+        self.path = path
+        self.level = level
+        self.entries = []
+        self.pending = []
+        self._lock = threading.Lock()
+
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.entries = self._read_index()
+        else:
+            with open(path, 'wb') as f:
+                f.write(HEADER)
+            self._write_index()
+
+        self._by_slug = {}
+        self._hashes = set()
+        for entry in self.entries:
+            self._register(entry)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.path}, {len(self)} pages)'
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, slug):
+        return slug in self._by_slug
+
+    def __iter__(self):
+        return (PageReference(self.path, entry) for entry in self.entries)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.flush()
+
+    def _register(self, entry):
+        self._by_slug.setdefault(entry['slug'], []).append(entry)
+        self._hashes.add((entry['slug'], entry['hash']))
+
+    def _read_index(self):
+        with open(self.path, 'rb') as f:
+            if f.read(len(HEADER)) != HEADER:
+                raise ArchiveError(f'{self.path} is not a page archive')
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                # Look for the last complete footer in case
+                # the last write was interrupted
+                position = content.rfind(FOOTER_MAGIC)
+                while position >= 0:
+                    start = position + len(FOOTER_MAGIC) - FOOTER.size
+                    if start >= len(HEADER):
+                        offset, size, _ = FOOTER.unpack_from(content, start)
+                        if len(HEADER) <= offset and offset + size == start:
+                            return json.loads(zlib.decompress(content[offset:start]))
+                    position = content.rfind(FOOTER_MAGIC, 0, position)
+        raise ArchiveError(f'Could not find the index of {self.path}')
+
+    def _write_index(self):
+        index = zlib.compress(json.dumps(self.entries).encode('utf-8'), self.level)
+        with open(self.path, 'ab') as f:
+            offset = f.tell()
+            f.write(index)
+            f.write(FOOTER.pack(offset, len(index), FOOTER_MAGIC))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def add(self, slug, html, date=None):
+        """
+        Compress and append a page to the archive. The page
+        is skipped if the same content was already stored
+        for this slug
+
+        Parameters
+
+            slug (str): name of the page e.g. eugenie_bouchard
+            html (str, bytes): the content of the page
+            date (str, optional): when the page was fetched. Defaults to today
+
+        Returns
+
+            PageReference: the reference of the new or existing page
+        """
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        if date is None:
+            date = datetime.date.today()
+
+        content_hash = hashlib.sha256(html).hexdigest()
+        with self._lock:
+            if (slug, content_hash) in self._hashes:
+                for entry in self._by_slug[slug]:
+                    if entry['hash'] == content_hash:
+                        return PageReference(self.path, entry)
+
+            compressed = zlib.compress(html, self.level)
+            with open(self.path, 'ab') as f:
+                offset = f.tell()
+                f.write(compressed)
+
+            entry = {
+                'slug': slug,
+                'date': str(date),
+                'hash': content_hash,
+                'offset': offset,
+                'size': len(compressed),
+                'length': len(html)
+            }
+            self.entries.append(entry)
+            self.pending.append(entry)
+            self._register(entry)
+        return PageReference(self.path, entry)
+
+    def add_file(self, filename, date=None):
+        if date is None:
+            date = datetime.date.fromtimestamp(os.path.getmtime(filename))
+        with open(filename, 'rb') as f:
+            return self.add(get_slug(filename), f.read(), date=date)
+
+    def flush(self):
+        """
+        Write the index of the pages that were added. Opening the
+        archive again only finds the pages whose index was written
+        """
+        with self._lock:
+            if self.pending:
+                self._write_index()
+                self.pending = []
+
+    def get(self, slug, date=None):
+        """
+        Return the reference of the most recent page of the
+        slug or of the page fetched at the given date
+        """
+        try:
+            entries = self._by_slug[slug]
+        except KeyError:
+            raise KeyError(f'{slug} is not in the archive')
+
+        if date is None:
+            return PageReference(self.path, max(entries, key=lambda entry: entry['date']))
+
+        for entry in reversed(entries):
+            if entry['date'] == str(date):
+                return PageReference(self.path, entry)
+        raise KeyError(f'{slug} was not fetched on {date}')
+
+    def read(self, slug, date=None):
+        return self.get(slug, date=date).read()
+
+    def stats(self):
+        size = sum(entry['size'] for entry in self.entries)
+        length = sum(entry['length'] for entry in self.entries)
+        return {
+            'pages': len(self.entries),
+            'players': len(self._by_slug),
+            'compressed': size,
+            'uncompressed': length,
+            'ratio': round(length / size, 2) if size else None
+        }
+
+
+def pack_folder(folder, path, level=6):
+    """
+    Add the HTML files of a folder to an archive
+    """
+    with PageArchive(path, level=level) as archive:
+        for name in sorted(os.listdir(folder)):
+            if name.endswith('.html'):
+                archive.add_file(os.path.join(folder, name))
+    return archive
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Pack the saved HTML pages in an archive')
+    parser.add_argument('path', type=str, help='Path to the archive')
+    parser.add_argument('--folder', type=str, help='Add the HTML files of this folder')
+    parser.add_argument('--level', type=int, default=6, help='Compression level')
+    parsed_arguments = parser.parse_args()
+
+    if parsed_arguments.folder:
+        archive = pack_folder(parsed_arguments.folder, parsed_arguments.path, level=parsed_arguments.level)
+    else:
+        archive = PageArchive(parsed_arguments.path)
+    print(json.dumps(archive.stats(), indent=4))
@@ -0,0 +1,107 @@
+import asyncio
+from functools import partial
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.metrics import Metrics
+
+
+def build_page(filename, f, **kwargs):
+    """
+    Parse a page and return its values. This is the function that
+    runs in the executor which is why it creates its own scrapper
+    """
+    scrapper = MatchScrapper(filename=filename)
+    return scrapper.build(f, **kwargs)
+
+
+def build_page_with_metrics(filename, f, **kwargs):
+    """
+    Parse a page and return its values with the metrics that were
+    recorded. A process of a pool has its own metrics which is why
+    they are sent back to be merged in the metrics of the caller
+    """
+    metrics = Metrics()
+    scrapper = MatchScrapper(filename=filename, metrics=metrics)
+    return scrapper.build(f, **kwargs), metrics.export()
+
+
+class AsyncMatchScrapper:
+    """
+    Awaitable version of `MatchScrapper` for asyncio services. The
+    parsing runs in an executor and the file reads and writes in
+    threads so that the event loop is never blocked
+
+    Parameters
+
+        filename (str, optional): name of the HTML file to parse in the html folder
+        executor (Executor, optional): executor in which the pages are parsed, a
+        ProcessPoolExecutor allows the pages to be parsed on multiple cores.
+        Defaults to the default executor of the loop
+        semaphore (asyncio.Semaphore, optional): limits the number of pages
+        that are processed at the same time
+        stats (CareerStats, optional): updated after each build
+        metrics (Metrics, optional): in which the metrics of the page are
+        merged once it was parsed. Defaults to the instance shared by the process
+    """
+    def __init__(self, filename=None, executor=None, semaphore=None, stats=None, metrics=None):
+        self.filename = filename
+        self.executor = executor
+        self.semaphore = semaphore
+        self.scrapper = MatchScrapper(stats=stats, metrics=metrics)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.filename})'
+
+    @property
+    def tournaments(self):
+        return self.scrapper.tournaments
+
+    async def _run(self, func, executor=None):
+        loop = asyncio.get_running_loop()
+        if self.semaphore is None:
+            return await loop.run_in_executor(executor, func)
+
+        async with self.semaphore:
+            return await loop.run_in_executor(executor, func)
+
+    async def build(self, f, **kwargs):
+        """
+        Parse the page. Takes the same parameters as `MatchScrapper.build`
+        """
+        if self.filename is None:
+            raise ValueError('A filename is required in order to build the values')
+
+        tournaments, metrics = await self._run(
+            partial(build_page_with_metrics, self.filename, f, **kwargs),
+            executor=self.executor
+        )
+        self.scrapper.metrics.merge(metrics)
+        self.scrapper.tournaments = tournaments
+        self.scrapper._update_stats(tournaments)
+        return tournaments
+
+    async def write_values_to_file(self, values=None, file_format='json', **kwargs):
+        return await self._run(
+            partial(self.scrapper.write_values_to_file, values=values, file_format=file_format, **kwargs)
+        )
+
+    async def load(self, filename):
+        return await self._run(partial(self.scrapper.load, filename))
+
+
+async def build_pages(filenames, f, concurrency=8, executor=None, metrics=None, **kwargs):
+    """
+    Parse many pages with at most `concurrency` pages
+    being processed at the same time. The first error
+    raised by a page is raised
+
+    Returns
+
+        list: the values of each page in the order of the filenames
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    scrappers = [
+        AsyncMatchScrapper(filename, executor=executor, semaphore=semaphore, metrics=metrics)
+        for filename in filenames
+    ]
+    return await asyncio.gather(*(scrapper.build(f, **kwargs) for scrapper in scrappers))
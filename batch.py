@@ -0,0 +1,326 @@
+import argparse
+import datetime
+import hashlib
+import json
+import os
+import time
+import traceback
+
+from wta_scrapper.app import init_logger
+from wta_scrapper.archive import PageReference, get_slug
+from wta_scrapper.async_scrapper import build_page
+from wta_scrapper.utils import (DATA_DIR, TEMPLATES, autodiscover,
+                                write_json_atomically)
+
+STATUSES = ('started', 'done', 'failed')
+
+
+def get_file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_input_key(item):
+    """
+    Return the name under which a page is recorded in the journal
+    e.g. test_page.html or eugenie_bouchard@2021-01-15 for a page
+    of an archive
+    """
+    if isinstance(item, PageReference):
+        return f'{item.slug}@{item.date}'
+    return str(item)
+
+
+def get_input_hash(item):
+    if isinstance(item, PageReference):
+        return item.hash
+    return get_file_hash(autodiscover()(filename=item))
+
+
+class Journal:
+    """
+    Append-only record of the pages of a batch. Each attempt writes
+    a started line followed by a done or failed line and each line is
+    synced to disk before the next step which means that the journal
+    describes the batch up to the moment the process stopped
+
+        {"input": "test_page.html", "hash": "...", "status": "done",
+        "output": "data/batch/test_page.json", "output_hash": "...",
+        "attempt": 1, "duration": 0.41, "time": "2021-01-15T10:00:00"}
+
+    Parameters
+
+        path (str): the JSON Lines file, created if it does not exist
+    """
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            self._read()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.path}, {len(self.entries)} pages)'
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _read(self):
+        size = 0
+        last_line = None
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    last_line = line
+                    break
+
+                size += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                self.entries[record['input']] = record
+
+        if last_line is not None:
+            self._repair(size, last_line)
+
+    def _repair(self, size, line):
+        """
+        The last line has no end when the process stopped while
+        writing it. A complete record only misses the end of its
+        line, anything else is removed. Otherwise the next record
+        would be appended to that line and could not be read
+        """
+        try:
+            record = json.loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            record = None
+
+        with open(self.path, 'r+b') as f:
+            if record is None:
+                f.truncate(size)
+            else:
+                f.seek(0, os.SEEK_END)
+                f.write(b'\n')
+                self.entries[record['input']] = record
+            f.flush()
+            os.fsync(f.fileno())
+
+    def write(self, status, key, input_hash, **values):
+        if status not in STATUSES:
+            raise ValueError(f'Unknown status: {status}')
+
+        record = {
+            'input': key,
+            'hash': input_hash,
+            'status': status,
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            **values
+        }
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record))
+            f.write('\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self.entries[key] = record
+        return record
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def is_done(self, key, input_hash):
+        """
+        Whether the page was completed with the same content. The
+        output is only trusted if it still has the hash that was
+        recorded once it was written
+        """
+        record = self.entries.get(key)
+        if record is None or record['status'] != 'done' or record['hash'] != input_hash:
+            return False
+
+        output = record.get('output')
+        if output is None or not os.path.exists(output):
+            return False
+        return get_file_hash(output) == record.get('output_hash')
+
+    def summary(self):
+        result = dict.fromkeys(STATUSES, 0)
+        for record in self.entries.values():
+            result[record['status']] += 1
+        return result
+
+
+class BatchRunner:
+    """
+    Builds many pages and writes the values of each page to its own
+    file. The pages that were completed by a previous run with the
+    same content are skipped which means that a batch that stopped
+    can be started again with the same journal. Failed pages are
+    retried with an exponential backoff
+
+        runner = BatchRunner(TEMPLATES, 'player-matches__tournament', journal='batch.jsonl')
+        runner.run()
+
+    Parameters
+
+        inputs (list): names of the pages in the html folder or `PageReference`
+        f (str): criteria passed to `MatchScrapper.build`
+        output_dir (str, optional): folder of the result files. Defaults to data/batch
+        journal (str, Journal, optional): the journal. Defaults to journal.jsonl in output_dir
+        retries (int, optional): number of retries of a failed page. Defaults to 2
+        backoff (float, optional): seconds before the first retry, doubled after
+        each failure. Defaults to 1
+        max_backoff (float, optional): maximum number of seconds between retries
+        build (callable, optional): function called with the input, f and kwargs
+        that returns the values. Defaults to `build_page`
+        sleep (callable, optional): function used to wait between retries
+        kwargs: passed to `MatchScrapper.build` e.g. player_name or year
+    """
+    def __init__(self, inputs, f, output_dir=None, journal=None, retries=2,
+                 backoff=1, max_backoff=60, build=build_page, sleep=time.sleep, **kwargs):
+        self.inputs = list(inputs)
+        self.f = f
+        self.output_dir = output_dir or os.path.join(DATA_DIR, 'batch')
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        if journal is None:
+            journal = os.path.join(self.output_dir, 'journal.jsonl')
+        self.journal = journal if isinstance(journal, Journal) else Journal(journal)
+
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.build = build
+        self.sleep = sleep
+        self.kwargs = kwargs
+
+        self.durations = []
+        self.counts = {'done': 0, 'skipped': 0, 'failed': 0}
+        self.logger = init_logger(self.__class__.__name__)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.inputs)} pages)'
+
+    @property
+    def remaining(self):
+        return len(self.inputs) - sum(self.counts.values())
+
+    def get_output_path(self, item):
+        if isinstance(item, PageReference):
+            name = item.slug
+        else:
+            name = get_slug(item)
+        return os.path.join(self.output_dir, f'{name}.json')
+
+    def get_backoff(self, attempt):
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+
+    def eta(self):
+        """
+        Return the number of seconds left and the projected completion
+        time using the mean duration of the pages built in this run
+        """
+        if not self.durations:
+            return None, None
+
+        seconds = sum(self.durations) / len(self.durations) * self.remaining
+        completion = datetime.datetime.now() + datetime.timedelta(seconds=seconds)
+        return round(seconds, 3), completion.isoformat(timespec='seconds')
+
+    def run_one(self, item):
+        """
+        Build a page unless it was already completed
+
+        Returns
+
+            str: done, skipped or failed
+        """
+        key = get_input_key(item)
+        try:
+            input_hash = get_input_hash(item)
+        except OSError as e:
+            # A missing page will not appear by retrying
+            self.journal.write('failed', key, None, attempt=0, error=str(e))
+            return 'failed'
+
+        if self.journal.is_done(key, input_hash):
+            return 'skipped'
+
+        output = self.get_output_path(item)
+        attempts = self.retries + 1
+        for attempt in range(1, attempts + 1):
+            self.journal.write('started', key, input_hash, attempt=attempt)
+            start = time.perf_counter()
+            try:
+                values = self.build(item, self.f, **self.kwargs)
+                write_json_atomically(output, values)
+            except Exception as e:
+                duration = time.perf_counter() - start
+                self.journal.write(
+                    'failed', key, input_hash,
+                    attempt=attempt,
+                    duration=round(duration, 6),
+                    error=''.join(traceback.format_exception_only(type(e), e)).strip()
+                )
+                self.logger.error(f'Failed to build {key} ({attempt}/{attempts}): {e}')
+                if attempt < attempts:
+                    self.sleep(self.get_backoff(attempt))
+                continue
+
+            duration = time.perf_counter() - start
+            self.durations.append(duration)
+            self.journal.write(
+                'done', key, input_hash,
+                attempt=attempt,
+                duration=round(duration, 6),
+                output=output,
+                output_hash=get_file_hash(output)
+            )
+            return 'done'
+        return 'failed'
+
+    def run(self):
+        """
+        Build every page of the batch
+
+        Returns
+
+            dict: the number of pages done, skipped and failed and the duration
+        """
+        start = time.perf_counter()
+        for item in self.inputs:
+            status = self.run_one(item)
+            self.counts[status] += 1
+
+            seconds, completion = self.eta()
+            self.logger.info(
+                f'{get_input_key(item)}: {status} ({self.remaining} left, '
+                f'projected completion {completion or "unknown"})'
+            )
+        return {
+            **self.counts,
+            'total': len(self.inputs),
+            'duration': round(time.perf_counter() - start, 6)
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Build the pages of the html folder and keep a journal')
+    parser.add_argument('--filter', type=str, required=True, help='A value used to filter the html tags on the WTA page')
+    parser.add_argument('--output', type=str, help='Folder of the result files')
+    parser.add_argument('--journal', type=str, help='The journal of the batch')
+    parser.add_argument('--retries', type=int, default=2, help='Number of retries of a failed page')
+    parser.add_argument('--year', type=int, help='Year of the tournaments')
+    parsed_arguments = parser.parse_args()
+
+    runner = BatchRunner(
+        TEMPLATES,
+        parsed_arguments.filter,
+        output_dir=parsed_arguments.output,
+        journal=parsed_arguments.journal,
+        retries=parsed_arguments.retries,
+        year=parsed_arguments.year
+    )
+    print(json.dumps(runner.run(), indent=4))
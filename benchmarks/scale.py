@@ -0,0 +1,75 @@
+"""
+Measure the throughput and the peak memory of the parser
+on generated pages from a single season up to extreme sizes
+
+    python -m wta_scrapper.benchmarks.scale --scales realistic veteran
+"""
+import argparse
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.benchmarks.suite import get_scrapper
+from wta_scrapper.generator import PageGenerator
+
+# Number of tournaments on the page
+SCALES = {
+    'realistic': 25,
+    'veteran': 400,
+    'extreme': 2000
+}
+
+
+def profile_page(page):
+    """
+    Parse a page and return the time spent and the
+    peak memory allocated while parsing it
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    scrapper = get_scrapper()
+    scrapper.soup = BeautifulSoup(page, 'html.parser')
+    soup_time = time.perf_counter() - start
+
+    values = scrapper.build('player-matches__tournament')
+    elapsed = time.perf_counter() - start
+
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    tournaments = len(values) - 1
+    matches = sum(len(item['matches']) for tournament in values[:-1] for item in tournament.values())
+    return {
+        'size': len(page),
+        'tournaments': tournaments,
+        'matches': matches,
+        'soup_seconds': round(soup_time, 4),
+        'seconds': round(elapsed, 4),
+        'tournaments_per_second': round(tournaments / elapsed, 1),
+        'matches_per_second': round(matches / elapsed, 1),
+        'peak_memory': peak
+    }
+
+
+def run(scales=None, seed=42):
+    results = {}
+    for scale in scales or list(SCALES.keys()):
+        generator = PageGenerator(number_of_tournaments=SCALES[scale], seed=seed)
+        results[scale] = profile_page(generator.render())
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Measure the parser on generated pages')
+    parser.add_argument('--scales', nargs='*', choices=list(SCALES.keys()), help='Sizes of the pages')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed of the generator')
+    parsed_arguments = parser.parse_args()
+
+    for scale, result in run(parsed_arguments.scales, seed=parsed_arguments.seed).items():
+        print(
+            f'{scale:<10} {result["tournaments"]:>6} tournaments {result["matches"]:>7} matches '
+            f'{result["seconds"]:>8.3f} s {result["matches_per_second"]:>9.1f} matches/s '
+            f'{result["peak_memory"] / 1024 / 1024:>8.1f} MB'
+        )
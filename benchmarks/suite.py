@@ -0,0 +1,305 @@
+"""
+Benchmarks for the hot paths of the scrapper: page parsing,
+score parsing, finalizing, JSON writing/loading and the
+construction of the dataframes
+
+Run the suite and save the timings as the new baselines:
+
+    python -m wta_scrapper.benchmarks.suite --save
+
+Run the suite and fail if a benchmark is slower than its baseline:
+
+    python -m wta_scrapper.benchmarks.suite --check --threshold 0.25
+"""
+import argparse
+import copy
+import datetime
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.generator import PageGenerator
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.models import Query
+from wta_scrapper.score import Score
+from wta_scrapper.spec import ParsePlan
+from wta_scrapper.utils import BASE_DIR, iter_matches, split_results
+
+BENCHMARKS_DIR = os.path.join(BASE_DIR, 'benchmarks')
+
+BASELINES = os.path.join(BENCHMARKS_DIR, 'baselines.json')
+
+TEST_DATA = os.path.join(BASE_DIR, 'tests', 'test_data.json')
+
+# Number of copies of the test data
+# used for each size of the benchmarks
+SIZES = {
+    'small': 1,
+    'medium': 10,
+    'large': 40
+}
+
+def get_values(copies=1):
+    """
+    Return the test data repeated a given number
+    of times, each copy being moved one year back
+    """
+    with open(TEST_DATA, 'r') as f:
+        data = json.load(f)
+
+    tournaments, metadata = split_results(data)
+    values = []
+    for i in range(copies):
+        for tournament in copy.deepcopy(tournaments):
+            for details in tournament.values():
+                date = datetime.date.fromisoformat(details['date'])
+                details['date'] = str(date.replace(year=date.year - i))
+                details['year'] = date.year - i
+            values.append(tournament)
+    values.append(metadata)
+    return values
+
+
+def render_page(values):
+    """
+    Generate a page with as many tournaments as the values
+    """
+    tournaments, _ = split_results(values)
+    return PageGenerator(number_of_tournaments=len(tournaments)).render()
+
+
+def get_scrapper(page=None):
+    scrapper = MatchScrapper(metrics=Metrics(enabled=False))
+    scrapper.logger.disabled = True
+    if page is not None:
+        scrapper.soup = BeautifulSoup(page, 'html.parser')
+    return scrapper
+
+
+def measure(func, setup=None, repeat=5):
+    """
+    Return the best time out of `repeat` runs of `func`. The
+    value returned by `setup` is passed to `func` and is not timed
+    """
+    timings = []
+    for _ in range(repeat):
+        argument = setup() if setup is not None else None
+        gc.collect()
+        start = time.perf_counter()
+        if setup is not None:
+            func(argument)
+        else:
+            func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_parse(values, repeat):
+    page = render_page(values)
+
+    def run():
+        scrapper = get_scrapper(page)
+        scrapper.build('player-matches__tournament')
+    return measure(run, repeat=repeat)
+
+
+def bench_score(values, repeat):
+    scores = [match['details']['score'] for _, match in iter_matches(values)]
+
+    def run():
+        for score in scores:
+            Score(score)
+    return measure(run, repeat=repeat)
+
+
+def bench_extract(values, repeat):
+    """
+    Locate and parse the tournaments of the page
+    with the generic filtering of the scrapper
+    """
+    scrapper = get_scrapper(render_page(values))
+
+    def run():
+        elements = scrapper._filter(scrapper.soup.find_all('div'), 'player-matches__tournament')
+        for element in elements:
+            scrapper._build_tournament(element)
+    return measure(run, repeat=repeat)
+
+
+def bench_plan(values, repeat):
+    """
+    Same as `bench_extract` with the parse plan
+    compiled from the default spec
+    """
+    scrapper = get_scrapper(render_page(values))
+    scrapper.plan = ParsePlan()
+
+    def run():
+        for element in scrapper.plan.find_tournaments(scrapper.soup):
+            scrapper._build_tournament(element)
+    return measure(run, repeat=repeat)
+
+
+def bench_finalize(values, repeat):
+    scrapper = get_scrapper(render_page(values))
+    elements = scrapper._filter(scrapper.soup.find_all('div'), 'player-matches__tournament')
+    tournaments = [scrapper._build_tournament(element) for element in elements]
+    tournaments = [item for item in tournaments if item is not None]
+
+    def setup():
+        scrapper.tournaments = copy.deepcopy(tournaments)
+        return scrapper
+
+    return measure(lambda instance: instance._finalize(date_as_string=True), setup=setup, repeat=repeat)
+
+
+def bench_json(values, repeat):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'result.json')
+
+        def run():
+            with open(path, 'w') as f:
+                json.dump(values, f, indent=4)
+
+            with open(path, 'r') as f:
+                json.load(f)
+        return measure(run, repeat=repeat)
+
+
+def bench_dataframe(values, repeat):
+    def setup():
+        return Query(copy.deepcopy(values))
+
+    def run(query):
+        query.get_matches()
+
+    return measure(run, setup=setup, repeat=repeat)
+
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'extract': bench_extract,
+    'plan': bench_plan,
+    'score': bench_score,
+    'finalize': bench_finalize,
+    'json': bench_json,
+    'dataframe': bench_dataframe
+}
+
+
+def run(names=None, sizes=None, repeat=5):
+    """
+    Run the benchmarks
+
+    Returns
+
+        dict: {'name[size]': seconds}
+    """
+    names = names or list(BENCHMARKS.keys())
+    sizes = sizes or list(SIZES.keys())
+
+    results = {}
+    for size in sizes:
+        values = get_values(SIZES[size])
+        for name in names:
+            results[f'{name}[{size}]'] = BENCHMARKS[name](values, repeat)
+    return results
+
+
+def load_baselines(path=BASELINES):
+    if not os.path.exists(path):
+        return {}
+
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baselines(results, path=BASELINES):
+    baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, 'w') as f:
+        json.dump(baselines, f, indent=4, sort_keys=True)
+
+
+def compare(results, baselines, threshold=0.25):
+    """
+    Compare the results with the baselines
+
+    Parameters
+
+        threshold (float, optional): the accepted slowdown as a fraction
+        of the baseline. Defaults to 0.25
+
+    Returns
+
+        list: the benchmarks that regressed [(name, baseline, result), ...]
+    """
+    regressions = []
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+
+        if seconds > baseline * (1 + threshold):
+            regressions.append((name, baseline, seconds))
+    return regressions
+
+
+def get_missing(results, baselines):
+    """
+    Return the benchmarks that have no baseline and
+    which can therefore not be checked
+    """
+    return [name for name in results if baselines.get(name) is None]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the hot paths of the scrapper')
+    parser.add_argument('--benchmarks', nargs='*', choices=list(BENCHMARKS.keys()), help='Benchmarks to run')
+    parser.add_argument('--sizes', nargs='*', choices=list(SIZES.keys()), help='Sizes of the data to use')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of runs for each benchmark')
+    parser.add_argument('--save', action='store_true', help='Save the results as the new baselines')
+    parser.add_argument('--check', action='store_true', help='Fail if a benchmark is slower than its baseline')
+    parser.add_argument('--allow-missing', action='store_true', help='Only warn about the benchmarks without a baseline when checking')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Accepted slowdown as a fraction of the baseline')
+    parser.add_argument('--baselines', type=str, default=BASELINES, help='Path to the baselines file')
+    parsed_arguments = parser.parse_args()
+
+    results = run(
+        names=parsed_arguments.benchmarks,
+        sizes=parsed_arguments.sizes,
+        repeat=parsed_arguments.repeat
+    )
+    baselines = load_baselines(parsed_arguments.baselines)
+    for name, seconds in results.items():
+        baseline = baselines.get(name)
+        change = f'{(seconds / baseline - 1) * 100:+.1f}%' if baseline else 'no baseline'
+        print(f'{name:<24} {seconds * 1000:>10.2f} ms  {change}')
+
+    if parsed_arguments.save:
+        save_baselines(results, path=parsed_arguments.baselines)
+        print(f'Saved baselines to {parsed_arguments.baselines}')
+
+    if parsed_arguments.check:
+        regressions = compare(results, baselines, threshold=parsed_arguments.threshold)
+        for name, baseline, seconds in regressions:
+            print(f'Regression: {name} took {seconds * 1000:.2f} ms against {baseline * 1000:.2f} ms')
+
+        # Baselines depend on the machine which is why they are not
+        # committed. A check without them would always pass
+        missing = get_missing(results, baselines)
+        if missing:
+            print(
+                f'Missing baselines for {len(missing)} benchmarks: {", ".join(missing)}. '
+                'Run with --save on this machine first',
+                file=sys.stderr
+            )
+
+        if regressions or (missing and not parsed_arguments.allow_missing):
+            sys.exit(1)
@@ -0,0 +1,96 @@
+import mmap
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+
+def get_block_regex(criteria):
+    """
+    Regex that matches the opening tag of the divs whose
+    first class is exactly the criteria
+    """
+    return re.compile(
+        rb'<div\b[^>]*\bclass=["\']' + re.escape(criteria.encode('utf-8')) + rb'["\'\s]'
+    )
+
+
+def find_blocks(path, criteria='player-matches__tournament'):
+    """
+    Memory map an HTML file and locate each block of the page
+    without parsing it. A block starts at its opening tag and
+    ends where the next block starts
+
+    Parameters
+
+        path (str): path to the HTML file
+        criteria (str, optional): the class of the blocks
+
+    Returns
+
+        list: [(start, end), ...] byte offsets in page order
+    """
+    if os.path.getsize(path) == 0:
+        return []
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as page:
+            starts = [item.start() for item in get_block_regex(criteria).finditer(page)]
+            size = len(page)
+    return list(zip(starts, [*starts[1:], size]))
+
+
+def read_block(path, start, end):
+    """
+    Return the HTML of a block of the page
+    """
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as page:
+            return page[start:end].decode('utf-8', errors='replace')
+
+
+def map_blocks(func, path, blocks, workers=None, executor=None, stop=None):
+    """
+    Call `func(path, start, end)` for each block across a pool
+    of processes and return the results in page order
+
+    Parameters
+
+        func (callable): a picklable function
+        workers (int, optional): number of processes. Defaults to the number of CPUs
+        executor (Executor, optional): an existing executor to use instead
+        stop (callable, optional): called with each result in page order. The
+        blocks after the first result for which it returns True are not parsed
+        and their results are not returned
+    """
+    if not blocks:
+        return []
+
+    starts, ends = zip(*blocks)
+    workers = workers or os.cpu_count() or 1
+    # Send the blocks in batches otherwise
+    # the cost of the inter-process calls outweighs
+    # the cost of parsing a small tournament
+    chunksize = max(1, len(blocks) // (workers * 4))
+
+    def run(pool):
+        if stop is None:
+            return list(pool.map(func, repeat(path), starts, ends, chunksize=chunksize))
+
+        # The blocks are sent in rounds of one batch per worker so
+        # that the rounds after the stop are never sent to the pool
+        results = []
+        size = workers * chunksize
+        for i in range(0, len(blocks), size):
+            batch = pool.map(func, repeat(path), starts[i:i + size], ends[i:i + size], chunksize=chunksize)
+            for result in batch:
+                results.append(result)
+                if stop(result):
+                    return results
+        return results
+
+    if executor is not None:
+        return run(executor)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return run(pool)
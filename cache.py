@@ -0,0 +1,53 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Bounded cache in which the least recently
+    used value is evicted first
+
+    Parameters
+
+        maxsize (int, optional): number of values kept. Defaults to 256
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self)}/{self.maxsize})'
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self.items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self.items[key] = value
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self.items.pop(key, None)
+            self.items[key] = value
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self.items.clear()
+
+    def info(self):
+        return {'size': len(self), 'maxsize': self.maxsize, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,188 @@
+import json
+import os
+
+import pandas
+
+from wta_scrapper.models import filter_frame, normalize_filters
+from wta_scrapper.score import get_games
+from wta_scrapper.utils import DATA_DIR, is_owner, split_results
+
+# Values of the tournaments that are
+# not columns of the rows
+NESTED_FIELDS = ('matches', 'ranking', 'missing_fields')
+
+SUMMED_COLUMNS = ['wins', 'losses', 'games_won', 'games_lost']
+
+
+def iter_rows(values, view='matches'):
+    """
+    Flatten a result into the rows of the matches or of the
+    tournaments with the same columns as `Query` and a `player`
+    column. Contrarily to `Query`, the values are not modified
+    """
+    tournaments, metadata = split_results(values)
+    player = metadata.get('player_name')
+    for tournament in tournaments:
+        for details in tournament.values():
+            row = {
+                key: value for key, value in details.items()
+                if key not in NESTED_FIELDS
+            }
+            if view == 'tournaments':
+                yield {'player': player, **row}
+                continue
+
+            ranking = details.get('ranking') or {}
+            for match in details['matches']:
+                yield {
+                    'player': player,
+                    **{key: value for key, value in match.items() if key != 'details'},
+                    **row,
+                    **match['details'],
+                    **ranking
+                }
+
+
+class ChunkedQuery:
+    """
+    Queries on result files that do not fit in memory together. The
+    files are read one after the other and their rows are processed
+    in dataframes of at most `chunk_size` rows. Aggregations are
+    computed on each chunk and the partial results are added up
+    which means that the memory used is bounded by the size of
+    a chunk and of the largest file
+
+        query = ChunkedQuery.from_folder(chunk_size=50000)
+        query.aggregate(['player', 'surface'], year=2014)
+
+    Parameters
+
+        filenames (list): paths of the result files
+        chunk_size (int, optional): number of rows per chunk. Defaults to 10000
+    """
+    def __init__(self, filenames, chunk_size=10000):
+        if chunk_size < 1:
+            raise ValueError('The chunk size should be at least 1')
+        self.filenames = list(filenames)
+        self.chunk_size = chunk_size
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.filenames)} files, chunk_size={self.chunk_size})'
+
+    @classmethod
+    def from_folder(cls, folder=DATA_DIR, **kwargs):
+        filenames = [
+            os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.endswith('.json')
+        ]
+        return cls(filenames, **kwargs)
+
+    def _iter_values(self):
+        for filename in self.filenames:
+            with open(filename, 'r') as f:
+                yield json.load(f)
+
+    def iter_chunks(self, view='matches', columns=None, **filters):
+        """
+        Yield the rows matching the filters in dataframes
+        of at most `chunk_size` rows
+
+        Parameters
+
+            view (str, optional): matches or tournaments. Defaults to matches
+            columns (list, optional): columns to return
+        """
+        if view not in ('matches', 'tournaments'):
+            raise ValueError(f'Unknown view: {view}')
+
+        filters = dict(normalize_filters(**filters))
+        # A file belongs to a single player which means that the player
+        # filter keeps all or none of its rows like in `Query`
+        player = filters.pop('player', None)
+        filters = tuple(filters.items())
+
+        rows = []
+        for values in self._iter_values():
+            if player is not None and not is_owner(split_results(values)[1], player):
+                continue
+
+            for row in iter_rows(values, view=view):
+                rows.append(row)
+                if len(rows) == self.chunk_size:
+                    yield self._get_chunk(rows, filters, columns)
+                    rows = []
+
+        if rows:
+            yield self._get_chunk(rows, filters, columns)
+
+    @staticmethod
+    def _get_chunk(rows, filters, columns):
+        frame = filter_frame(pandas.DataFrame(rows), filters)
+        if columns:
+            frame = frame[list(columns)]
+        return frame
+
+    def filter(self, view='matches', columns=None, limit=None, **filters):
+        """
+        Return the rows matching the filters. Use a limit or
+        `iter_chunks` when the result might not fit in memory
+        """
+        frames = []
+        count = 0
+        for chunk in self.iter_chunks(view=view, columns=columns, **filters):
+            frames.append(chunk)
+            count += len(chunk)
+            if limit is not None and count >= limit:
+                break
+
+        if not frames:
+            return pandas.DataFrame()
+
+        frame = pandas.concat(frames, ignore_index=True)
+        if limit is not None:
+            frame = frame.head(limit)
+        return frame
+
+    def count(self, view='matches', **filters):
+        return sum(len(chunk) for chunk in self.iter_chunks(view=view, **filters))
+
+    def aggregate(self, group_by=('surface',), **filters):
+        """
+        Return the wins, losses, win rate and games won and lost
+        of the matches matching the filters grouped by columns
+
+        Returns
+
+            pandas.DataFrame: one row per group
+        """
+        if isinstance(group_by, str):
+            group_by = (group_by,)
+        group_by = list(group_by)
+
+        total = None
+        for chunk in self.iter_chunks(**filters):
+            if chunk.empty:
+                continue
+
+            for column in group_by:
+                if column not in chunk.columns:
+                    raise ValueError(f'Unknown column: {column}')
+
+            games = [get_games(score) for score in chunk['score']]
+            chunk = chunk.assign(
+                wins=(chunk['result'] == 'W').astype('int64'),
+                losses=(chunk['result'] == 'L').astype('int64'),
+                games_won=[item[0] for item in games],
+                games_lost=[item[1] for item in games]
+            )
+            partial = chunk.groupby(group_by, dropna=False)[SUMMED_COLUMNS].sum()
+            total = partial if total is None else total.add(partial, fill_value=0)
+
+        if total is None:
+            return pandas.DataFrame(columns=[*group_by, *SUMMED_COLUMNS, 'matches', 'win_rate'])
+
+        result = total.astype('int64').sort_index().reset_index()
+        result['matches'] = result['wins'] + result['losses']
+        result['win_rate'] = (result['wins'] / result['matches']).round(4)
+        result['total_games'] = result['games_won'] + result['games_lost']
+        return result
@@ -0,0 +1,280 @@
+import argparse
+import datetime
+import json
+import os
+from collections import OrderedDict
+
+from wta_scrapper.chunked import ChunkedQuery
+from wta_scrapper.models import Query, normalize_filters
+from wta_scrapper.utils import (DATA_DIR, get_date_ordinal, get_owner_key,
+                                get_player_key, split_results,
+                                write_json_atomically)
+
+DATASET_DIR = os.path.join(DATA_DIR, 'dataset')
+
+MANIFEST_NAME = 'manifest.json'
+
+PARTITION_NAME = 'part.json'
+
+# The year is taken from the date of the tournament and
+# the season from the year of the page it was scrapped from
+PARTITIONS = ('year', 'season')
+
+# Partition of the tournaments without a date or a season
+UNKNOWN_PARTITION = 'unknown'
+
+
+def _as_year(value):
+    try:
+        return int(str(value)[:4])
+    except ValueError:
+        return None
+
+
+def get_partition_value(details, partition_by='year'):
+    """
+    Return the year or the season of a tournament or `UNKNOWN_PARTITION`
+    when the tournament has no date or a date that was not parsed
+    """
+    value = details.get('year') if partition_by == 'season' else details.get('date')
+    if value is None:
+        return UNKNOWN_PARTITION
+
+    year = _as_year(value)
+    return UNKNOWN_PARTITION if year is None else year
+
+
+def get_partition_stats(tournaments):
+    """
+    Return the statistics of the manifest for the
+    tournaments of a partition. The dates that were not
+    parsed are left out of the first and last dates
+    """
+    dates = []
+    surfaces = set()
+    seasons = set()
+    rows = 0
+    for tournament in tournaments:
+        for details in tournament.values():
+            ordinal = get_date_ordinal(details.get('date'))
+            if ordinal:
+                dates.append(datetime.date.fromordinal(ordinal).isoformat())
+
+            if details.get('year') is not None:
+                seasons.add(_as_year(details['year']))
+            surfaces.add(details.get('surface'))
+            rows += len(details['matches'])
+    return {
+        'rows': rows,
+        'tournaments': len(tournaments),
+        'min_date': min(dates) if dates else None,
+        'max_date': max(dates) if dates else None,
+        'surfaces': sorted(item for item in surfaces if item is not None),
+        'seasons': sorted(item for item in seasons if item is not None)
+    }
+
+
+class Dataset:
+    """
+    Result files laid out in one folder per player and per year
+    or season. The tournaments without a date or a season are in
+    the partition named `UNKNOWN_PARTITION`. The manifest keeps the number of matches, the first
+    and last dates and the surfaces of each partition which means
+    that only the partitions that a query needs are read
+
+        dataset = Dataset()
+        dataset.write(scrapper.tournaments)
+
+        query = dataset.query(player='Eugenie Bouchard', year=2014)
+        query.filter(surface='Clay', year=2014)
+
+    Each partition is a regular result file which means that it can
+    also be read by `ChunkedQuery` when several players are needed
+
+    Parameters
+
+        root (str, optional): folder of the dataset. Defaults to data/dataset
+        partition_by (str, optional): year or season. Defaults to year
+    """
+    def __init__(self, root=DATASET_DIR, partition_by='year'):
+        if partition_by not in PARTITIONS:
+            raise ValueError(f'Unknown partition: {partition_by}')
+
+        self.root = root
+        self.partition_by = partition_by
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.manifest = {'partition_by': partition_by, 'partitions': {}}
+
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+
+            if self.manifest['partition_by'] != partition_by:
+                raise ValueError(
+                    f"The dataset of {root} is partitioned by {self.manifest['partition_by']}"
+                )
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.root}, {len(self)} partitions)'
+
+    def __len__(self):
+        return len(self.manifest['partitions'])
+
+    def __iter__(self):
+        return iter(self.manifest['partitions'].values())
+
+    @property
+    def players(self):
+        return sorted({entry['player'] for entry in self})
+
+    def _get_path(self, player, value):
+        return os.path.join(f'player={player}', f'{self.partition_by}={value}', PARTITION_NAME)
+
+    def _remove(self, path):
+        filename = os.path.abspath(os.path.join(self.root, path))
+        if os.path.exists(filename):
+            os.remove(filename)
+
+        directory = os.path.dirname(filename)
+        while directory != os.path.abspath(self.root) and not os.listdir(directory):
+            os.rmdir(directory)
+            directory = os.path.dirname(directory)
+
+    def write(self, values, player=None):
+        """
+        Write the tournaments of a result in the partitions of the
+        player. The previous partitions of the player are replaced
+
+        Parameters
+
+            values (list, Query, MatchScrapper): the result values
+            player (str, optional): the player when the metadata does not give it
+
+        Returns
+
+            list: the manifest entries of the partitions
+        """
+        tournaments, metadata = split_results(values)
+        player_key = get_owner_key(metadata) or get_player_key(name=player)
+        if player_key is None:
+            raise ValueError('Could not find the player of the values, pass it with player=')
+
+        groups = OrderedDict()
+        for tournament in tournaments:
+            for details in tournament.values():
+                value = get_partition_value(details, self.partition_by)
+                groups.setdefault(value, []).append(tournament)
+
+        os.makedirs(self.root, exist_ok=True)
+        partitions = self.manifest['partitions']
+        previous = {path for path, entry in partitions.items() if entry['player'] == player_key}
+
+        entries = []
+        for value, items in groups.items():
+            path = self._get_path(player_key, value)
+            filename = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            write_json_atomically(filename, [*items, metadata])
+
+            entry = {
+                'path': path,
+                'player': player_key,
+                'player_name': metadata.get('player_name', player),
+                self.partition_by: value,
+                **get_partition_stats(items)
+            }
+            partitions[path] = entry
+            previous.discard(path)
+            entries.append(entry)
+
+        for path in previous:
+            self._remove(path)
+            del partitions[path]
+
+        # The manifest is written last which means that an interrupted
+        # write leaves the partitions of the previous manifest readable
+        write_json_atomically(self.manifest_path, self.manifest)
+        return entries
+
+    def _accepts(self, entry, filters):
+        for name, value in filters:
+            values = value if isinstance(value, tuple) else (value,)
+            if name == 'player':
+                keys = {get_player_key(link=item, name=item) for item in values}
+                if entry['player'] not in keys:
+                    return False
+
+            elif name == 'year':
+                # The year column of Query is the season
+                # of the tournament and not its date
+                if not set(values).intersection(entry['seasons']):
+                    return False
+
+            elif name == 'surface':
+                if not set(values).intersection(entry['surfaces']):
+                    return False
+        return True
+
+    def partitions(self, **filters):
+        """
+        Return the manifest entries of the partitions that can contain
+        rows matching the filters. Only the player, year and surface
+        filters are used, the other filters keep every partition
+        """
+        filters = normalize_filters(**filters)
+        return [entry for entry in self if self._accepts(entry, filters)]
+
+    def filenames(self, **filters):
+        return [os.path.join(self.root, entry['path']) for entry in self.partitions(**filters)]
+
+    def load(self, **filters):
+        """
+        Return the tournaments of the partitions needed by the filters
+        as a result from the most recent tournament to the oldest
+        """
+        tournaments = []
+        metadata = {}
+        for filename in self.filenames(**filters):
+            with open(filename, 'r') as f:
+                items, metadata = split_results(json.load(f))
+            tournaments.extend(items)
+
+        tournaments.sort(
+            key=lambda item: str(list(item.values())[0]['date'] or ''),
+            reverse=True
+        )
+        return [*tournaments, metadata]
+
+    def query(self, **filters):
+        """
+        Return a `Query` on the partitions needed by the filters. The
+        filters only select partitions and should also be passed to
+        `Query.filter`. Use `chunked` for the data of several players
+        """
+        entries = self.partitions(**filters)
+        players = {entry['player'] for entry in entries}
+        if len(players) > 1:
+            raise ValueError(
+                f'The filters select {len(players)} players, a Query only contains one player'
+            )
+
+        if not entries:
+            raise ValueError('No partition matches the filters')
+        return Query(self.load(**filters))
+
+    def chunked(self, chunk_size=10000, **filters):
+        return ChunkedQuery(self.filenames(**filters), chunk_size=chunk_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write result files to a partitioned dataset')
+    parser.add_argument('filenames', type=str, nargs='+', help='The result files to add')
+    parser.add_argument('--root', type=str, default=DATASET_DIR, help='Folder of the dataset')
+    parser.add_argument('--partition-by', type=str, default='year', choices=PARTITIONS)
+    parsed_arguments = parser.parse_args()
+
+    dataset = Dataset(parsed_arguments.root, partition_by=parsed_arguments.partition_by)
+    for filename in parsed_arguments.filenames:
+        with open(filename, 'r') as f:
+            entries = dataset.write(json.load(f))
+        print(f'Wrote {len(entries)} partitions for {filename}')
@@ -0,0 +1,209 @@
+import re
+
+from wta_scrapper.players import PlayerIndex
+from wta_scrapper.score import split_sets
+from wta_scrapper.utils import (get_match_fingerprint, get_player_key,
+                                split_results)
+
+SCORE_REGEX = re.compile(r'^(?P<sets>[\d\-\s]*)(?P<rest>[A-Za-z].*)?$')
+
+
+def normalize_score(score, result=None):
+    """
+    Return the score from the point of view of the winner
+    without the tie break points so that the score of a match
+    is the same on the pages of both players
+
+        normalize_score('2-66-17-65', 'W') -> '2-6 6-1 7-6'
+        normalize_score('6-21-665-7', 'L') -> '2-6 6-1 7-6'
+    """
+    if not score:
+        return None
+
+    text = score.strip()
+    result_match = SCORE_REGEX.match(text)
+    if result_match is None:
+        return text
+
+    sets = split_sets(result_match.group('sets'))
+    if result == 'L':
+        sets = ['-'.join(reversed(item.split('-'))) for item in sets]
+
+    rest = result_match.group('rest')
+    if rest:
+        sets.append(rest.strip())
+    return ' '.join(sets) if sets else text
+
+
+def get_fingerprint(player, tournament, match, players=None):
+    """
+    Return the canonical fingerprint of a match which is the
+    same whichever player's page it was scraped from. With a
+    `PlayerIndex`, the player is a code and the opponent is resolved
+    to her code in the index, otherwise both are keys
+
+    Returns
+
+        tuple: (date, round, low player, high player, normalized score)
+        or None when the match has no opponent
+    """
+    if players is not None:
+        opponent = players.resolve(match.get('link'), name=match.get('opp_name'))
+    else:
+        opponent = get_player_key(link=match.get('link'), name=match.get('opp_name'))
+
+    if player is None or opponent is None:
+        return None
+
+    details = match['details']
+    return (
+        *get_match_fingerprint(tournament.get('date'), details.get('round'), player, opponent),
+        normalize_score(details.get('score'), details.get('result'))
+    )
+
+
+class Deduplicator:
+    """
+    Removes the matches that were already seen on another page,
+    usually the page of the opponent, in a single pass using a
+    hash of the fingerprint of each match
+
+    The players are resolved by `PlayerIndex.resolve` which means
+    that the owner of a page built with `player_name` gets the same
+    code as her link on the pages of her opponents
+
+    Parameters
+
+        players (PlayerIndex, optional): an existing index to share
+    """
+    def __init__(self, players=None):
+        self.players = players if players is not None else PlayerIndex()
+        # fingerprint -> code of the player whose
+        # page the match was first seen on
+        self.seen = {}
+        self.collisions = []
+        self.number_of_matches = 0
+        self.number_of_merges = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.seen)} matches, {len(self.collisions)} merged)'
+
+    def __len__(self):
+        return len(self.seen)
+
+    def filter(self, values, player=None):
+        """
+        Return a copy of the values without the matches that
+        were already seen. The metadata is kept at the end
+
+        Parameters
+
+            values (list, Query, MatchScrapper): the result values
+            player (str, optional): link, id or name of the player. Defaults
+            to the metadata of the result
+        """
+        tournaments, metadata = split_results(values)
+        name = None
+        if player is None:
+            player = metadata.get('player_link', metadata.get('player_id'))
+            name = metadata.get('player_name')
+        player = self.players.resolve(player, name=name)
+
+        result = []
+        for tournament in tournaments:
+            new_tournament = tournament.__class__()
+            for name, details in tournament.items():
+                matches = []
+                for match in details['matches']:
+                    if self.add(player, details, match):
+                        matches.append(match)
+                new_tournament[name] = {**details, 'matches': matches}
+            result.append(new_tournament)
+        result.append(metadata)
+        return result
+
+    def _find(self, fingerprint):
+        date, round, low, high, score = fingerprint
+        low, high = sorted((self.players.find(low), self.players.find(high)))
+        return (date, round, low, high, score)
+
+    def _apply_merges(self):
+        """
+        Move the fingerprints of the codes that were merged by
+        the index to the code in which they were merged
+        """
+        if self.number_of_merges == len(self.players.merged):
+            return
+
+        self.number_of_merges = len(self.players.merged)
+        self.seen = {
+            self._find(fingerprint): self.players.find(player)
+            for fingerprint, player in self.seen.items()
+        }
+
+    def add(self, player, tournament, match):
+        """
+        Register a match
+
+        Parameters
+
+            player (int): code of the player whose page the match is from
+
+        Returns
+
+            bool: False if the match is a duplicate
+        """
+        self.number_of_matches += 1
+        fingerprint = get_fingerprint(player, tournament, match, players=self.players)
+        if fingerprint is None:
+            return True
+
+        # The link of the opponent can merge the code of
+        # the player when she was only known by name
+        self._apply_merges()
+        player = self.players.find(player)
+        fingerprint = self._find(fingerprint)
+
+        try:
+            first_seen = self.seen[fingerprint]
+        except KeyError:
+            self.seen[fingerprint] = player
+            return True
+
+        self.collisions.append((fingerprint, first_seen, player))
+        return False
+
+    def report(self, limit=20):
+        """
+        Return a summary of the duplicates that were removed
+        """
+        return {
+            'matches': self.number_of_matches,
+            'unique': len(self.seen),
+            'merged': len(self.collisions),
+            'collisions': [
+                {
+                    'date': fingerprint[0],
+                    'round': fingerprint[1],
+                    'players': [self.players.key_for(fingerprint[2]), self.players.key_for(fingerprint[3])],
+                    'score': fingerprint[4],
+                    'kept_from': self.players.key_for(kept),
+                    'dropped_from': self.players.key_for(dropped)
+                }
+                for fingerprint, kept, dropped in self.collisions[:limit]
+            ]
+        }
+
+
+def deduplicate(*results):
+    """
+    Remove the mirrored matches from multiple results
+
+    Returns
+
+        tuple: (list of filtered results, report)
+    """
+    deduplicator = Deduplicator()
+    filtered = [deduplicator.filter(values) for values in results]
+    return filtered, deduplicator.report()
+
@@ -0,0 +1,236 @@
+import argparse
+import hashlib
+import json
+
+from wta_scrapper.utils import get_owner_key, get_player_key, split_results
+
+# Values that are assigned by position on
+# the page and change when tournaments are added
+UNSTABLE_FIELDS = ('id',)
+
+
+def get_hash(values):
+    """
+    Return a short hash of JSON serializable values
+    """
+    text = json.dumps(values, sort_keys=True, default=str)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _strip(values):
+    return {key: value for key, value in values.items() if key not in UNSTABLE_FIELDS}
+
+
+def get_tournament_key(details):
+    return f"{details.get('name')}|{details.get('date')}"
+
+
+def get_match_key(match):
+    details = match.get('details', {})
+    opponent = get_player_key(link=match.get('link'), name=match.get('opp_name'))
+    return f"{details.get('round')}|{opponent}"
+
+
+class Snapshot:
+    """
+    The hashes of the tournaments and of the matches of a result.
+    Tournaments are identified by their name and date and matches
+    by their round and opponent because the ids of the scrapper
+    change each time a tournament is added to the page
+    """
+    def __init__(self, values):
+        tournaments, self.metadata = split_results(values)
+        self.player = get_owner_key(self.metadata)
+        self.tournaments = {}
+        for tournament in tournaments:
+            for details in tournament.values():
+                matches = {}
+                seen = {}
+                for match in details.get('matches', []):
+                    key = get_match_key(match)
+                    # The same key can come back e.g. two byes in
+                    # qualifying which is why duplicates are numbered
+                    seen[key] = seen.get(key, 0) + 1
+                    if seen[key] > 1:
+                        key = f'{key}|{seen[key]}'
+                    matches[key] = (get_hash(_strip(match)), match)
+
+                header = _strip({
+                    key: value for key, value in details.items()
+                    if key not in ('matches', 'ranking')
+                })
+                self.tournaments[get_tournament_key(details)] = {
+                    'hash': get_hash([header, details.get('ranking'), [item[0] for item in matches.values()]]),
+                    'details': details,
+                    'matches': matches
+                }
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.player}, {len(self.tournaments)} tournaments)'
+
+    def __len__(self):
+        return len(self.tournaments)
+
+
+def _get_change(change_type, player, tournament, **values):
+    return {
+        'type': change_type,
+        'player': player,
+        'tournament': tournament.get('name'),
+        'date': str(tournament.get('date')),
+        **values
+    }
+
+
+def _get_match_values(match):
+    details = match.get('details', {})
+    return {
+        'round': details.get('round'),
+        'opponent': match.get('opp_name'),
+        'link': match.get('link')
+    }
+
+
+def diff(previous, current):
+    """
+    Compare the new result of a page with the previous snapshot. Only
+    the tournaments whose hash changed are compared match by match
+    which keeps the comparison linear in the size of the result
+
+    Parameters
+
+        previous (list, Snapshot, None): the previous result
+        current (list, Snapshot): the new result
+
+    Yields
+
+        dict: the changes e.g. {'type': 'score_corrected', 'player': ...,
+        'tournament': ..., 'date': ..., 'round': ..., 'before': ..., 'after': ...}
+    """
+    if previous is None:
+        previous = Snapshot([])
+    elif not isinstance(previous, Snapshot):
+        previous = Snapshot(previous)
+
+    if not isinstance(current, Snapshot):
+        current = Snapshot(current)
+    player = current.player or previous.player
+
+    for key, new in current.tournaments.items():
+        details = new['details']
+        old = previous.tournaments.get(key)
+        if old is None:
+            yield _get_change(
+                'tournament_added', player, details,
+                matches=len(new['matches']),
+                hash=new['hash']
+            )
+            for match_hash, match in new['matches'].values():
+                yield _get_change(
+                    'match_added', player, details,
+                    **_get_match_values(match),
+                    result=match['details'].get('result'),
+                    score=match['details'].get('score'),
+                    hash=match_hash
+                )
+            continue
+
+        if old['hash'] == new['hash']:
+            continue
+
+        if old['details'].get('ranking') != details.get('ranking'):
+            yield _get_change(
+                'ranking_updated', player, details,
+                before=old['details'].get('ranking'),
+                after=details.get('ranking')
+            )
+
+        for match_key, (match_hash, match) in new['matches'].items():
+            try:
+                old_hash, old_match = old['matches'][match_key]
+            except KeyError:
+                yield _get_change(
+                    'match_added', player, details,
+                    **_get_match_values(match),
+                    result=match['details'].get('result'),
+                    score=match['details'].get('score'),
+                    hash=match_hash
+                )
+                continue
+
+            if old_hash == match_hash:
+                continue
+
+            before = old_match['details']
+            after = match['details']
+            if (before.get('score'), before.get('result')) != (after.get('score'), after.get('result')):
+                change_type = 'score_corrected'
+                before = {'score': before.get('score'), 'result': before.get('result')}
+                after = {'score': after.get('score'), 'result': after.get('result')}
+            else:
+                change_type = 'match_updated'
+                before = _strip({key: value for key, value in old_match.items() if key != 'details'})
+                after = _strip({key: value for key, value in match.items() if key != 'details'})
+                before.update(old_match['details'])
+                after.update(match['details'])
+
+            yield _get_change(
+                change_type, player, details,
+                **_get_match_values(match),
+                before=before,
+                after=after,
+                hash=match_hash
+            )
+
+        for match_key, (match_hash, match) in old['matches'].items():
+            if match_key not in new['matches']:
+                yield _get_change(
+                    'match_removed', player, details,
+                    **_get_match_values(match),
+                    hash=match_hash
+                )
+
+    for key, old in previous.tournaments.items():
+        if key not in current.tournaments:
+            yield _get_change('tournament_removed', player, old['details'], hash=old['hash'])
+
+
+def write_changes(changes, path):
+    """
+    Append the changes to a JSON Lines feed
+
+    Returns
+
+        int: the number of changes that were written
+    """
+    count = 0
+    with open(path, 'a', encoding='utf-8') as f:
+        for change in changes:
+            f.write(json.dumps(change, default=str))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def read_changes(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Write the changes between two result files')
+    parser.add_argument('previous', type=str, help='The previous result file')
+    parser.add_argument('current', type=str, help='The new result file')
+    parser.add_argument('--output', type=str, default='changes.jsonl', help='The JSON Lines feed to append to')
+    parsed_arguments = parser.parse_args()
+
+    with open(parsed_arguments.previous, 'r') as f:
+        previous = json.load(f)
+
+    with open(parsed_arguments.current, 'r') as f:
+        current = json.load(f)
+
+    count = write_changes(diff(previous, current), parsed_arguments.output)
+    print(f'Wrote {count} changes to {parsed_arguments.output}')
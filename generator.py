@@ -0,0 +1,319 @@
+import argparse
+import datetime
+import random
+
+MONTHS = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+ROUNDS = ['R128', 'R64', 'R32', 'R16', 'Quarter', 'Semi', 'Final']
+
+QUALIFYING_ROUNDS = ['Qual. R1', 'Qual. R2', 'Qual. R3']
+
+TOURNAMENTS = [
+    ('Melbourne', 'Australia', 'Grand Slam', 'Hard'),
+    ('Paris', 'France', 'Grand Slam', 'Clay'),
+    ('Wimbledon', 'Great Britain', 'Grand Slam', 'Grass'),
+    ('Flushing Meadows', 'USA', 'Grand Slam', 'Hard'),
+    ('Indian Wells', 'USA', 'Premier Mandatory', 'Hard'),
+    ('Miami', 'USA', 'Premier Mandatory', 'Hard'),
+    ('Madrid', 'Spain', 'Premier Mandatory', 'Clay'),
+    ('Beijing', 'China', 'Premier Mandatory', 'Hard'),
+    ('Rome', 'Italy', 'Premier 5', 'Clay'),
+    ('Montreal', 'Canada', 'Premier 5', 'Hard'),
+    ('Cincinnati', 'USA', 'Premier 5', 'Hard'),
+    ('Sydney', 'Australia', 'Premier', 'Hard'),
+    ('Charleston', 'USA', 'Premier', 'Clay'),
+    ('Eastbourne', 'Great Britain', 'Premier', 'Grass'),
+    ('Linz', 'Austria', 'International', 'Hard'),
+    ('Acapulco', 'Mexico', 'International', 'Hard'),
+    ('Nurnberg', 'Germany', 'International', 'Clay'),
+    ('S-Hertogenbosch', 'Netherlands', 'International', 'Grass'),
+    ('Quebec City', 'Canada', 'International', 'Carpet'),
+    ('Singapore', 'Singapore', 'Finals', 'Hard')
+]
+
+FIRST_NAMES = [
+    'Anna', 'Maria', 'Elena', 'Sofia', 'Julia', 'Laura', 'Carla', 'Nadia',
+    'Petra', 'Ana', 'Simona', 'Serena', 'Venus', 'Karolina', 'Agnieszka', 'Eugenie'
+]
+
+LAST_NAMES = [
+    'Novak', 'Rossi', 'Kovac', 'Smith', 'Garcia', 'Muller', 'Ivanova', 'Petrova',
+    'Halep', 'Williams', 'Bouchard', 'Kerber', 'Wozniacki', 'Radwanska', 'Kvitova', 'Pliskova'
+]
+
+NATIONALITIES = ['USA', 'FRA', 'ESP', 'GER', 'ROU', 'RUS', 'CZE', 'CAN', 'AUS', 'SRB', 'POL', 'CHN']
+
+
+class PageGenerator:
+    """
+    Generates synthetic WTA activity pages with the same structure
+    as the real ones so that the parser can be tested and measured
+    at any scale. The same seed always generates the same page
+
+    Parameters
+
+        number_of_tournaments (int, optional): tournaments on the page. Defaults to 25
+        matches_per_tournament (tuple, optional): min and max matches of a tournament
+        number_of_players (int, optional): size of the pool of opponents
+        edge_cases (float, optional): probability of a Bye, Walkover or Retired
+        score and of a W/Q entry. Defaults to 0.05
+        missing_fields (float, optional): probability of a tournament with a missing
+        country or surface. Defaults to 0.02
+        start_date (datetime.date, optional): date of the most recent tournament
+        seed (int, optional): the random seed. Defaults to 42
+    """
+    def __init__(self, number_of_tournaments=25, matches_per_tournament=(1, 7),
+                 number_of_players=500, edge_cases=0.05, missing_fields=0.02,
+                 start_date=datetime.date(2020, 11, 1), seed=42):
+        self.number_of_tournaments = number_of_tournaments
+        self.matches_per_tournament = matches_per_tournament
+        self.edge_cases = edge_cases
+        self.missing_fields = missing_fields
+        self.start_date = start_date
+        self.seed = seed
+
+        self.random = random.Random(seed)
+        self.players = [self._create_player() for _ in range(number_of_players)]
+        self.tournaments = []
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(tournaments={self.number_of_tournaments}, seed={self.seed})'
+
+    def _create_player(self):
+        first_name = self.random.choice(FIRST_NAMES)
+        last_name = self.random.choice(LAST_NAMES)
+        player_id = self.random.randint(100000, 999999)
+        slug = f'{first_name}-{last_name}'.lower()
+        return {
+            'opp_name': f'{first_name} {last_name}',
+            'link': f'//www.wtatennis.com/players/{player_id}/{slug}',
+            'nationality': self.random.choice(NATIONALITIES)
+        }
+
+    def _is_edge_case(self):
+        return self.random.random() < self.edge_cases
+
+    def _create_set(self, won):
+        """
+        Returns a set as it appears on the page, the tie break
+        points following the games of the loser of the tie break
+        """
+        if self.random.random() < 0.15:
+            points = self.random.randint(0, 5)
+            return '7-6' + str(points) if won else '6' + str(points) + '-7'
+
+        games = self.random.choice([0, 1, 2, 3, 4, 5])
+        if games == 5:
+            return '7-5' if won else '5-7'
+        return f'6-{games}' if won else f'{games}-6'
+
+    def _create_score(self, won):
+        if self._is_edge_case():
+            if self.random.random() < 0.5:
+                return 'Walkover'
+            games = f'{self.random.randint(0, 5)}-{self.random.randint(0, 5)}'
+            return [self._create_set(won), games, ' Retired']
+
+        sets = [self._create_set(won)]
+        if self.random.random() < 0.35:
+            sets.append(self._create_set(not won))
+        sets.append(self._create_set(won))
+        return sets
+
+    def _create_matches(self, count, is_qualifier):
+        rounds = QUALIFYING_ROUNDS if is_qualifier else ROUNDS
+        rounds = rounds[max(0, len(rounds) - count):]
+        count = len(rounds)
+
+        matches = []
+        for i, round_name in enumerate(rounds):
+            # Only the last match of
+            # the tournament can be lost
+            is_last = i == count - 1
+            won = not is_last or self.random.random() < 0.2
+            if i == 0 and count > 1 and self._is_edge_case():
+                matches.append({
+                    'opp_name': None,
+                    'link': None,
+                    'nationality': None,
+                    'details': {'round': round_name, 'opp_rank': '-', 'result': '-', 'score': 'Bye'}
+                })
+                continue
+
+            player = self.random.choice(self.players)
+            matches.append({
+                **player,
+                'details': {
+                    'round': round_name,
+                    'opp_rank': str(self.random.randint(1, 300)),
+                    'result': 'W' if won else 'L',
+                    'score': self._create_score(won)
+                }
+            })
+        # Most recent match first
+        matches.reverse()
+        return matches
+
+    def generate_tournament(self, index):
+        name, country, level, surface = self.random.choice(TOURNAMENTS)
+        end_date = self.start_date - datetime.timedelta(weeks=index)
+
+        if self.random.random() < self.missing_fields:
+            if self.random.random() < 0.5:
+                country = None
+            else:
+                surface = None
+
+        is_qualifier = self._is_edge_case()
+        entered_as = None
+        seed_title = None
+        if is_qualifier:
+            entered_as, seed_title = 'Q', 'Qualifier'
+        elif self._is_edge_case():
+            entered_as, seed_title = 'W', 'Wildcard'
+        elif self.random.random() < 0.3:
+            entered_as = self.random.randint(1, 32)
+
+        low, high = self.matches_per_tournament
+        count = self.random.randint(low, high)
+        return {
+            'name': name,
+            'country': country,
+            'date': end_date,
+            'type': level,
+            'surface': surface,
+            'matches': self._create_matches(count, is_qualifier),
+            'ranking': {
+                'rank': self.random.randint(1, 300),
+                'entered_as': entered_as,
+                'seed_title': seed_title
+            }
+        }
+
+    def render_tournament(self, tournament):
+        end_date = tournament['date']
+        start_date = end_date - datetime.timedelta(days=6)
+        dates = (
+            f'{MONTHS[start_date.month - 1]} {start_date.day}-'
+            f'{MONTHS[end_date.month - 1]} {end_date.day}, {end_date.year}'
+        )
+
+        title = tournament['name']
+        if tournament['country'] is not None:
+            title = f'{title}, {tournament["country"]}'
+
+        values = [tournament['type'], '$250,000']
+        if tournament['surface'] is not None:
+            values.append(tournament['surface'])
+        meta = ''.join(
+            f'<span class="player-matches__tournament-label">Label</span>'
+            f'<span class="player-matches__tournament-value">{value}</span>'
+            for value in values
+        )
+
+        html = [
+            '<div class="player-matches__tournament">',
+            '<div class="player-matches__tournament-header">',
+            f'<h2 class="player-matches__tournament-title">{tournament["name"]}</h2>',
+            f'<div class="player-matches__tournament-locdate"><span>{title}</span><span>{dates}</span></div>',
+            f'<div class="player-matches__tournament-meta">{meta}</div>',
+            '</div>',
+            '<table class="player-matches__match-table"><tbody>'
+        ]
+
+        for match in tournament['matches']:
+            details = match['details']
+            opponent = ''
+            if match['link'] is not None:
+                opponent = (
+                    f'<img class="flag" alt="{match["nationality"]}" src="/flags/{match["nationality"]}.svg">'
+                    f'<a class="player-matches__match-opponent-link" href="{match["link"]}" '
+                    f'title="{match["opp_name"]}">{match["opp_name"]}</a>'
+                )
+
+            score = details['score']
+            if isinstance(score, list):
+                score = ''.join(f'<span>{item}</span>' for item in score)
+
+            html.append(
+                '<tr class="player-matches__match">'
+                f'<td><div class="player-matches__match-round"><div>{details["round"]}</div></div></td>\n'
+                f'<td class="player-matches__match-opponent">{opponent}</td>\n'
+                f'<td class="player-matches__match-rank">{details["opp_rank"]}</td>\n'
+                f'<td class="player-matches__match-result">{details["result"]}</td>\n'
+                f'<td class="player-matches__match-score">{score}</td>'
+                '</tr>'
+            )
+
+        ranking = ranking_seed = ''
+        if tournament['ranking']['rank'] is not None:
+            ranking = tournament['ranking']['rank']
+
+        entered_as = tournament['ranking']['entered_as']
+        if entered_as is not None:
+            title = tournament['ranking']['seed_title'] or ''
+            ranking_seed = f' title="{title}"' if title else ''
+            entered_as = str(entered_as)
+        else:
+            entered_as = ''
+
+        html.extend([
+            '</tbody></table>',
+            '<div class="player-matches__tournament-footer">',
+            f'<span class="player-matches__tournament-label">Rank:</span><span class="player-matches__tournament-value">{ranking}</span>',
+            f'<span class="player-matches__tournament-label">Seed:</span><span class="player-matches__tournament-value"{ranking_seed}>{entered_as}</span>',
+            '</div>',
+            '</div>'
+        ])
+        return '\n'.join(html)
+
+    def render(self):
+        """
+        Generate the tournaments and return the full HTML page
+        """
+        self.random.seed(self.seed)
+        self.tournaments = [
+            self.generate_tournament(i)
+            for i in range(self.number_of_tournaments)
+        ]
+
+        html = [
+            '<!DOCTYPE html><html><head><title>Player Matches</title></head><body>',
+            '<div class="player-matches">'
+        ]
+        for tournament in self.tournaments:
+            html.append(self.render_tournament(tournament))
+        html.append('</div></body></html>')
+        return '\n'.join(html)
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            f.write(self.render())
+        return path
+
+    @property
+    def number_of_matches(self):
+        return sum(len(tournament['matches']) for tournament in self.tournaments)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Generate a synthetic WTA activity page')
+    parser.add_argument('-o', '--output', type=str, required=True, help='The HTML file to write')
+    parser.add_argument('--tournaments', type=int, default=25, help='Number of tournaments on the page')
+    parser.add_argument('--max-matches', type=int, default=7, help='Maximum number of matches in a tournament')
+    parser.add_argument('--players', type=int, default=500, help='Size of the pool of opponents')
+    parser.add_argument('--edge-cases', type=float, default=0.05, help='Probability of an edge case')
+    parser.add_argument('--missing-fields', type=float, default=0.02, help='Probability of a missing field')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed')
+    parsed_arguments = parser.parse_args()
+
+    generator = PageGenerator(
+        number_of_tournaments=parsed_arguments.tournaments,
+        matches_per_tournament=(1, parsed_arguments.max_matches),
+        number_of_players=parsed_arguments.players,
+        edge_cases=parsed_arguments.edge_cases,
+        missing_fields=parsed_arguments.missing_fields,
+        seed=parsed_arguments.seed
+    )
+    generator.write(parsed_arguments.output)
+    print(f'Wrote {generator.number_of_tournaments} tournaments and {generator.number_of_matches} matches to {parsed_arguments.output}')
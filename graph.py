@@ -0,0 +1,400 @@
+import argparse
+import json
+import time
+
+import numpy
+
+from wta_scrapper.h2h import SKIPPED_SCORES
+from wta_scrapper.players import PlayerIndex
+from wta_scrapper.ratings import ROUNDS, SURFACES, generate_matches
+from wta_scrapper.utils import (get_data_file, get_date_ordinal, iter_matches,
+                                split_results)
+
+RESULTS = {'W': 1, 'L': -1}
+
+
+class PlayerGraph:
+    """
+    Graph of the players of the corpus in which an edge links two
+    players that played each other. The edges are stored in compressed
+    sparse row format: the edges of the player with the code `i` are
+    `indices[indptr[i]:indptr[i + 1]]` and each edge has the result
+    from the point of view of that player, the surface and the date
+    of the match. Each match gives an edge in both directions
+
+        graph = PlayerGraph.from_files('eugenie_bouchard', 'simona_halep')
+        graph.common_neighbours('328560', '314320', surface='Clay')
+        graph.shortest_path('328560', '314320', result='W')
+
+    The matches are buffered by `add` and the arrays are rebuilt
+    on the first query that follows. The owner of a page built without
+    `player_link` is resolved by `PlayerIndex.resolve` to the same code
+    as the links of the pages of her opponents
+
+    Parameters
+
+        players (PlayerIndex, optional): an existing index to share
+        surfaces (tuple, optional): the surfaces that are encoded
+    """
+    def __init__(self, players=None, surfaces=SURFACES):
+        self.players = players if players is not None else PlayerIndex()
+        self.surfaces = tuple(surfaces)
+        self.fingerprints = set()
+        # Number of merges of the index applied to
+        # the fingerprints and to the arrays
+        self.number_of_merges = 0
+        self.merges_built = 0
+        self.pending = []
+
+        self.indptr = numpy.zeros(1, dtype='int64')
+        self.indices = numpy.empty(0, dtype='int32')
+        self.results = numpy.empty(0, dtype='int8')
+        self.edge_surfaces = numpy.empty(0, dtype='int8')
+        self.dates = numpy.empty(0, dtype='int32')
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.players.number_of_players} players, {self.number_of_matches} matches)'
+
+    @property
+    def number_of_matches(self):
+        self._build()
+        return len(self.indices) // 2
+
+    @classmethod
+    def from_files(cls, *filenames, **kwargs):
+        instance = cls(**kwargs)
+        for name in filenames:
+            if not name.endswith('json'):
+                name = f'{name}.json'
+            with open(get_data_file(name), 'r') as f:
+                instance.add(json.load(f))
+        return instance
+
+    def _get_surface(self, surface):
+        try:
+            return self.surfaces.index(surface)
+        except ValueError:
+            return -1
+
+    def _get_code(self, player):
+        code = self.players.resolve(player, create=False)
+        if code is None:
+            raise KeyError(f'{player} is not in the graph')
+        return code
+
+    def _apply_merges(self):
+        """
+        Move the fingerprints of the codes that were merged by the
+        index to the code in which they were merged. The edges are
+        moved when the arrays are rebuilt
+        """
+        if self.number_of_merges == len(self.players.merged):
+            return
+
+        self.number_of_merges = len(self.players.merged)
+        fingerprints = set()
+        for date, round, low, high in self.fingerprints:
+            low, high = sorted((self.players.find(low), self.players.find(high)))
+            fingerprints.add((date, round, low, high))
+        self.fingerprints = fingerprints
+
+    def add(self, values, player=None):
+        """
+        Add the matches of a result. Matches that were already added,
+        from this page or from the opponent's page, and matches that
+        were not played are left out
+
+        Parameters
+
+            values (list, Query, MatchScrapper): the result values
+            player (str, optional): link, id or name of the player
+            to whom the values belong. Defaults to the metadata of the result
+
+        Returns
+
+            int: the number of matches that were added
+        """
+        _, metadata = split_results(values)
+        name = None
+        if player is None:
+            player = metadata.get('player_link', metadata.get('player_id'))
+            name = metadata.get('player_name')
+
+        player = self.players.resolve(player, name=name)
+        if player is None:
+            raise ValueError(
+                'Could not determine the player for these values. '
+                "Provide 'player' or build the values with 'player_name'"
+            )
+
+        items = []
+        for tournament, match in iter_matches(values):
+            details = match['details']
+            result = RESULTS.get(details.get('result'))
+            if result is None:
+                continue
+
+            score = details.get('score')
+            if score is not None and score.startswith(SKIPPED_SCORES):
+                continue
+
+            opponent = self.players.resolve(match['link'], name=match['opp_name'])
+            if opponent is None:
+                continue
+
+            # The link of the opponent can merge the code of
+            # the player when she was only known by name
+            self._apply_merges()
+            player = self.players.find(player)
+            if opponent == player:
+                continue
+
+            date = get_date_ordinal(tournament.get('date'))
+            fingerprint = (date, ROUNDS.get(details.get('round'), 0), min(player, opponent), max(player, opponent))
+            if fingerprint in self.fingerprints:
+                continue
+            self.fingerprints.add(fingerprint)
+
+            winner, loser = (player, opponent) if result == 1 else (opponent, player)
+            items.append((winner, loser, self._get_surface(tournament.get('surface')), date))
+
+        if items:
+            winners, losers, surfaces, dates = numpy.array(items, dtype='int64').T
+            self.update(winners, losers, surfaces=surfaces, dates=dates)
+        return len(items)
+
+    def update(self, winners, losers, surfaces=None, dates=None):
+        """
+        Add a batch of matches given as arrays of player codes. This
+        is also how the matches of `generate_matches` are added
+        """
+        winners = numpy.asarray(winners, dtype='int32')
+        losers = numpy.asarray(losers, dtype='int32')
+        if surfaces is None:
+            surfaces = numpy.full(len(winners), -1)
+        if dates is None:
+            dates = numpy.zeros(len(winners))
+
+        self.pending.append((
+            winners,
+            losers,
+            numpy.asarray(surfaces, dtype='int8'),
+            numpy.asarray(dates, dtype='int32')
+        ))
+        return len(winners)
+
+    def _build(self):
+        size = len(self.players)
+        merges = list(self.players.merged)
+        if not self.pending and len(self.indptr) == size + 1 and self.merges_built == len(merges):
+            return
+        self.merges_built = len(merges)
+
+        # Recover the sources of the existing edges
+        # so that they are sorted with the new ones
+        sources = [numpy.repeat(numpy.arange(len(self.indptr) - 1, dtype='int32'), numpy.diff(self.indptr))]
+        targets = [self.indices]
+        results = [self.results]
+        surfaces = [self.edge_surfaces]
+        dates = [self.dates]
+        for winners, losers, match_surfaces, match_dates in self.pending:
+            sources.extend([winners, losers])
+            targets.extend([losers, winners])
+            results.extend([numpy.ones(len(winners), dtype='int8'), numpy.full(len(losers), -1, dtype='int8')])
+            surfaces.extend([match_surfaces, match_surfaces])
+            dates.extend([match_dates, match_dates])
+        self.pending = []
+
+        # The edges of the codes that were merged
+        # move to the code in which they were merged
+        codes = numpy.arange(size, dtype='int32')
+        for code in merges:
+            codes[code] = self.players.find(code)
+
+        sources = codes[numpy.concatenate(sources)]
+        order = numpy.lexsort((numpy.concatenate(dates), sources))
+        self.indices = codes[numpy.concatenate(targets)][order]
+        self.results = numpy.concatenate(results)[order]
+        self.edge_surfaces = numpy.concatenate(surfaces)[order]
+        self.dates = numpy.concatenate(dates)[order]
+
+        counts = numpy.bincount(sources, minlength=size)
+        self.indptr = numpy.zeros(size + 1, dtype='int64')
+        numpy.cumsum(counts, out=self.indptr[1:])
+
+    def _get_edges(self, codes):
+        """
+        Return the positions of the edges of the players and
+        the player from which each edge starts
+        """
+        codes = numpy.asarray(codes, dtype='int64')
+        starts = self.indptr[codes]
+        counts = self.indptr[codes + 1] - starts
+        offsets = numpy.cumsum(counts) - counts
+        edges = numpy.arange(counts.sum()) + numpy.repeat(starts - offsets, counts)
+        return edges, numpy.repeat(codes, counts)
+
+    def _filter_edges(self, edges, result=None, surface=None, since=None, until=None):
+        mask = numpy.ones(len(edges), dtype='bool')
+        if result is not None:
+            mask &= self.results[edges] == RESULTS[result]
+
+        if surface is not None:
+            mask &= self.edge_surfaces[edges] == self._get_surface(surface)
+
+        if since is not None:
+            mask &= self.dates[edges] >= get_date_ordinal(since)
+
+        if until is not None:
+            mask &= self.dates[edges] <= get_date_ordinal(until)
+        return mask
+
+    def neighbour_codes(self, player, **filters):
+        """
+        Return the sorted codes of the opponents of a player. The
+        filters select the matches: result (W or L from the point of
+        view of the player), surface, since and until
+        """
+        self._build()
+        edges, _ = self._get_edges([self._get_code(player)])
+        edges = edges[self._filter_edges(edges, **filters)]
+        return numpy.unique(self.indices[edges])
+
+    def neighbours(self, player, **filters):
+        """
+        Return the keys of the opponents of a player
+
+            graph.neighbours('328560', result='W', surface='Grass')
+        """
+        return [self.players.key_for(code) for code in self.neighbour_codes(player, **filters).tolist()]
+
+    def common_neighbours(self, player, other, **filters):
+        """
+        Return the keys of the opponents that both players faced
+        """
+        codes = numpy.intersect1d(
+            self.neighbour_codes(player, **filters),
+            self.neighbour_codes(other, **filters),
+            assume_unique=True
+        )
+        return [self.players.key_for(code) for code in codes.tolist()]
+
+    def degrees(self, **filters):
+        """
+        Return the number of matches of each player as an array
+        indexed by the codes of the players
+        """
+        self._build()
+        if not filters:
+            return numpy.diff(self.indptr)
+
+        edges = numpy.arange(len(self.indices))
+        sources = numpy.repeat(numpy.arange(len(self.indptr) - 1), numpy.diff(self.indptr))
+        mask = self._filter_edges(edges, **filters)
+        return numpy.bincount(sources[mask], minlength=len(self.indptr) - 1)
+
+    def bfs(self, player, max_depth=None, **filters):
+        """
+        Explore the graph level by level from a player. Each level
+        is computed from the edges of the whole frontier at once. With
+        result='W' only the players that were beaten are followed
+        which gives the transitive wins of the player
+
+        Returns
+
+            tuple: (distances, parents) as arrays indexed by the codes of
+            the players with -1 for the players that were not reached
+        """
+        self._build()
+        size = len(self.indptr) - 1
+        source = self._get_code(player)
+        distances = numpy.full(size, -1, dtype='int32')
+        parents = numpy.full(size, -1, dtype='int32')
+        distances[source] = 0
+
+        frontier = numpy.array([source], dtype='int64')
+        depth = 0
+        while len(frontier) and (max_depth is None or depth < max_depth):
+            edges, sources = self._get_edges(frontier)
+            mask = self._filter_edges(edges, **filters)
+            targets = self.indices[edges[mask]]
+            sources = sources[mask]
+
+            is_new = distances[targets] == -1
+            frontier, first = numpy.unique(targets[is_new], return_index=True)
+            depth += 1
+            distances[frontier] = depth
+            parents[frontier] = sources[is_new][first]
+        return distances, parents
+
+    def reachable(self, player, max_depth=None, **filters):
+        """
+        Return the keys of the players reached from a player
+        with their distance e.g. {'314320': 1, ...}
+        """
+        distances, _ = self.bfs(player, max_depth=max_depth, **filters)
+        codes = numpy.flatnonzero(distances > 0)
+        return {self.players.key_for(code): int(distances[code]) for code in codes.tolist()}
+
+    def shortest_path(self, player, other, max_depth=None, **filters):
+        """
+        Return the keys of the players on a shortest path between two
+        players or None. With result='W' each player of the path beat
+        the next one
+
+        Returns
+
+            list: the keys from player to other
+        """
+        distances, parents = self.bfs(player, max_depth=max_depth, **filters)
+        code = self._get_code(other)
+        if distances[code] == -1:
+            return None
+
+        path = [code]
+        while parents[code] != -1:
+            code = int(parents[code])
+            path.append(code)
+        return [self.players.key_for(item) for item in reversed(path)]
+
+
+def benchmark(number_of_matches=1_000_000, number_of_players=2000, seed=42):
+    """
+    Time the construction of the graph and the queries
+    on a synthetic corpus
+    """
+    _, _, winners, losers, surfaces = generate_matches(number_of_matches, number_of_players, seed=seed)
+    graph = PlayerGraph()
+    for i in range(number_of_players):
+        graph.players.add(str(i))
+
+    start = time.perf_counter()
+    graph.update(winners, losers, surfaces=surfaces)
+    graph._build()
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(100):
+        graph.common_neighbours(str(i), str(i + 1), surface='Clay')
+    common_neighbours = (time.perf_counter() - start) / 100
+
+    start = time.perf_counter()
+    graph.bfs('0', result='W')
+    bfs = time.perf_counter() - start
+    return {
+        'matches': number_of_matches,
+        'players': number_of_players,
+        'build_seconds': round(build, 3),
+        'common_neighbours_seconds': round(common_neighbours, 6),
+        'bfs_seconds': round(bfs, 3)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the player graph on a synthetic corpus')
+    parser.add_argument('--matches', type=int, default=1_000_000, help='Number of matches to generate')
+    parser.add_argument('--players', type=int, default=2000, help='Number of players to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Seed used to generate the matches')
+    parsed_arguments = parser.parse_args()
+
+    print(benchmark(parsed_arguments.matches, parsed_arguments.players, seed=parsed_arguments.seed))
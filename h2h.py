@@ -0,0 +1,286 @@
+import json
+from collections import defaultdict
+
+import numpy
+
+from wta_scrapper.players import PlayerIndex
+from wta_scrapper.utils import (get_data_file, get_match_fingerprint,
+                                get_owner_key, iter_matches, split_results)
+
+# Scores for which no match was actually
+# played between the two players
+SKIPPED_SCORES = ('Bye', 'Walkover')
+
+
+class HeadToHead:
+    """
+    Head to head records between every player of the scraped
+    corpus. Each pair of players is stored once, using the
+    interned codes of the players, with the wins of each side
+    broken down by surface and year
+
+    Parameters
+
+        players (PlayerIndex, optional): an existing index to share
+    """
+    def __init__(self, players=None):
+        self.players = players if players is not None else PlayerIndex()
+        # (low, high) -> {(surface, year): [low wins, high wins]}
+        self.records = defaultdict(dict)
+        self.opponents = defaultdict(set)
+        # (low, high) -> {(date, round), ...}
+        self.fingerprints = defaultdict(set)
+        self.number_of_merges = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.players.number_of_players} players, {len(self)} pairs)'
+
+    def __len__(self):
+        return len(self.records)
+
+    def __contains__(self, pair):
+        return self._get_pair(*pair) in self.records
+
+    @classmethod
+    def from_files(cls, *filenames):
+        """
+        Build the head to head records from result files
+        located in the data folder
+        """
+        instance = cls()
+        for name in filenames:
+            if not name.endswith('json'):
+                name = f'{name}.json'
+            with open(get_data_file(name), 'r') as f:
+                instance.add(json.load(f))
+        return instance
+
+    def _get_code(self, player, name=None, create=False):
+        code = self.players.resolve(player, name=name, create=create)
+        self._apply_merges()
+        return code
+
+    def _apply_merges(self):
+        """
+        Move the records of the codes that were merged by
+        the index to the code in which they were merged
+        """
+        merges = list(self.players.merged.items())[self.number_of_merges:]
+        self.number_of_merges += len(merges)
+        for old, _ in merges:
+            new = self.players.find(old)
+            for opponent in self.opponents.pop(old, set()):
+                self.opponents[opponent].discard(old)
+                old_pair = (old, opponent) if old < opponent else (opponent, old)
+                records = self.records.pop(old_pair, {})
+                fingerprints = self.fingerprints.pop(old_pair, set())
+                if opponent == new:
+                    continue
+
+                pair = (new, opponent) if new < opponent else (opponent, new)
+                # The side of the merged player can change
+                # when the codes are ordered again
+                flip = (old_pair[0] == old) != (pair[0] == new)
+                for key, (low_wins, high_wins) in records.items():
+                    counts = self.records[pair].setdefault(key, [0, 0])
+                    counts[0] += high_wins if flip else low_wins
+                    counts[1] += low_wins if flip else high_wins
+
+                self.fingerprints[pair].update(fingerprints)
+                self.opponents[new].add(opponent)
+                self.opponents[opponent].add(new)
+
+    def _get_pair(self, player, opponent):
+        lhs = self._get_code(player)
+        rhs = self._get_code(opponent)
+        if lhs is None or rhs is None:
+            return None
+        return (lhs, rhs) if lhs < rhs else (rhs, lhs)
+
+    def add(self, values, player=None):
+        """
+        Add the matches of a result to the records. Matches that
+        were already added, from this page or from the opponent's
+        page, are ignored which allows incremental updates
+
+        Parameters
+
+            values (list, Query, MatchScrapper): the result values
+            player (str, optional): link, id or name of the player
+            to whom the values belong. Defaults to the metadata of the result
+
+        Returns
+
+            int: the number of matches that were added
+        """
+        _, metadata = split_results(values)
+        if player is None:
+            player = get_owner_key(metadata)
+
+        if player is None:
+            raise ValueError(
+                'Could not determine the player for these values. '
+                "Provide 'player' or build the values with 'player_name'"
+            )
+
+        added = 0
+        for tournament, match in iter_matches(values):
+            added += self.add_match(
+                player,
+                match['link'] or match['opp_name'],
+                match['details'].get('result'),
+                surface=tournament.get('surface'),
+                year=tournament.get('year'),
+                score=match['details'].get('score'),
+                date=tournament.get('date'),
+                round=match['details'].get('round'),
+                opponent_name=match['opp_name']
+            )
+        return added
+
+    def add_match(self, player, opponent, result, surface=None,
+                  year=None, score=None, date=None, round=None, opponent_name=None):
+        """
+        Add a single match to the records. The name of the opponent
+        is used to recognize the owner of a page built without a link
+
+        Returns
+
+            int: 1 if the match was added otherwise 0
+        """
+        if opponent is None or result not in ('W', 'L'):
+            return 0
+
+        if score is not None and score.startswith(SKIPPED_SCORES):
+            return 0
+
+        rhs = self._get_code(opponent, name=opponent_name, create=True)
+        lhs = self._get_code(player, create=True)
+        # The opponent can merge the code of the player
+        rhs = self.players.find(rhs)
+        if lhs == rhs:
+            return 0
+
+        low, high = (lhs, rhs) if lhs < rhs else (rhs, lhs)
+        if date is not None:
+            fingerprint = get_match_fingerprint(date, round, lhs, rhs)
+            if fingerprint[:2] in self.fingerprints[(low, high)]:
+                return 0
+            self.fingerprints[(low, high)].add(fingerprint[:2])
+
+        winner = lhs if result == 'W' else rhs
+        counts = self.records[(low, high)].setdefault((surface, year), [0, 0])
+        counts[0 if winner == low else 1] += 1
+
+        self.opponents[lhs].add(rhs)
+        self.opponents[rhs].add(lhs)
+        return 1
+
+    def record(self, player, opponent, surface=None, year=None):
+        """
+        Return the head to head record of a player against
+        an opponent, optionally for a given surface or year
+
+        Parameters
+
+            player (str): link, id or name of the player
+            opponent (str): link, id or name of the opponent
+
+        Returns
+
+            dict: {'wins': ..., 'losses': ...}
+        """
+        pair = self._get_pair(player, opponent)
+        wins = losses = 0
+        if pair is not None and pair in self.records:
+            is_low = self._get_code(player) == pair[0]
+            for (match_surface, match_year), counts in self.records[pair].items():
+                if surface is not None and match_surface != surface:
+                    continue
+
+                if year is not None and match_year != year:
+                    continue
+
+                wins += counts[0] if is_low else counts[1]
+                losses += counts[1] if is_low else counts[0]
+        return {'wins': wins, 'losses': losses}
+
+    def breakdown(self, player, opponent):
+        """
+        Return the head to head record of a player against
+        an opponent for each surface and year in which they played
+
+        Returns
+
+            dict: {(surface, year): {'wins': ..., 'losses': ...}}
+        """
+        pair = self._get_pair(player, opponent)
+        if pair is None or pair not in self.records:
+            return {}
+
+        is_low = self._get_code(player) == pair[0]
+        result = {}
+        for key, (low_wins, high_wins) in self.records[pair].items():
+            wins, losses = (low_wins, high_wins) if is_low else (high_wins, low_wins)
+            result[key] = {'wins': wins, 'losses': losses}
+        return result
+
+    def get_opponents(self, player):
+        """
+        Return the keys of every opponent the player has faced
+        """
+        code = self._get_code(player)
+        if code is None:
+            return []
+        return [self.players.key_for(item) for item in sorted(self.opponents[code])]
+
+    def to_coo(self, surface=None, year=None):
+        """
+        Return the wins matrix in coordinate format where
+        `wins[i]` is the number of times `rows[i]` beat `columns[i]`
+
+        Returns
+
+            tuple: (rows, columns, wins) as numpy arrays
+        """
+        rows = []
+        columns = []
+        wins = []
+        for (low, high), items in self.records.items():
+            low_wins = high_wins = 0
+            for (match_surface, match_year), counts in items.items():
+                if surface is not None and match_surface != surface:
+                    continue
+
+                if year is not None and match_year != year:
+                    continue
+
+                low_wins += counts[0]
+                high_wins += counts[1]
+
+            if low_wins:
+                rows.append(low)
+                columns.append(high)
+                wins.append(low_wins)
+
+            if high_wins:
+                rows.append(high)
+                columns.append(low)
+                wins.append(high_wins)
+
+        return (
+            numpy.array(rows, dtype='int32'),
+            numpy.array(columns, dtype='int32'),
+            numpy.array(wins, dtype='int32')
+        )
+
+    def to_dense(self, surface=None, year=None):
+        """
+        Return the wins matrix as a dense numpy array. This should
+        only be used on a small number of players
+        """
+        size = len(self.players)
+        matrix = numpy.zeros((size, size), dtype='int32')
+        rows, columns, wins = self.to_coo(surface=surface, year=year)
+        matrix[rows, columns] = wins
+        return matrix
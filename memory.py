@@ -0,0 +1,78 @@
+import tracemalloc
+
+
+class MemoryLimitExceeded(MemoryError):
+    pass
+
+
+class MemoryTracker:
+    """
+    Measures the memory allocated while a page is processed
+    with tracemalloc and optionally fails when it goes above
+    a ceiling. The values are relative to the memory that was
+    allocated when the tracker was started
+
+    Pages should be processed one after the other in the
+    process for the peaks to be those of each page
+
+    Parameters
+
+        limit (int, optional): maximum number of bytes for the page
+    """
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.baseline = 0
+        self.started_tracing = False
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(limit={self.limit})'
+
+    @property
+    def is_running(self):
+        return tracemalloc.is_tracing()
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        tracemalloc.reset_peak()
+        self.baseline, _ = tracemalloc.get_traced_memory()
+
+    def current(self):
+        current, _ = tracemalloc.get_traced_memory()
+        return max(current - self.baseline, 0)
+
+    def check(self):
+        """
+        Raise MemoryLimitExceeded if the page uses more
+        memory than the limit
+        """
+        if self.limit is None:
+            return
+
+        current = self.current()
+        if current > self.limit:
+            raise MemoryLimitExceeded(
+                f'The page uses {current} bytes which is more than the limit of {self.limit} bytes'
+            )
+
+    def stop(self):
+        """
+        Stop measuring and return the memory used by the page
+
+        Returns
+
+            dict: {'current': bytes, 'peak': bytes, 'limit': bytes}
+        """
+        if not tracemalloc.is_tracing():
+            return {'current': 0, 'peak': 0, 'limit': self.limit}
+
+        current, peak = tracemalloc.get_traced_memory()
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+        return {
+            'current': max(current - self.baseline, 0),
+            'peak': max(peak - self.baseline, 0),
+            'limit': self.limit
+        }
@@ -0,0 +1,256 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import wraps
+
+# Upper bounds in seconds of the latency buckets
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+    0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+
+
+class Histogram:
+    """
+    Latency histogram with fixed buckets. Recording a value
+    is a binary search and two additions
+
+    Parameters
+
+        buckets (tuple, optional): upper bounds of the buckets
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # The last bucket holds the values
+        # above the highest upper bound
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0
+        self.max = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(count={self.count}, sum={self.sum})'
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        """
+        Add the values recorded by another histogram
+        with the same buckets e.g. in another process
+        """
+        if other.buckets != self.buckets:
+            raise ValueError('Only histograms with the same buckets can be merged')
+
+        self.counts = [lhs + rhs for lhs, rhs in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q):
+        """
+        Return the upper bound of the bucket that
+        contains the given quantile
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        total = 0
+        for i, count in enumerate(self.counts):
+            total += count
+            if total >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max
+        return self.max
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'max': round(self.max, 6),
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([*map(str, self.buckets), '+Inf'], self.counts))
+        }
+
+
+class Metrics:
+    """
+    Counters and latency histograms for each stage of
+    the scraping pipeline
+
+    Stages: read, build, header, matches, footer, finalize, write
+
+    Counters: pages, tournaments, matches, missing_fields,
+    parse_failures, empty_pages, files_written
+
+    Parameters
+
+        enabled (bool, optional): record the metrics. Defaults to True
+        buckets (tuple, optional): upper bounds of the latency buckets
+    """
+    def __init__(self, enabled=True, buckets=DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({dict(self.counters)})'
+
+    def reset(self):
+        with self._lock:
+            self.counters = defaultdict(int)
+            self.histograms = {}
+            self.started_at = time.time()
+
+    def increment(self, name, value=1):
+        if self.enabled:
+            with self._lock:
+                self.counters[name] += value
+
+    def observe(self, stage, seconds):
+        if self.enabled:
+            with self._lock:
+                try:
+                    histogram = self.histograms[stage]
+                except KeyError:
+                    histogram = self.histograms[stage] = Histogram(self.buckets)
+                histogram.observe(seconds)
+
+    @contextmanager
+    def time(self, stage):
+        """
+        Record the time spent in the block for the given stage
+        """
+        if not self.enabled:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def export(self):
+        """
+        Return the counters and histograms in a picklable form
+        that can be sent back from a worker and passed to `merge`
+        """
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': dict(self.histograms)
+            }
+
+    def merge(self, values):
+        """
+        Add the counters and histograms exported by `export`
+        """
+        if not self.enabled:
+            return
+
+        with self._lock:
+            for name, value in values['counters'].items():
+                self.counters[name] += value
+
+            for stage, histogram in values['histograms'].items():
+                try:
+                    self.histograms[stage].merge(histogram)
+                except KeyError:
+                    self.histograms[stage] = Histogram(self.buckets)
+                    self.histograms[stage].merge(histogram)
+
+    @property
+    def uptime(self):
+        return time.time() - self.started_at
+
+    def snapshot(self):
+        """
+        Return the current state of the metrics
+
+        Returns
+
+            dict: counters, rates and histograms
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            histograms = {
+                stage: histogram.as_dict()
+                for stage, histogram in self.histograms.items()
+            }
+
+        uptime = self.uptime
+        rates = {}
+        for name in ('pages', 'tournaments', 'matches'):
+            rates[f'{name}_per_second'] = round(counters.get(name, 0) / uptime, 3) if uptime else 0
+
+        tournaments = counters.get('tournaments', 0)
+        rates['missing_fields_rate'] = round(
+            counters.get('missing_fields', 0) / tournaments, 4
+        ) if tournaments else 0
+
+        return {
+            'uptime': round(uptime, 3),
+            'counters': counters,
+            'rates': rates,
+            'stages': histograms
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, namespace='wta_scrapper'):
+        """
+        Return the metrics in the Prometheus text format
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE {namespace}_{name}_total counter')
+            lines.append(f'{namespace}_{name}_total {value}')
+
+        for name, value in sorted(snapshot['rates'].items()):
+            lines.append(f'# TYPE {namespace}_{name} gauge')
+            lines.append(f'{namespace}_{name} {value}')
+
+        if snapshot['stages']:
+            metric = f'{namespace}_stage_seconds'
+            lines.append(f'# TYPE {metric} histogram')
+            for stage, values in sorted(snapshot['stages'].items()):
+                total = 0
+                for bound, count in values['buckets'].items():
+                    total += count
+                    lines.append(f'{metric}_bucket{{stage="{stage}",le="{bound}"}} {total}')
+                lines.append(f'{metric}_sum{{stage="{stage}"}} {values["sum"]}')
+                lines.append(f'{metric}_count{{stage="{stage}"}} {values["count"]}')
+        return '\n'.join(lines) + '\n'
+
+
+def timed(stage):
+    """
+    Record the duration of a method of an instance
+    that has a `metrics` attribute under the given stage
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.time(stage):
+                return func(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Default instance shared by every
+# scrapper of the process
+metrics = Metrics()
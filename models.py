@@ -1,5 +1,83 @@
+import copy
+
 import pandas
 
+from wta_scrapper.cache import LRUCache
+from wta_scrapper.pool import ENCODED_FIELDS
+from wta_scrapper.utils import is_owner, split_results
+
+# Parameters that can be used to filter
+# the matches and the tournaments
+FILTERS = ('player', 'year', 'surface', 'round', 'result', 'type', 'name', 'opp_name')
+
+INTEGER_FILTERS = ('year',)
+
+
+def normalize_filters(**filters):
+    """
+    Return the filters as a sorted tuple that can be used as a
+    cache key. Empty filters are dropped, years are converted to
+    integers and lists of values are sorted
+
+        normalize_filters(surface=['Grass', 'Clay'], year='2014', round=None)
+        -> (('surface', ('Clay', 'Grass')), ('year', 2014))
+    """
+    items = []
+    for name, value in filters.items():
+        if name not in FILTERS:
+            raise ValueError(f'Unknown filter: {name}')
+
+        if value is None or value == '' or value == []:
+            continue
+
+        convert = int if name in INTEGER_FILTERS else str
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted({convert(item) for item in value}))
+            if len(value) == 1:
+                value = value[0]
+        else:
+            value = convert(value)
+        items.append((name, value))
+    return tuple(sorted(items))
+
+
+def filter_frame(frame, filters):
+    """
+    Return the rows of the frame matching every normalized
+    filter. Filters on columns that the frame does not have
+    are ignored
+    """
+    mask = pandas.Series(True, index=frame.index)
+    for name, value in filters:
+        if name not in frame.columns:
+            continue
+
+        if isinstance(value, tuple):
+            mask &= frame[name].isin(value)
+        else:
+            mask &= frame[name] == value
+    return frame[mask]
+
+
+def aggregate_frame(frame, group_by):
+    """
+    Return the number of wins and losses of the
+    matches grouped by the given columns
+    """
+    for column in group_by:
+        if column not in frame.columns:
+            raise ValueError(f'Unknown column: {column}')
+
+    frame = frame.assign(
+        wins=(frame['result'] == 'W').astype('int64'),
+        losses=(frame['result'] == 'L').astype('int64')
+    )
+    result = frame.groupby(list(group_by), observed=True)[['wins', 'losses']].sum().reset_index()
+    result['matches'] = result['wins'] + result['losses']
+    result['win_rate'] = (result['wins'] / result['matches']).round(4)
+    return result
+
+
 class Queryset:
     """
     Contains the data from the JSON file and
@@ -17,9 +95,29 @@ class Queryset:
 
         (DataFrame): a pandas DataFrame
     """
-    def __init__(self, data):
+    def __init__(self, data, categorical=True):
+        self.version = 0
         self.tournaments = data
         self.matches = []
+        self.categorical = categorical
+
+    @property
+    def tournaments(self):
+        return self._tournaments
+
+    @tournaments.setter
+    def tournaments(self, data):
+        # Replacing the data changes the version which
+        # invalidates the results computed on the old data
+        self._tournaments = data
+        self.version += 1
+
+    def invalidate(self):
+        """
+        Call after modifying the data in place so that
+        the cached results are not reused
+        """
+        self.version += 1
 
     def _build_columns(self):
         return {}
@@ -60,7 +158,7 @@ class Queryset:
         )
         tournaments.pop(-1)
         populated_dict = self._populate_columns(tournaments, updated_dict)
-        return pandas.DataFrame(populated_dict)
+        return self._as_categorical(pandas.DataFrame(populated_dict))
 
     def _construct_matches(self, tournaments, df_columns=[]):
         """
@@ -97,11 +195,22 @@ class Queryset:
         columns = self._construct_columns(
             self._get_sample_data(data=list_of_matches), columns
         )
-        result = self._populate(list_of_matches, columns)
+        result = self._as_categorical(self._populate(list_of_matches, columns))
         if df_columns:
             return result[df_columns]
         return result
 
+    def _as_categorical(self, df):
+        """
+        Store the columns whose values repeat constantly
+        as categories instead of strings
+        """
+        if self.categorical:
+            for column in ENCODED_FIELDS:
+                if column in df.columns:
+                    df[column] = df[column].astype('category')
+        return df
+
     def _populate(self, data: list, dict_to_update: dict, exclude=[]):
         keys = self._get_keys(data[-0])
         for _, item in enumerate(data):
@@ -126,13 +235,61 @@ class Queryset:
         return dict_to_update
 
     def copy(self):
-        new_queryset = self.__class__(self.tournaments)
+        new_queryset = self.__class__(self.tournaments, categorical=self.categorical)
         return new_queryset
 
 
 class Query(Queryset):
-    def __init__(self, dict_or_list, name=None, matches=False):
-        super().__init__(dict_or_list)
+    """
+    Queries on the data of a result file. The dataframes and the
+    results of `filter` and `aggregate` are kept in a bounded cache
+    keyed by the normalized query and the version of the data so
+    that repeating a query does not rebuild the dataframes
+
+    Parameters
+
+        dict_or_list (list): the result values
+        cache_size (int, optional): number of cached results. Defaults to 128
+    """
+    def __init__(self, dict_or_list, name=None, matches=False, categorical=True, cache_size=128):
+        super().__init__(dict_or_list, categorical=categorical)
+        self.cache = LRUCache(maxsize=cache_size)
+
+    def _cached(self, key, func):
+        key = (*key, self.version)
+        result = self.cache.get(key)
+        if result is None:
+            result = func()
+            self.cache.set(key, result)
+        return result
+
+    def _get_frame(self, view):
+        """
+        Return the complete dataframe of the matches or of the
+        tournaments. The data is copied because building the
+        dataframes consumes the dictionnaries
+        """
+        if view == 'matches':
+            func = lambda: self._construct_matches(copy.deepcopy(self.tournaments))
+        elif view == 'tournaments':
+            func = lambda: self._construct_tournaments(copy.deepcopy(self.tournaments))
+        else:
+            raise ValueError(f'Unknown view: {view}')
+        return self._cached(('frame', view), func)
+
+    def _is_player(self, value):
+        _, metadata = split_results(self.tournaments)
+        return is_owner(metadata, value)
+
+    def _filter(self, view, filters):
+        frame = self._get_frame(view)
+        filters = dict(filters)
+        # The data belongs to a single player which means
+        # that the player filter keeps all or none of the rows
+        player = filters.pop('player', None)
+        if player is not None and not self._is_player(player):
+            return frame.iloc[0:0]
+        return filter_frame(frame, tuple(filters.items()))
 
     def get_matches(self, columns=[]):
         """
@@ -146,12 +303,68 @@ class Query(Queryset):
 
             (dataframe): pandas dataframe object
         """
-        return self._construct_matches(self.tournaments, df_columns=columns)
+        frame = self._get_frame('matches')
+        if columns:
+            frame = frame[columns]
+        return frame.copy()
 
     @property
     def get_tournaments(self):
-        return self._construct_tournaments(self.tournaments)
+        return self._get_frame('tournaments').copy()
 
     @property
     def get_scores(self):
         return self.get_matches(columns=['score'])
+
+    def filter(self, view='matches', columns=None, **filters):
+        """
+        Return the matches or the tournaments matching the filters
+
+            query.filter(surface='Clay', year=2014, result='W')
+            query.filter(round=['Final', 'Semi'], columns=['opp_name', 'score'])
+
+        Parameters
+
+            view (str, optional): matches or tournaments. Defaults to matches
+            columns (list, optional): columns to return
+            player, year, surface, round, result, type, name, opp_name: a value
+            or a list of accepted values
+
+        Returns
+
+            (dataframe): pandas dataframe object
+        """
+        filters = normalize_filters(**filters)
+        columns = tuple(columns or ())
+        frame = self._cached(
+            ('filter', view, filters, columns),
+            lambda: self._select(self._filter(view, filters), columns)
+        )
+        return frame.copy()
+
+    def aggregate(self, group_by=('surface',), **filters):
+        """
+        Return the wins, losses and win rate of the
+        matches matching the filters grouped by columns
+
+            query.aggregate(['surface', 'year'], result=None, round='Final')
+        """
+        if isinstance(group_by, str):
+            group_by = (group_by,)
+        filters = normalize_filters(**filters)
+        group_by = tuple(group_by)
+        frame = self._cached(
+            ('aggregate', group_by, filters),
+            lambda: aggregate_frame(self._filter('matches', filters), group_by)
+        )
+        return frame.copy()
+
+    @staticmethod
+    def _select(frame, columns):
+        if not columns:
+            return frame
+
+        unknown = [column for column in columns if column not in frame.columns]
+        if unknown:
+            raise ValueError(f'Unknown columns: {", ".join(unknown)}')
+        return frame[list(columns)]
@@ -0,0 +1,120 @@
+from wta_scrapper.utils import PLAYER_LINK_REGEX, get_player_key
+
+
+class PlayerIndex:
+    """
+    Interns player keys into consecutive integers so that
+    they can be used as indexes in arrays and matrices
+
+    The owner of a page built without `player_link` is only known
+    by name while the same player is known by id on the pages of
+    her opponents. `resolve` remembers the name of each link that
+    it sees so that both get the same code. When the name was given
+    its own code before the link was seen, that code is merged in the
+    code of the id and the merge is recorded in `merged` for the
+    structures indexed by the codes to move their values
+
+    Parameters
+
+        keys (list, optional): keys to intern from the start
+    """
+    def __init__(self, keys=None):
+        self.codes = {}
+        self.keys = []
+        # Name key -> id key of the players whose link was seen
+        self.aliases = {}
+        # Code of a name -> code of the id in which it was merged
+        self.merged = {}
+        for key in keys or []:
+            self.add(key)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self)} players)'
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.codes
+
+    def __getitem__(self, key):
+        return self.codes[key]
+
+    def add(self, key):
+        """
+        Return the code of the key, creating it if needed
+        """
+        try:
+            return self.codes[key]
+        except KeyError:
+            code = len(self.keys)
+            self.codes[key] = code
+            self.keys.append(key)
+            return code
+
+    def get(self, key, default=None):
+        return self.codes.get(key, default)
+
+    def key_for(self, code):
+        return self.keys[self.find(code)]
+
+    @property
+    def number_of_players(self):
+        return len(self.keys) - len(self.merged)
+
+    def find(self, code):
+        """
+        Return the code in which the code was merged or the code itself
+        """
+        while code in self.merged:
+            code = self.merged[code]
+        return code
+
+    def resolve(self, player, name=None, create=True):
+        """
+        Return the code of a player given as a link, an id or a
+        name or None if the player is unknown and create is False
+
+            resolve('//www.wtatennis.com/players/328560/eugenie-bouchard')
+            resolve('Eugenie Bouchard') -> the code of 328560 once the link was seen
+        """
+        player_id = None
+        names = []
+        if player is not None:
+            text = str(player)
+            result = PLAYER_LINK_REGEX.search(text)
+            if text.isnumeric():
+                player_id = text
+            elif result is not None:
+                player_id = result.group('player_id')
+                if result.group('slug'):
+                    names.append(result.group('slug').lower())
+            else:
+                names.append(get_player_key(name=text))
+
+        if name:
+            names.append(get_player_key(name=name))
+
+        if player_id is None:
+            if not names:
+                return None
+            key = self.aliases.get(names[0], names[0])
+            code = self.add(key) if create else self.get(key)
+            return None if code is None else self.find(code)
+
+        code = self.add(player_id) if create else self.get(player_id)
+        if code is None:
+            return None
+
+        code = self.find(code)
+        for key in names:
+            # The first player seen with a name keeps it
+            # in case two players have the same name
+            if self.aliases.setdefault(key, player_id) != player_id:
+                continue
+
+            other = self.codes.get(key)
+            if other is not None and self.find(other) != code:
+                self.merged[self.find(other)] = code
+                self.codes[key] = code
+        return code
@@ -0,0 +1,65 @@
+from collections import defaultdict
+
+from wta_scrapper.utils import split_results
+
+# Fields of the tournaments and of the matches
+# whose values repeat across the whole corpus
+ENCODED_FIELDS = (
+    'opp_name', 'link', 'nationality', 'round',
+    'result', 'surface', 'type', 'country'
+)
+
+
+class StringPool:
+    """
+    Dictionaries of the values of the fields that repeat
+    constantly across matches. Interning a value returns the
+    instance that is already in the dictionary so that every
+    match points to the same string instead of its own copy
+
+    The pool keeps every value that it saw which is why it is
+    owned by a scrapper rather than shared by the process
+    """
+    def __init__(self, fields=ENCODED_FIELDS):
+        self.fields = fields
+        self.values = defaultdict(dict)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self)} values)'
+
+    def __len__(self):
+        return sum(len(values) for values in self.values.values())
+
+    def intern(self, field, value):
+        if not isinstance(value, str):
+            return value
+        return self.values[field].setdefault(value, value)
+
+    def intern_dict(self, item):
+        for field in self.fields:
+            if field in item:
+                item[field] = self.intern(field, item[field])
+        return item
+
+    def intern_values(self, values):
+        """
+        Intern the fields of the tournaments and matches of a result
+        """
+        tournaments, _ = split_results(values)
+        for tournament in tournaments:
+            for details in tournament.values():
+                self.intern_dict(details)
+                for match in details['matches']:
+                    self.intern_dict(match)
+                    self.intern_dict(match['details'])
+        return values
+
+    def categories(self, field):
+        return list(self.values[field].keys())
+
+    def clear(self):
+        """
+        Forget the values. The strings stay alive as
+        long as the results that use them do
+        """
+        self.values = defaultdict(dict)
@@ -0,0 +1,328 @@
+import datetime
+import json
+
+import numpy
+import pandas
+
+from wta_scrapper.players import PlayerIndex
+from wta_scrapper.utils import (get_data_file, get_date_ordinal, iter_matches,
+                                split_results)
+
+# Entry types that can be found in the footer
+# in place of the seed of the player
+ENTRY_TYPES = ('W', 'Q', 'LL', 'SE', 'PR')
+
+# Value used for a missing rank or seed
+MISSING = -1
+
+TIMELINE_DTYPE = numpy.dtype([
+    ('date', 'int64'),
+    ('rank', 'int32'),
+    ('seed', 'int32'),
+    ('entry', 'int8')
+])
+
+
+def as_ordinal(value):
+    if isinstance(value, (int, numpy.integer)):
+        return int(value)
+    return get_date_ordinal(value)
+
+
+def get_entry_type(code):
+    """
+    Return the entry type from its code e.g. 1 -> W
+    """
+    if code <= 0:
+        return None
+    return ENTRY_TYPES[code - 1]
+
+
+def get_timeline_row(tournament):
+    """
+    Return the (date, rank, seed, entry) of the ranking
+    in the footer of a tournament or None if the
+    tournament has no date or a date that was not parsed
+    """
+    date = get_date_ordinal(tournament.get('date'))
+    if not date:
+        return None
+
+    ranking = tournament.get('ranking') or {}
+    rank = ranking.get('rank')
+    entered_as = ranking.get('entered_as')
+
+    seed = MISSING
+    entry = 0
+    if isinstance(entered_as, (int, float)):
+        seed = int(entered_as)
+    elif entered_as in ENTRY_TYPES:
+        entry = ENTRY_TYPES.index(entered_as) + 1
+    return (
+        date,
+        MISSING if rank is None else int(rank),
+        seed,
+        entry
+    )
+
+
+class RankingTimeline:
+    """
+    The ranking of each player at each tournament taken from the
+    footers of the tournaments. Each player has a numpy array of
+    (date, rank, seed, entry) sorted by date which allows the rank
+    of a player at any date to be found with a binary search
+
+        timeline = RankingTimeline.from_files('eugenie_bouchard')
+        timeline.rank_as_of('Eugenie Bouchard', '2014-07-01')
+        timeline.merge(start='2014-01-01', end='2014-12-31')
+
+    The players are resolved by `PlayerIndex.resolve` like in
+    `HeadToHead` which means that the owner of a page built with
+    `player_name` has the key of her link once it was seen on the
+    page of one of her opponents
+
+    Parameters
+
+        players (PlayerIndex, optional): an existing index to share
+    """
+    def __init__(self, players=None):
+        self.players = players if players is not None else PlayerIndex()
+        # Code of the player -> structured
+        # array sorted by date
+        self.timelines = {}
+        self.number_of_merges = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.timelines)} players)'
+
+    def __len__(self):
+        return len(self.timelines)
+
+    def __contains__(self, player):
+        return self._get_code(player) in self.timelines
+
+    @classmethod
+    def from_files(cls, *filenames, **kwargs):
+        instance = cls(**kwargs)
+        for name in filenames:
+            if not name.endswith('json'):
+                name = f'{name}.json'
+            with open(get_data_file(name), 'r') as f:
+                instance.add(json.load(f))
+        return instance
+
+    def _get_code(self, player):
+        self._apply_merges()
+        return self.players.resolve(player, create=False)
+
+    def _apply_merges(self):
+        """
+        Move the timelines of the codes that were merged by
+        the index to the code in which they were merged
+        """
+        merges = list(self.players.merged)[self.number_of_merges:]
+        self.number_of_merges += len(merges)
+        for old in merges:
+            rows = self.timelines.pop(old, None)
+            if rows is not None:
+                self._merge_rows(self.players.find(old), rows)
+
+    def add(self, values, player=None):
+        """
+        Add the rankings of a result to the timeline of its player
+
+        Parameters
+
+            values (list, Query, MatchScrapper): the result values
+            player (str, optional): link, id or name of the player. Defaults
+            to the metadata of the result
+
+        Returns
+
+            int: the number of rankings in the timeline of the player
+        """
+        tournaments, metadata = split_results(values)
+        name = None
+        if player is None:
+            player = metadata.get('player_link', metadata.get('player_id'))
+            name = metadata.get('player_name')
+
+        code = self.players.resolve(player, name=name)
+        if code is None:
+            raise ValueError('The player of the result could not be determined')
+
+        # The links of the opponents are resolved so that their
+        # names are known when their own pages are added
+        for _, match in iter_matches(values):
+            self.players.resolve(match.get('link'), name=match.get('opp_name'))
+
+        rows = []
+        for tournament in tournaments:
+            for details in tournament.values():
+                row = get_timeline_row(details)
+                if row is not None:
+                    rows.append(row)
+        self._apply_merges()
+        return self._merge_rows(self.players.find(code), numpy.array(rows, dtype=TIMELINE_DTYPE))
+
+    def add_rows(self, player, rows):
+        """
+        Merge an array of rankings in the timeline of a player. When
+        two rankings have the same date the one added last is kept
+
+        Parameters
+
+            player (str): link, id or name of the player
+        """
+        code = self.players.resolve(player)
+        self._apply_merges()
+        return self._merge_rows(self.players.find(code), rows)
+
+    def _merge_rows(self, code, rows):
+        if code in self.timelines:
+            rows = numpy.concatenate([self.timelines[code], rows])
+
+        # Sort the reversed rows so that unique keeps
+        # the most recent row added for each date
+        rows = rows[::-1]
+        rows = rows[numpy.argsort(rows['date'], kind='stable')]
+        _, indexes = numpy.unique(rows['date'], return_index=True)
+        self.timelines[code] = rows[indexes]
+        return len(self.timelines[code])
+
+    def get(self, player):
+        """
+        Return the timeline of a player as a structured array
+        """
+        code = self._get_code(player)
+        if code not in self.timelines:
+            raise KeyError(player)
+        return self.timelines[code]
+
+    def get_dataframe(self, player):
+        timeline = self.get(player)
+        return pandas.DataFrame({
+            'date': [datetime.date.fromordinal(int(item)) for item in timeline['date']],
+            'rank': numpy.where(timeline['rank'] == MISSING, numpy.nan, timeline['rank']),
+            'seed': numpy.where(timeline['seed'] == MISSING, numpy.nan, timeline['seed']),
+            'entered_as': [get_entry_type(int(item)) for item in timeline['entry']]
+        })
+
+    def _lookup(self, timeline, dates):
+        # Index of the last ranking on or before each date
+        return numpy.searchsorted(timeline['date'], dates, side='right') - 1
+
+    def _get_ranks(self, timeline, dates):
+        """
+        Return the rank at each date, -1 before the first ranking
+        and for a player whose page has no dated tournament
+        """
+        if len(timeline) == 0:
+            return numpy.full(len(dates), MISSING, dtype=timeline['rank'].dtype)
+
+        indexes = self._lookup(timeline, dates)
+        ranks = timeline['rank'][numpy.maximum(indexes, 0)]
+        return numpy.where(indexes < 0, MISSING, ranks)
+
+    def ranks_as_of(self, player, dates):
+        """
+        Return the rank of the player at each date. The rank at a
+        date is the one of the last tournament played on or before
+        that date
+
+        Parameters
+
+            dates (list): dates as strings, dates or ordinals
+
+        Returns
+
+            numpy.array: the ranks, -1 before the first ranking
+        """
+        timeline = self.get(player)
+        dates = numpy.asarray([as_ordinal(item) for item in dates], dtype='int64')
+        return self._get_ranks(timeline, dates)
+
+    def rank_as_of(self, player, date):
+        """
+        Return the rank of the player at a date or None
+        """
+        rank = int(self.ranks_as_of(player, [date])[0])
+        return None if rank == MISSING else rank
+
+    def _get_weeks(self, start, end):
+        start = as_ordinal(start)
+        end = as_ordinal(end)
+        # Align the weeks on the mondays of the period
+        # starting with the monday of the first week
+        start -= datetime.date.fromordinal(start).weekday()
+        return numpy.arange(start, end + 1, 7, dtype='int64')
+
+    def _get_bounds(self, codes, start, end):
+        """
+        Return the first and last dates of the period or None when
+        they are not given and none of the players has a ranking
+        """
+        timelines = [self.timelines[code] for code in codes if len(self.timelines[code])]
+        if not timelines and (start is None or end is None):
+            return None
+
+        if start is None:
+            start = min(int(timeline['date'][0]) for timeline in timelines)
+        if end is None:
+            # The monday on or after the last ranking so
+            # that the last ranking has its own week
+            end = max(int(timeline['date'][-1]) for timeline in timelines)
+            end += -datetime.date.fromordinal(end).weekday() % 7
+        return start, end
+
+    def resample(self, player, start=None, end=None):
+        """
+        Return the weekly rank of the player between the dates
+
+        Returns
+
+            pandas.Series: ranks indexed by the monday of each week
+        """
+        return self.merge([player], start=start, end=end).iloc[:, 0]
+
+    def merge(self, players=None, start=None, end=None):
+        """
+        Return the weekly ranks of many players side by side
+
+        Parameters
+
+            players (list, optional): defaults to all the players
+            start (str, optional): defaults to the first ranking
+            end (str, optional): defaults to the monday on or after the last ranking
+
+        Returns
+
+            pandas.DataFrame: one column per player and one row per week
+        """
+        if players is None:
+            self._apply_merges()
+            codes = list(self.timelines.keys())
+        else:
+            codes = [self._get_code(item) for item in players]
+            for player, code in zip(players, codes):
+                if code not in self.timelines:
+                    raise KeyError(player)
+
+        if not codes:
+            return pandas.DataFrame()
+
+        columns = [self.players.key_for(code) for code in codes]
+        bounds = self._get_bounds(codes, start, end)
+        if bounds is None:
+            return pandas.DataFrame(columns=columns, dtype='float64')
+
+        weeks = self._get_weeks(*bounds)
+        ranks = numpy.full((len(weeks), len(codes)), numpy.nan)
+        for i, code in enumerate(codes):
+            values = self._get_ranks(self.timelines[code], weeks).astype('float64')
+            values[values == MISSING] = numpy.nan
+            ranks[:, i] = values
+
+        index = pandas.to_datetime([datetime.date.fromordinal(int(item)) for item in weeks])
+        return pandas.DataFrame(ranks, index=index, columns=columns)
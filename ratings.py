@@ -0,0 +1,395 @@
+import argparse
+import datetime
+import json
+import time
+
+import numpy
+
+from wta_scrapper.h2h import SKIPPED_SCORES
+from wta_scrapper.players import PlayerIndex
+from wta_scrapper.utils import (get_data_file, get_date_ordinal,
+                                get_match_fingerprint, iter_matches,
+                                split_results)
+
+# Order in which the rounds are played
+# during a tournament so that matches from
+# the same week can be sorted chronologically
+ROUNDS = {
+    'Qual. R1': 0,
+    'Qual. R2': 1,
+    'Qual. R3': 2,
+    'R1': 3,
+    'R2': 4,
+    'R3': 5,
+    'R128': 6,
+    'R64': 7,
+    'R32': 8,
+    'R16': 9,
+    'Group': 10,
+    'Quarter': 11,
+    'Semi': 12,
+    'Final': 13
+}
+
+SURFACES = ('Hard', 'Clay', 'Grass', 'Carpet')
+
+
+def get_waves(winners, losers):
+    """
+    Split a chronologically sorted list of matches in waves in which
+    each player appears at most once. A match is always placed
+    after every previous match of both players which means that the
+    waves can be applied one after the other with vectorized updates
+    and still give the same ratings as a sequential loop
+
+    Returns
+
+        numpy.array: the wave of each match
+    """
+    last_wave = {}
+    waves = numpy.empty(len(winners), dtype='int64')
+    for i, (winner, loser) in enumerate(zip(winners.tolist(), losers.tolist())):
+        wave = max(last_wave.get(winner, -1), last_wave.get(loser, -1)) + 1
+        last_wave[winner] = last_wave[loser] = wave
+        waves[i] = wave
+    return waves
+
+
+class EloRatings:
+    """
+    Overall and surface specific Elo ratings computed
+    from the scraped matches. The ratings are stored in numpy
+    arrays indexed by the interned code of each player
+
+    The players are resolved by `PlayerIndex.resolve` which means
+    that the owner of a page built with `player_name` only gets the
+    code of her link on the pages of her opponents. When the index
+    merges two codes, the rating changes and the matches of the
+    merged code are added to the code in which it was merged
+
+    Parameters
+
+        k (int, optional): the K factor. Defaults to 32
+        initial (int, optional): the rating of a new player. Defaults to 1500
+        players (PlayerIndex, optional): an existing index to share
+    """
+    def __init__(self, k=32, initial=1500, players=None, surfaces=SURFACES):
+        self.k = k
+        self.initial = initial
+        self.players = players if players is not None else PlayerIndex()
+        self.surfaces = list(surfaces)
+
+        self.ratings = numpy.full(0, initial, dtype='float64')
+        self.surface_ratings = numpy.full((len(self.surfaces), 0), initial, dtype='float64')
+        self.matches_played = numpy.zeros(0, dtype='int64')
+
+        self.fingerprints = set()
+        self.number_of_merges = 0
+        self.number_of_matches = 0
+        self.last_date = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.players.number_of_players} players, {self.number_of_matches} matches)'
+
+    @classmethod
+    def from_files(cls, *filenames, **kwargs):
+        instance = cls(**kwargs)
+        for name in filenames:
+            if not name.endswith('json'):
+                name = f'{name}.json'
+            with open(get_data_file(name), 'r') as f:
+                instance.add(json.load(f))
+        return instance
+
+    def _resize(self):
+        size = len(self.players)
+        current = self.ratings.shape[0]
+        if size <= current:
+            return
+
+        capacity = max(size, current * 2, 64)
+        extra = capacity - current
+        self.ratings = numpy.concatenate([
+            self.ratings, numpy.full(extra, self.initial, dtype='float64')
+        ])
+        self.surface_ratings = numpy.concatenate([
+            self.surface_ratings,
+            numpy.full((len(self.surfaces), extra), self.initial, dtype='float64')
+        ], axis=1)
+        self.matches_played = numpy.concatenate([
+            self.matches_played, numpy.zeros(extra, dtype='int64')
+        ])
+
+    def _get_surface(self, surface):
+        try:
+            return self.surfaces.index(surface)
+        except ValueError:
+            return -1
+
+    def _apply_merges(self):
+        """
+        Add the rating changes, the matches and the fingerprints of the
+        codes that were merged by the index to the code in which they
+        were merged. As each match moves the ratings of its players by
+        opposite amounts, the rating of a player is the initial rating
+        plus the changes of her matches whatever her code was
+        """
+        merges = list(self.players.merged)[self.number_of_merges:]
+        if not merges:
+            return
+
+        self.number_of_merges += len(merges)
+        self._resize()
+        for old in merges:
+            new = self.players.find(old)
+            self.ratings[new] += self.ratings[old] - self.initial
+            self.surface_ratings[:, new] += self.surface_ratings[:, old] - self.initial
+            self.matches_played[new] += self.matches_played[old]
+
+            self.ratings[old] = self.initial
+            self.surface_ratings[:, old] = self.initial
+            self.matches_played[old] = 0
+
+        self.fingerprints = {
+            get_match_fingerprint(date, round, self.players.find(player), self.players.find(opponent))
+            for date, round, player, opponent in self.fingerprints
+        }
+
+    def prepare(self, values, player=None):
+        """
+        Extract the matches of a result in the arrays that are
+        used by `update`. Matches that were already applied and
+        matches that were not played are left out
+
+        Returns
+
+            tuple: (dates, rounds, winners, losers, surfaces)
+        """
+        _, metadata = split_results(values)
+        name = None
+        if player is None:
+            player = metadata.get('player_link', metadata.get('player_id'))
+            name = metadata.get('player_name')
+
+        player = self.players.resolve(player, name=name)
+        if player is None:
+            raise ValueError(
+                'Could not determine the player for these values. '
+                "Provide 'player' or build the values with 'player_name'"
+            )
+
+        items = []
+        for tournament, match in iter_matches(values):
+            details = match['details']
+            result = details.get('result')
+            if result not in ('W', 'L'):
+                continue
+
+            score = details.get('score')
+            if score is not None and score.startswith(SKIPPED_SCORES):
+                continue
+
+            opponent = self.players.resolve(match['link'], name=match['opp_name'])
+            if opponent is None:
+                continue
+
+            # The link of the opponent can merge the code of
+            # the player when she was only known by name
+            self._apply_merges()
+            player = self.players.find(player)
+            if opponent == player:
+                continue
+
+            date = get_date_ordinal(tournament.get('date'))
+            round_order = ROUNDS.get(details.get('round'), 0)
+            fingerprint = get_match_fingerprint(tournament.get('date'), details.get('round'), player, opponent)
+            if fingerprint in self.fingerprints:
+                continue
+            self.fingerprints.add(fingerprint)
+
+            winner, loser = (player, opponent) if result == 'W' else (opponent, player)
+            items.append((
+                date, round_order, winner, loser,
+                self._get_surface(tournament.get('surface'))
+            ))
+
+        if not items:
+            items = numpy.empty((0, 5), dtype='int64')
+        dates, rounds, winners, losers, surfaces = numpy.array(items, dtype='int64').reshape(-1, 5).T
+
+        # The codes of the first matches can have been merged since
+        codes = numpy.array([self.players.find(code) for code in range(len(self.players))], dtype='int64')
+        return dates, rounds, codes[winners], codes[losers], surfaces
+
+    def add(self, values, player=None):
+        """
+        Apply the new matches of a result to the ratings
+
+        Returns
+
+            int: the number of matches that were applied
+        """
+        return self.update(*self.prepare(values, player=player))
+
+    def update(self, dates, rounds, winners, losers, surfaces=None):
+        """
+        Apply a batch of matches to the ratings. The batch is sorted
+        by date and round before being applied. Ratings are only exact
+        when the batch is played after the matches that were already applied
+
+        Parameters
+
+            dates (numpy.array): the ordinal of the tournament dates
+            rounds (numpy.array): the order of the rounds (see ROUNDS)
+            winners (numpy.array): codes of the winners
+            losers (numpy.array): codes of the losers
+            surfaces (numpy.array, optional): index of the surfaces, -1 when unknown
+
+        Returns
+
+            int: the number of matches that were applied
+        """
+        if len(winners) == 0:
+            return 0
+
+        self._resize()
+        self._apply_merges()
+
+        if surfaces is None:
+            surfaces = numpy.full(len(winners), -1, dtype='int64')
+
+        order = numpy.lexsort((rounds, dates))
+        winners = numpy.asarray(winners)[order]
+        losers = numpy.asarray(losers)[order]
+        surfaces = numpy.asarray(surfaces)[order]
+
+        waves = get_waves(winners, losers)
+        wave_order = numpy.argsort(waves, kind='stable')
+        boundaries = numpy.flatnonzero(numpy.diff(waves[wave_order])) + 1
+
+        for indexes in numpy.split(wave_order, boundaries):
+            wave_winners = winners[indexes]
+            wave_losers = losers[indexes]
+            self._apply(self.ratings, wave_winners, wave_losers)
+
+            wave_surfaces = surfaces[indexes]
+            known = wave_surfaces >= 0
+            if known.any():
+                self._apply_surface(
+                    wave_surfaces[known],
+                    wave_winners[known],
+                    wave_losers[known]
+                )
+
+        numpy.add.at(self.matches_played, winners, 1)
+        numpy.add.at(self.matches_played, losers, 1)
+        self.number_of_matches += len(winners)
+        self.last_date = max(self.last_date, int(numpy.max(dates)))
+        return len(winners)
+
+    def _get_deltas(self, winner_ratings, loser_ratings):
+        expected = 1 / (1 + 10 ** ((loser_ratings - winner_ratings) / 400))
+        return self.k * (1 - expected)
+
+    def _apply(self, ratings, winners, losers):
+        deltas = self._get_deltas(ratings[winners], ratings[losers])
+        ratings[winners] += deltas
+        ratings[losers] -= deltas
+
+    def _apply_surface(self, surfaces, winners, losers):
+        deltas = self._get_deltas(
+            self.surface_ratings[surfaces, winners],
+            self.surface_ratings[surfaces, losers]
+        )
+        self.surface_ratings[surfaces, winners] += deltas
+        self.surface_ratings[surfaces, losers] -= deltas
+
+    def rating(self, player, surface=None):
+        """
+        Return the current rating of a player
+
+        Parameters
+
+            player (str): link, id or name of the player
+            surface (str, optional): return the rating for this surface
+        """
+        self._apply_merges()
+        code = self.players.resolve(player, create=False)
+        if code is None or code >= self.ratings.shape[0]:
+            return float(self.initial)
+
+        if surface is not None:
+            index = self._get_surface(surface)
+            if index == -1:
+                raise ValueError(f'Unknown surface: {surface}. Choose one of {", ".join(self.surfaces)}')
+            return float(self.surface_ratings[index, code])
+        return float(self.ratings[code])
+
+    def top(self, n=10, surface=None, min_matches=0):
+        """
+        Return the best rated players
+
+        Returns
+
+            list: [(key, rating), ...]
+        """
+        self._apply_merges()
+        size = len(self.players)
+        if surface is not None:
+            index = self._get_surface(surface)
+            if index == -1:
+                raise ValueError(f'Unknown surface: {surface}. Choose one of {", ".join(self.surfaces)}')
+            ratings = self.surface_ratings[index, :size]
+        else:
+            ratings = self.ratings[:size]
+
+        candidates = numpy.flatnonzero(self.matches_played[:size] >= min_matches)
+        candidates = candidates[~numpy.isin(candidates, list(self.players.merged))]
+        best = candidates[numpy.argsort(-ratings[candidates], kind='stable')[:n]]
+        return [(self.players.key_for(code), float(ratings[code])) for code in best]
+
+
+def generate_matches(number_of_matches, number_of_players=2000, seed=42):
+    """
+    Generate a synthetic corpus of matches in the
+    format expected by `EloRatings.update`
+    """
+    state = numpy.random.default_rng(seed)
+    start = datetime.date(2000, 1, 3).toordinal()
+    dates = start + 7 * state.integers(0, 52 * 20, number_of_matches)
+    rounds = state.integers(0, len(ROUNDS), number_of_matches)
+    winners = state.integers(0, number_of_players, number_of_matches)
+    offsets = state.integers(1, number_of_players, number_of_matches)
+    losers = (winners + offsets) % number_of_players
+    surfaces = state.integers(0, len(SURFACES), number_of_matches)
+    return dates, rounds, winners, losers, surfaces
+
+
+def benchmark(number_of_matches=1_000_000, number_of_players=2000, seed=42):
+    """
+    Time the computation of the ratings on a synthetic corpus
+    """
+    matches = generate_matches(number_of_matches, number_of_players, seed=seed)
+    ratings = EloRatings()
+    for i in range(number_of_players):
+        ratings.players.add(str(i))
+
+    start = time.perf_counter()
+    ratings.update(*matches)
+    elapsed = time.perf_counter() - start
+    return {
+        'matches': number_of_matches,
+        'players': number_of_players,
+        'seconds': round(elapsed, 3),
+        'matches_per_second': int(number_of_matches / elapsed)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Benchmark the Elo ratings on a synthetic corpus')
+    parser.add_argument('--matches', type=int, default=1_000_000, help='Number of matches to generate')
+    parser.add_argument('--players', type=int, default=2000, help='Number of players to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Seed used to generate the matches')
+    parsed_arguments = parser.parse_args()
+
+    print(benchmark(parsed_arguments.matches, parsed_arguments.players, seed=parsed_arguments.seed))
@@ -1,8 +1,15 @@
+import argparse
 import json
+import os
 import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
 
 import numpy
 
+from wta_scrapper.utils import split_results, write_json_atomically
+
 
 class Score:
     """
@@ -42,6 +49,15 @@ class Score:
                 matched_regex.append(is_match)
                 score_as_list = list(is_match.groups())
 
+        # The scores from the WTA pages have their tie break
+        # points glued to the games of the set e.g. 7-656-2
+        # which the regexes above cannot match
+        if not matched_regex:
+            sets = split_sets(score)
+            if sets:
+                mappings.append('n-t')
+                score_as_list = sets
+
         # If multiple matches occur, the least accurate one
         # is used by default and it contains a None value which
         # should be filtered out
@@ -56,7 +72,7 @@ class Score:
         for item in self.score:
             if (numpy.array_equal([7, 6], item) |
                     numpy.array_equal([6, 7], item)):
-                self.has_tie_break = True
+                self.has_tie_breaks = True
                 self.tie_breaks += 1
 
     def __repr__(self):
@@ -180,6 +196,83 @@ class Score:
         return klass
 
 
+def split_sets(score):
+    """
+    Split a score in which the sets are concatenated and where
+    the tie break points follow the games of the player who lost
+    the tie break e.g. 7-656-2 -> ['7-6', '6-2'] or 62-76-4 -> ['6-7', '6-4']
+
+    Returns an empty list if the score cannot be split
+    """
+    text = score.replace(' ', '')
+    if len(text) < 3 or not text[0].isdigit():
+        return []
+
+    lhs = text[0]
+    for lhs_points in range(3):
+        position = 1 + lhs_points
+        lhs_tie_break = text[1:position]
+        if lhs_tie_break and not lhs_tie_break.isdigit():
+            break
+
+        if text[position:position + 1] != '-':
+            continue
+
+        rhs = text[position + 1:position + 2]
+        if not rhs.isdigit():
+            break
+
+        for rhs_points in range(3):
+            end = position + 2 + rhs_points
+            rhs_tie_break = text[position + 2:end]
+            if rhs_tie_break and not rhs_tie_break.isdigit():
+                break
+
+            if lhs_tie_break and (lhs, rhs) != ('6', '7'):
+                continue
+
+            if rhs_tie_break and (lhs, rhs) != ('7', '6'):
+                continue
+
+            if end == len(text):
+                return [f'{lhs}-{rhs}']
+
+            remaining = split_sets(text[end:])
+            if remaining:
+                return [f'{lhs}-{rhs}', *remaining]
+    return []
+
+
+@lru_cache(maxsize=8192)
+def get_score_features(score):
+    """
+    Return the values that `expand_scores` adds to a match. The
+    same scores come back constantly which is why they are cached
+    """
+    score = Score(score)
+    return {
+        'first_set': score.has_won_first_set,
+        'sets_literal': score.number_of_sets_literal,
+        'total_games': int(score.total_games),
+        'has_tie_break': score.has_tie_breaks,
+        'tie_breaks': score.tie_breaks
+    }
+
+
+@lru_cache(maxsize=8192)
+def get_games(score):
+    """
+    Return the number of games won and lost by the player
+    whose page the score comes from
+
+        get_games('7-656-2') -> (13, 8)
+    """
+    values = Score(score or '').score
+    if len(values) == 0:
+        return 0, 0
+    return int(values[:, 0].sum()), int(values[:, 1].sum())
+
+
 def expand_scores(items, filename=None, update_file=False):
     """
     From a JSON file, implement additional information
@@ -188,23 +281,114 @@ def expand_scores(items, filename=None, update_file=False):
     Args
 
         items (list): list of tournaments or matches
-        filename (str, optional):
-        update_file (bool, optional): Defaults to True
+        filename (str, optional): the file to update
+        update_file (bool, optional): write the values to the file. Defaults to False
+
+    Returns
+
+        list: the updated items
     """
-    characteristics = items.pop(-1)
-    for item in items:
+    tournaments, _ = split_results(items)
+    for item in tournaments:
         for values in item.values():
             for match in values['matches']:
-                score = Score(match['details']['score'])
-
-                match['details']['first_set'] = score.has_won_first_set
-                match['details']['sets_literal'] = score.number_of_sets_literal
-                match['details']['total_games'] = int(score.total_games)
-                match['details']['has_tie_break'] = score.has_tie_breaks
-                match['details']['tie_breaks'] = score.tie_breaks
+                match['details'].update(
+                    get_score_features(match['details']['score'])
+                )
 
-    items.append(characteristics)
     if filename and update_file:
-        with open(filename, 'w') as f:
-            json.dumps(items, indent=4)
+        write_json_atomically(filename, items)
     return items
+
+
+def expand_scores_file(filename):
+    """
+    Add the score information to the matches of a result file
+    and replace the file atomically
+
+    Returns
+
+        tuple: (filename, number of matches)
+    """
+    with open(filename, 'r') as f:
+        items = json.load(f)
+
+    expand_scores(items, filename=filename, update_file=True)
+    tournaments, _ = split_results(items)
+    matches = sum(len(values['matches']) for item in tournaments for values in item.values())
+    return filename, matches
+
+
+def expand_scores_files(filenames, workers=None, report=print):
+    """
+    Add the score information to many result files in parallel
+
+    Parameters
+
+        filenames (list): paths to the result files
+        workers (int, optional): number of processes. Defaults to the number of CPUs
+        report (callable, optional): called with a progress message after each file
+
+    Returns
+
+        dict: the number of files, matches and failures and the throughput
+    """
+    start = time.perf_counter()
+    total = len(filenames)
+    done = matches = 0
+    failures = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(expand_scores_file, filename): filename
+            for filename in filenames
+        }
+        for future in as_completed(futures):
+            done += 1
+            try:
+                _, count = future.result()
+            except Exception as e:
+                failures[futures[future]] = str(e)
+            else:
+                matches += count
+
+            if report is not None:
+                elapsed = time.perf_counter() - start
+                report(
+                    f'[{done}/{total}] {futures[future]} - '
+                    f'{done / elapsed:.1f} files/s, {matches / elapsed:.1f} matches/s'
+                )
+
+    elapsed = time.perf_counter() - start
+    return {
+        'files': total - len(failures),
+        'matches': matches,
+        'failures': failures,
+        'seconds': round(elapsed, 3),
+        'files_per_second': round(total / elapsed, 2) if elapsed else None,
+        'matches_per_second': round(matches / elapsed, 2) if elapsed else None
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Add the score information to existing result files')
+    parser.add_argument('filenames', nargs='+', help='Result files or folders of result files')
+    parser.add_argument('--workers', type=int, help='Number of processes')
+    parser.add_argument('--quiet', action='store_true', help='Do not report the progress')
+    parsed_arguments = parser.parse_args()
+
+    filenames = []
+    for name in parsed_arguments.filenames:
+        if os.path.isdir(name):
+            filenames.extend(
+                os.path.join(name, item) for item in sorted(os.listdir(name))
+                if item.endswith('.json')
+            )
+        else:
+            filenames.append(name)
+
+    result = expand_scores_files(
+        filenames,
+        workers=parsed_arguments.workers,
+        report=None if parsed_arguments.quiet else print
+    )
+    print(json.dumps(result, indent=4))
@@ -0,0 +1,226 @@
+import argparse
+import json
+import os
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas
+
+from wta_scrapper.cache import LRUCache
+from wta_scrapper.models import (FILTERS, Query, aggregate_frame, filter_frame,
+                                 normalize_filters)
+from wta_scrapper.utils import DATA_DIR, split_results
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class Corpus:
+    """
+    The scraped results loaded once in memory as a dataframe
+    of matches and a dataframe of tournaments with a `player`
+    column identifying the page each row comes from
+
+    Parameters
+
+        results (list): list of result values
+    """
+    def __init__(self, results):
+        matches = []
+        tournaments = []
+        for values in results:
+            items, metadata = split_results(values)
+            if not items:
+                continue
+
+            player = metadata.get('player_name')
+            query = Query([*items, metadata])
+
+            match_frame = query.get_matches()
+            match_frame.insert(0, 'player', player)
+            matches.append(match_frame)
+
+            tournament_frame = query.get_tournaments
+            tournament_frame.insert(0, 'player', player)
+            tournaments.append(tournament_frame)
+
+        self.matches = self._concat(matches)
+        self.tournaments = self._concat(tournaments)
+        self.version = 1
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.matches)} matches)'
+
+    @staticmethod
+    def _concat(frames):
+        if not frames:
+            return pandas.DataFrame()
+
+        frame = pandas.concat(frames, ignore_index=True)
+        for column in ('player', 'surface', 'round', 'result', 'type', 'name', 'opp_name'):
+            if column in frame.columns:
+                frame[column] = frame[column].astype('category')
+        return frame
+
+    @classmethod
+    def from_files(cls, *filenames):
+        results = []
+        for filename in filenames:
+            with open(filename, 'r') as f:
+                results.append(json.load(f))
+        return cls(results)
+
+    @classmethod
+    def from_folder(cls, folder=DATA_DIR):
+        filenames = [
+            os.path.join(folder, name) for name in sorted(os.listdir(folder))
+            if name.endswith('.json')
+        ]
+        return cls.from_files(*filenames)
+
+    @staticmethod
+    def filter(frame, **filters):
+        """
+        Return the rows of the frame matching every filter
+        """
+        return filter_frame(frame, normalize_filters(**filters))
+
+    def aggregate(self, group_by, **filters):
+        """
+        Return the number of wins and losses of the matches
+        grouped by the given columns
+        """
+        return aggregate_frame(self.filter(self.matches, **filters), group_by)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    Read only endpoints:
+
+        GET /matches?player=...&year=...&surface=...&columns=...&format=json|arrow
+        GET /tournaments?player=...&year=...
+        GET /aggregates?group_by=surface,year&player=...
+        GET /stats
+    """
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        response_format = params.pop('format', 'json')
+
+        key = (url.path, response_format, tuple(sorted(params.items())), self.server.corpus.version)
+        cached = self.server.cache.get(key)
+        if cached is not None:
+            return self._send(*cached)
+
+        try:
+            frame = self._get_frame(url.path, params)
+        except KeyError:
+            return self._send(404, 'application/json', b'{"error": "Not found"}')
+        except ValueError as e:
+            return self._send(400, 'application/json', json.dumps({'error': str(e)}).encode('utf-8'))
+
+        if isinstance(frame, dict):
+            return self._send(200, 'application/json', json.dumps(frame).encode('utf-8'))
+
+        if response_format == 'arrow':
+            if pyarrow is None:
+                return self._send(501, 'application/json', b'{"error": "pyarrow is not installed"}')
+            response = (200, 'application/vnd.apache.arrow.stream', self._to_arrow(frame))
+        else:
+            response = (200, 'application/json', frame.to_json(orient='records').encode('utf-8'))
+
+        self.server.cache.set(key, response)
+        self._send(*response)
+
+    def _get_frame(self, path, params):
+        corpus = self.server.corpus
+        filters = {name: params.get(name) for name in FILTERS}
+
+        if path == '/stats':
+            cache = self.server.cache
+            return {
+                'matches': len(corpus.matches),
+                'tournaments': len(corpus.tournaments),
+                'version': corpus.version,
+                'cache': {'size': len(cache), 'hits': cache.hits, 'misses': cache.misses}
+            }
+
+        if path == '/matches':
+            frame = corpus.filter(corpus.matches, **filters)
+        elif path == '/tournaments':
+            frame = corpus.filter(corpus.tournaments, **filters)
+        elif path == '/aggregates':
+            group_by = [item for item in params.get('group_by', 'player').split(',') if item]
+            return corpus.aggregate(group_by, **filters)
+        else:
+            raise KeyError(path)
+
+        if 'columns' in params:
+            columns = params['columns'].split(',')
+            unknown = [column for column in columns if column not in frame.columns]
+            if unknown:
+                raise ValueError(f'Unknown columns: {", ".join(unknown)}')
+            frame = frame[columns]
+
+        if 'limit' in params:
+            frame = frame.head(int(params['limit']))
+        return frame
+
+    @staticmethod
+    def _to_arrow(frame):
+        table = pyarrow.Table.from_pandas(frame, preserve_index=False)
+        sink = pyarrow.BufferOutputStream()
+        with pyarrow.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def create_server(corpus, host='127.0.0.1', port=8000, cache_size=256):
+    """
+    Create the query server. Call `serve_forever` to start it
+
+    Parameters
+
+        corpus (Corpus): the loaded data
+        port (int, optional): use 0 to pick a free port. Defaults to 8000
+        cache_size (int, optional): number of cached responses. Defaults to 256
+    """
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    server.daemon_threads = True
+    server.corpus = corpus
+    server.cache = LRUCache(maxsize=cache_size)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Serve the scraped matches over HTTP')
+    parser.add_argument('--folder', type=str, default=DATA_DIR, help='Folder containing the result files')
+    parser.add_argument('--host', type=str, default='127.0.0.1', help='Host to bind to')
+    parser.add_argument('--port', type=int, default=8000, help='Port to listen on')
+    parser.add_argument('--cache-size', type=int, default=256, help='Number of cached responses')
+    parsed_arguments = parser.parse_args()
+
+    corpus = Corpus.from_folder(parsed_arguments.folder)
+    server = create_server(
+        corpus,
+        host=parsed_arguments.host,
+        port=parsed_arguments.port,
+        cache_size=parsed_arguments.cache_size
+    )
+    print(f'Serving {len(corpus.matches)} matches on http://{parsed_arguments.host}:{server.server_port}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
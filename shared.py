@@ -0,0 +1,213 @@
+import json
+import multiprocessing
+import struct
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy
+import pandas
+from pandas.api.types import is_bool_dtype, is_numeric_dtype
+
+from wta_scrapper.models import Query
+from wta_scrapper.utils import split_results
+
+# The block starts with the size of the JSON header
+# that describes the columns stored after it
+HEADER_SIZE = struct.Struct('<Q')
+
+ALIGNMENT = 8
+
+# Names of the blocks published by this process
+_published = set()
+
+
+def _align(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_column(series):
+    """
+    Return the array stored in shared memory for a column and
+    its description. Text columns are stored as the codes of
+    their categories. Columns of lists cannot be shared and
+    None is returned for them. Any other column that cannot be
+    stored raises a ValueError rather than being left out
+    """
+    if is_numeric_dtype(series.dtype) or is_bool_dtype(series.dtype):
+        values = numpy.ascontiguousarray(series.to_numpy())
+        return values, {'kind': 'values', 'dtype': values.dtype.str}
+
+    try:
+        categorical = pandas.Categorical(series)
+    except TypeError:
+        if all(isinstance(item, (list, tuple)) for item in series.dropna()):
+            return None, None
+
+        types = sorted({type(item).__name__ for item in series.dropna()})
+        raise ValueError(
+            f"The column {series.name} cannot be shared, "
+            f"it mixes values of types {', '.join(types)}"
+        )
+
+    categories = categorical.categories.tolist()
+    dtype = 'int8' if len(categories) < 127 else 'int32'
+    values = categorical.codes.astype(dtype)
+    return values, {'kind': 'category', 'dtype': values.dtype.str, 'categories': categories}
+
+
+def _attach(name):
+    try:
+        # The worker must not remove the block when it exits,
+        # only the process that published it does
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+
+    # Before Python 3.13 attaching also registers the block with the
+    # resource tracker. The workers started by multiprocessing share the
+    # tracker of the process that published the block but any other
+    # process has its own tracker which removes the block when it exits
+    if name not in _published and multiprocessing.parent_process() is None:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class SharedCorpus:
+    """
+    Publishes the matches and the tournaments of a result as typed
+    column buffers in a single block of shared memory. Worker
+    processes on the same machine can then attach a read only
+    `SharedQuery` to the block by its name instead of receiving
+    a pickled copy of the data
+
+        with SharedCorpus(query) as corpus:
+            with ProcessPoolExecutor() as executor:
+                executor.map(analyze, repeat(corpus.name), years)
+
+        def analyze(name, year):
+            query = SharedQuery.attach(name)
+            return query.aggregate('surface', year=year)
+
+    Parameters
+
+        values (list, Query, MatchScrapper): the result values
+        name (str, optional): name of the block. Defaults to a random name
+    """
+    def __init__(self, values, name=None):
+        query = values if isinstance(values, Query) else Query(values)
+        _, metadata = split_results(query)
+
+        tables = {
+            'matches': query.get_matches(),
+            'tournaments': query.get_tournaments
+        }
+
+        columns = []
+        arrays = []
+        for table, frame in tables.items():
+            for column in frame.columns:
+                values, description = encode_column(frame[column])
+                if values is None:
+                    continue
+                description.update({'table': table, 'name': column, 'rows': len(values)})
+                columns.append(description)
+                arrays.append(values)
+
+        # The offsets are relative to the end of the header
+        offset = 0
+        for description, values in zip(columns, arrays):
+            description['offset'] = offset
+            offset = _align(offset + values.nbytes)
+
+        header = json.dumps({'metadata': metadata, 'columns': columns}, default=str).encode('utf-8')
+        start = _align(HEADER_SIZE.size + len(header))
+
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=max(start + offset, 1))
+        HEADER_SIZE.pack_into(self.shm.buf, 0, len(header))
+        self.shm.buf[HEADER_SIZE.size:HEADER_SIZE.size + len(header)] = header
+        for description, values in zip(columns, arrays):
+            numpy.ndarray(
+                values.shape,
+                dtype=values.dtype,
+                buffer=self.shm.buf,
+                offset=start + description['offset']
+            )[:] = values
+        _published.add(self.shm.name)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name}, {self.size} bytes)'
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def size(self):
+        return self.shm.size
+
+    def close(self):
+        """
+        Release and remove the block. Workers that are still
+        attached keep their view until they close it
+        """
+        _published.discard(self.shm.name)
+        self.shm.close()
+        self.shm.unlink()
+
+
+class SharedQuery(Query):
+    """
+    Read only query on the data published by `SharedCorpus`. The
+    columns of the dataframes are views on the shared memory which
+    means that attaching does not copy the data
+    """
+    def __init__(self, shm, cache_size=128):
+        self.shm = shm
+        size = HEADER_SIZE.unpack_from(shm.buf, 0)[0]
+        header = json.loads(bytes(shm.buf[HEADER_SIZE.size:HEADER_SIZE.size + size]))
+        start = _align(HEADER_SIZE.size + size)
+
+        columns = {'matches': {}, 'tournaments': {}}
+        for description in header['columns']:
+            values = numpy.ndarray(
+                (description['rows'],),
+                dtype=numpy.dtype(description['dtype']),
+                buffer=shm.buf,
+                offset=start + description['offset']
+            )
+            values.flags.writeable = False
+
+            if description['kind'] == 'category':
+                values = pandas.Categorical.from_codes(
+                    values, categories=description['categories'], validate=False
+                )
+            columns[description['table']][description['name']] = values
+
+        self.frames = {
+            table: pandas.DataFrame(items, copy=False)
+            for table, items in columns.items()
+        }
+        super().__init__([header['metadata']], cache_size=cache_size)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.shm.name})'
+
+    @classmethod
+    def attach(cls, name, **kwargs):
+        return cls(_attach(name), **kwargs)
+
+    def _get_frame(self, view):
+        try:
+            return self.frames[view]
+        except KeyError:
+            raise ValueError(f'Unknown view: {view}')
+
+    def close(self):
+        self.frames = {}
+        self.cache.clear()
+        self.shm.close()
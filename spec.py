@@ -0,0 +1,312 @@
+import json
+
+from bs4.element import Tag
+
+from wta_scrapper.tracing import get_span
+
+# The structure of the WTA player pages. Elements are matched
+# by their tag name and either a class that they have, a text
+# that their first class contains like `Mixins._filter` or a
+# text that any of their classes contains
+DEFAULT_SPEC = {
+    # The div containing each tournament
+    'tournament': {'tag': 'div', 'class': 'player-matches__tournament'},
+    # First div of the tournament
+    'header': {'tag': 'div', 'class_contains': 'header'},
+    # Children of the header that give the values used to
+    # build the tournament in the order that they appear
+    'header_fields': [
+        {'match': {'tag': 'h2'}, 'take': 'text'},
+        {
+            'match': {'tag': 'div', 'any_class_contains': 'locdate'},
+            'find': {'tag': 'span'},
+            'take': 'list',
+            'limit': 2
+        },
+        {
+            'match': {'tag': 'div', 'any_class_contains': 'meta'},
+            'find': {'tag': 'span', 'class_contains': 'value'},
+            'take': 'each'
+        }
+    ],
+    'rows': {'path': [{'tag': 'table'}, {'tag': 'tbody'}], 'match': {'tag': 'tr'}},
+    'opponent': {
+        'match': {'tag': 'a'},
+        'attrs': {'opp_name': 'title', 'link': 'href'}
+    },
+    # The cells of each row by position
+    'cells': [
+        {'field': 'details.round', 'find': {'tag': 'div'}, 'take': 'last_text'},
+        {'field': 'nationality', 'find': {'tag': 'img'}, 'take': 'attr', 'attr': 'alt', 'default': None},
+        {'field': 'details.opp_rank', 'take': 'text'},
+        {'field': 'details.result', 'take': 'text'},
+        {'field': 'details.score', 'take': 'text'}
+    ],
+    'footer': {'tag': 'div', 'class_contains': 'footer'}
+}
+
+TAKES = ('text', 'list', 'each', 'last_text', 'attr')
+
+
+def compile_matcher(spec):
+    """
+    Return a function that tells whether a tag matches a spec of
+    type {'tag': ..., 'class': ..., 'class_contains': ...}. The
+    text of class_contains is looked for in the first class and
+    the one of any_class_contains in all the classes
+    """
+    unknown = set(spec) - {'tag', 'class', 'class_contains', 'any_class_contains'}
+    if unknown:
+        raise ValueError(f'Unknown matcher keys: {", ".join(sorted(unknown))}')
+
+    name = spec.get('tag')
+    class_name = spec.get('class')
+    contains = spec.get('class_contains')
+    any_contains = spec.get('any_class_contains')
+
+    def matcher(tag):
+        if not isinstance(tag, Tag):
+            return False
+
+        if name is not None and tag.name != name:
+            return False
+
+        if class_name is None and contains is None and any_contains is None:
+            return True
+
+        classes = tag.attrs.get('class')
+        if not classes:
+            return False
+
+        if class_name is not None and class_name not in classes:
+            return False
+
+        if contains is not None and contains not in classes[0]:
+            return False
+
+        if any_contains is not None:
+            return any(any_contains in item for item in classes)
+        return True
+    return matcher
+
+
+def iter_tags(element, matcher, prune=False):
+    """
+    Iterate over the descendants of the element that match. This
+    is a plain traversal of the tree which avoids the generic
+    filtering of BeautifulSoup. When prune is True, the descendants
+    of a matching tag are not visited
+    """
+    stack = list(reversed(element.contents))
+    while stack:
+        item = stack.pop()
+        if not isinstance(item, Tag):
+            continue
+
+        if matcher(item):
+            yield item
+            if prune:
+                continue
+        stack.extend(reversed(item.contents))
+
+
+def find_first(element, matcher):
+    return next(iter_tags(element, matcher), None)
+
+
+def compile_header_field(spec):
+    """
+    Return a function that returns the value of a child of the
+    header and whether the value is a list of values to add
+    """
+    take = spec.get('take', 'text')
+    if take not in ('text', 'list', 'each'):
+        raise ValueError(f'Unknown value to take from the header: {take}')
+
+    matches = compile_matcher(spec['match'])
+    find = compile_matcher(spec['find']) if 'find' in spec else None
+    limit = spec.get('limit')
+
+    def field(child):
+        if not matches(child):
+            return None, False
+
+        if take == 'text':
+            return child.text, False
+
+        items = [item.text for item in iter_tags(child, find)]
+        if limit is not None:
+            items = items[:limit]
+        return items, take == 'each'
+    return field
+
+
+def compile_cell(spec):
+    """
+    Return a function that updates a match with the value of a cell
+    """
+    take = spec.get('take', 'text')
+    if take not in TAKES:
+        raise ValueError(f'Unknown value to take from a cell: {take}')
+
+    path = spec['field'].split('.')
+    find = compile_matcher(spec['find']) if 'find' in spec else None
+    has_default = 'default' in spec
+    default = spec.get('default')
+    attr = spec.get('attr')
+
+    def get_value(cell):
+        if take == 'text':
+            return cell.get_text()
+
+        if take == 'last_text':
+            items = list(iter_tags(cell, find))
+            if not items:
+                raise LookupError
+            return items[-1].text
+
+        tag = find_first(cell, find) if find is not None else cell
+        if tag is None or not tag.has_attr(attr):
+            raise LookupError
+        return tag.get_attribute_list(attr)[-1]
+
+    def update(match, cell):
+        try:
+            value = get_value(cell)
+        except LookupError:
+            if not has_default:
+                return
+            value = default
+
+        container = match
+        for key in path[:-1]:
+            container = container.setdefault(key, {})
+        container[path[-1]] = value
+    return update
+
+
+class ParsePlan:
+    """
+    The extraction rules of a page compiled once into functions
+    that are reused for every tournament of every page. Changes to
+    the layout of the pages only require editing the spec
+
+        plan = ParsePlan()
+        scrapper = MatchScrapper(filename='test_page.html', plan=plan)
+
+    Parameters
+
+        spec (dict, optional): the extraction rules. Defaults to DEFAULT_SPEC
+    """
+    def __init__(self, spec=None):
+        self.spec = spec if spec is not None else DEFAULT_SPEC
+        try:
+            self.is_tournament = compile_matcher(self.spec['tournament'])
+            self.is_header_tag = compile_matcher({'tag': self.spec['header'].get('tag')})
+            self.is_header = compile_matcher(self.spec['header'])
+            self.is_footer = compile_matcher(self.spec['footer'])
+            self.header_fields = [compile_header_field(item) for item in self.spec['header_fields']]
+
+            self.rows_path = [compile_matcher(item) for item in self.spec['rows']['path']]
+            self.is_row = compile_matcher(self.spec['rows']['match'])
+
+            self.is_opponent = compile_matcher(self.spec['opponent']['match'])
+            self.opponent_attrs = list(self.spec['opponent']['attrs'].items())
+            self.cells = [compile_cell(item) for item in self.spec['cells']]
+        except KeyError as e:
+            raise ValueError(f'The spec is missing the {e.args[0]} rule')
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.cells)} cells)'
+
+    def __reduce__(self):
+        # The compiled rules are closures which cannot be pickled
+        # so the plan is sent to the workers as its spec
+        return self.__class__, (self.spec,)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, 'r') as f:
+            return cls(json.load(f))
+
+    def get_block_class(self):
+        """
+        Return the class by which the tournaments are located in the
+        HTML file when the page is parsed in parallel. The blocks are
+        found without parsing the page which is why the spec has to
+        give the div of the tournaments and its first class
+        """
+        rule = self.spec['tournament']
+        if rule.get('tag') != 'div' or rule.get('class') is None:
+            raise ValueError('The spec has to give the div and the class of the tournaments to parse the page in parallel')
+        return rule['class']
+
+    def find_tournaments(self, soup):
+        return list(iter_tags(soup, self.is_tournament, prune=True))
+
+    def parse_header(self, header):
+        characteristics = []
+        for child in header.children:
+            if not isinstance(child, Tag):
+                continue
+
+            for field in self.header_fields:
+                value, is_many = field(child)
+                if value is None:
+                    continue
+
+                if is_many:
+                    characteristics.extend(value)
+                else:
+                    characteristics.append(value)
+        return characteristics
+
+    def parse_rows(self, element):
+        container = element
+        for matcher in self.rows_path:
+            container = find_first(container, matcher)
+            if container is None:
+                return []
+        return iter_tags(container, self.is_row)
+
+    def parse_match(self, row):
+        match = {'opp_name': None, 'link': None, 'nationality': None, 'details': {}}
+        opponent = find_first(row, self.is_opponent)
+        if opponent is not None:
+            for field, attr in self.opponent_attrs:
+                match[field] = opponent.get_attribute_list(attr)[-1]
+
+        cells = [item for item in row.contents if isinstance(item, Tag) and item.name == 'td']
+        for update, cell in zip(self.cells, cells):
+            update(match, cell)
+        return match
+
+    def parse_tournament(self, element, scrapper, date_range=None):
+        """
+        Return the same values as `MatchScrapper._build_tournament`
+        using the compiled rules or None if the block has no header
+        or is not within the date range. The header and the matches
+        are recorded in the metrics and the trace of the scrapper
+        under the same stages as the methods of the scrapper
+        """
+        header = find_first(element, self.is_header_tag)
+        if header is None or not self.is_header(header):
+            return None
+
+        with scrapper.metrics.time('header'), get_span(scrapper, 'header') as attributes:
+            base = scrapper._build_tournament_dict(matches=[])
+            name, details = scrapper._construct_tournament_header(self.parse_header(header))
+            base.update({name: details})
+            attributes.update({'tournament': name})
+
+        if not scrapper._is_in_range(base, date_range):
+            return None
+
+        with scrapper.metrics.time('matches'), get_span(scrapper, 'matches') as attributes:
+            base['matches'].extend(self.parse_match(row) for row in self.parse_rows(element))
+            attributes.update({'tournament': name, 'matches': len(base['matches'])})
+
+        footers = list(iter_tags(element, self.is_footer))
+        if footers:
+            base = scrapper._parse_footer(footers[-1], using=base)
+        return base
@@ -0,0 +1,204 @@
+from collections import defaultdict
+
+import pandas
+
+from wta_scrapper.players import PlayerIndex
+from wta_scrapper.score import Score
+from wta_scrapper.utils import iter_matches, split_results
+
+VIEWS = ('overall', 'surface', 'year', 'round', 'type', 'top_10', 'tie_breaks')
+
+
+def _new_views():
+    return {view: defaultdict(lambda: [0, 0]) for view in VIEWS}
+
+
+def _add_views(views, other):
+    for view, items in other.items():
+        for key, (wins, losses) in items.items():
+            counts = views[view][key]
+            counts[0] += wins
+            counts[1] += losses
+
+
+class CareerStats:
+    """
+    Materialized views of the win/loss records of each player
+    by surface, year, round, tournament type, against top 10
+    players and in tie breaks
+
+    The views are updated with the new matches only each time
+    tournaments are added which avoids rebuilding the matches
+    dataframe and grouping it again
+
+    The players are resolved by `PlayerIndex.resolve` like in
+    `HeadToHead` which means that the pages of a player built with
+    `player_name` or with `player_link` update the same views once
+    her link was seen on the page of one of her opponents
+
+    Parameters
+
+        top (int, optional): the rank under which an opponent is considered
+        as a top player. Defaults to 10
+        players (PlayerIndex, optional): an existing index to share
+    """
+    def __init__(self, top=10, players=None):
+        self.top = top
+        self.players = players if players is not None else PlayerIndex()
+        self.views = defaultdict(_new_views)
+        # Views of each tournament of each player which
+        # are needed to merge the views of two codes
+        self.tournaments = defaultdict(dict)
+        self.number_of_merges = 0
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({len(self.views)} players)'
+
+    def __contains__(self, player):
+        return self._get_code(player) in self.views
+
+    def _get_code(self, player):
+        self._apply_merges()
+        return self.players.resolve(player, create=False)
+
+    def _apply_merges(self):
+        """
+        Move the tournaments of the codes that were merged by the
+        index to the code in which they were merged. The tournaments
+        that were added under both codes are only counted once
+        """
+        merges = list(self.players.merged)[self.number_of_merges:]
+        self.number_of_merges += len(merges)
+        for old in merges:
+            self.views.pop(old, None)
+            tournaments = self.tournaments.pop(old, {})
+            if not tournaments:
+                continue
+
+            new = self.players.find(old)
+            seen = self.tournaments[new]
+            for key, views in tournaments.items():
+                if key not in seen:
+                    seen[key] = views
+                    _add_views(self.views[new], views)
+
+    def add(self, values, player=None):
+        """
+        Update the views with the tournaments of a result. Tournaments
+        that were already added for the player are ignored
+
+        Parameters
+
+            values (list, Query, MatchScrapper): the result values
+            player (str, optional): link, id or name of the player. Defaults
+            to the metadata of the result
+
+        Returns
+
+            int: the number of matches that were added
+        """
+        _, metadata = split_results(values)
+        name = None
+        if player is None:
+            player = metadata.get('player_link', metadata.get('player_id'))
+            name = metadata.get('player_name')
+
+        player = self.players.resolve(player, name=name)
+        if player is None:
+            raise ValueError(
+                'Could not determine the player for these values. '
+                "Provide 'player' or build the values with 'player_name'"
+            )
+
+        # The links of the opponents are resolved so that their
+        # names are known when their own pages are added
+        for _, match in iter_matches(values):
+            self.players.resolve(match.get('link'), name=match.get('opp_name'))
+        self._apply_merges()
+        player = self.players.find(player)
+
+        views = self.views[player]
+        seen = self.tournaments[player]
+        number_of_tournaments = len(seen)
+
+        added = 0
+        current_tournament = None
+        for tournament, match in iter_matches(values):
+            if tournament is not current_tournament:
+                current_tournament = tournament
+                key = (str(tournament.get('date')), tournament.get('name'))
+                tournament_views = None
+                if key not in seen:
+                    tournament_views = seen[key] = _new_views()
+
+            if tournament_views is not None:
+                added += self._add_match(tournament_views, tournament, match)
+
+        for key in list(seen)[number_of_tournaments:]:
+            _add_views(views, seen[key])
+        return added
+
+    def _add_match(self, views, tournament, match):
+        details = match['details']
+        result = details.get('result')
+        if result not in ('W', 'L'):
+            return 0
+
+        index = 0 if result == 'W' else 1
+        views['overall']['all'][index] += 1
+        views['surface'][tournament.get('surface')][index] += 1
+        views['year'][tournament.get('year')][index] += 1
+        views['round'][details.get('round')][index] += 1
+        views['type'][tournament.get('type')][index] += 1
+
+        opp_rank = details.get('opp_rank')
+        if opp_rank is not None and str(opp_rank).isnumeric():
+            if int(opp_rank) <= self.top:
+                views['top_10']['all'][index] += 1
+
+        score = details.get('score')
+        if score:
+            score = Score(score)
+            if score.is_valid:
+                for lhs, rhs in score.score:
+                    if (lhs, rhs) == (7, 6):
+                        views['tie_breaks']['all'][0] += 1
+                    elif (lhs, rhs) == (6, 7):
+                        views['tie_breaks']['all'][1] += 1
+        return 1
+
+    def get(self, player, view='overall'):
+        """
+        Return a view for a player
+
+        Parameters
+
+            player (str): link, id or name of the player
+            view (str, optional): one of VIEWS. Defaults to 'overall'
+
+        Returns
+
+            dict: {key: {'wins': ..., 'losses': ..., 'win_rate': ...}}
+        """
+        if view not in VIEWS:
+            raise ValueError(f'Unknown view: {view}. Choose one of {", ".join(VIEWS)}')
+
+        code = self._get_code(player)
+        if code not in self.views:
+            return {}
+
+        result = {}
+        for item, (wins, losses) in self.views[code][view].items():
+            total = wins + losses
+            result[item] = {
+                'wins': wins,
+                'losses': losses,
+                'win_rate': round(wins / total, 4) if total else None
+            }
+        return result
+
+    def get_dataframe(self, player, view='overall'):
+        """
+        Return a view for a player as a dataframe
+        """
+        return pandas.DataFrame.from_dict(self.get(player, view=view), orient='index')
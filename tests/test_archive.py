@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.archive import PageArchive, PageReference
+from wta_scrapper.generator import PageGenerator
+from wta_scrapper.metrics import Metrics
+
+
+class TestPageArchive(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'pages.pack')
+        self.pages = [
+            PageGenerator(number_of_tournaments=5, seed=i).render()
+            for i in range(3)
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_random_access(self):
+        with PageArchive(self.path) as archive:
+            for i, page in enumerate(self.pages):
+                archive.add(f'player_{i}', page, date='2021-01-15')
+
+        archive = PageArchive(self.path)
+        self.assertEqual(len(archive), 3)
+        self.assertIn('player_1', archive)
+        self.assertEqual(archive.read('player_2'), self.pages[2])
+        self.assertEqual(archive.read('player_0', date='2021-01-15'), self.pages[0])
+        self.assertLess(archive.stats()['compressed'], archive.stats()['uncompressed'])
+
+        with self.assertRaises(KeyError):
+            archive.get('player_3')
+
+    def test_append(self):
+        with PageArchive(self.path) as archive:
+            archive.add('player', self.pages[0], date='2021-01-15')
+
+        size = os.path.getsize(self.path)
+        with PageArchive(self.path) as archive:
+            # The same content is not stored twice
+            archive.add('player', self.pages[0], date='2021-01-22')
+            self.assertEqual(os.path.getsize(self.path), size)
+            archive.add('player', self.pages[1], date='2021-02-01')
+
+        archive = PageArchive(self.path)
+        self.assertEqual(len(archive), 2)
+        self.assertEqual(archive.get('player').date, '2021-02-01')
+        self.assertEqual(archive.read('player', date='2021-01-15'), self.pages[0])
+
+    def test_interrupted_write(self):
+        with PageArchive(self.path) as archive:
+            archive.add('player_0', self.pages[0])
+
+        # A page without its index is ignored
+        archive = PageArchive(self.path)
+        archive.add('player_1', self.pages[1])
+        archive = PageArchive(self.path)
+        self.assertEqual(len(archive), 1)
+        self.assertEqual(archive.read('player_0'), self.pages[0])
+
+    def test_scrapper(self):
+        with PageArchive(self.path) as archive:
+            reference = archive.add('player', self.pages[0])
+        self.assertIsInstance(reference, PageReference)
+
+        scrapper = MatchScrapper(filename=reference, metrics=Metrics(enabled=False))
+        values = scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard')
+
+        expected = MatchScrapper(metrics=Metrics(enabled=False))
+        expected.soup = BeautifulSoup(self.pages[0], 'html.parser')
+        self.assertEqual(values, expected.build('player-matches__tournament', player_name='Eugenie Bouchard'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import asyncio
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.async_scrapper import AsyncMatchScrapper, build_pages
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.stats import CareerStats
+
+CRITERIA = 'player-matches__tournament'
+
+
+def build_serially():
+    scrapper = MatchScrapper(filename='test_page.html', metrics=Metrics(enabled=False))
+    return scrapper.build(CRITERIA, player_name='Eugenie Bouchard')
+
+
+class TestAsyncMatchScrapper(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.expected = build_serially()
+
+    def build_pages(self, executor, filenames=('test_page.html', 'test_page.html'), **kwargs):
+        return asyncio.run(build_pages(
+            list(filenames), CRITERIA, concurrency=2,
+            executor=executor, player_name='Eugenie Bouchard', **kwargs
+        ))
+
+    def test_thread_executor(self):
+        metrics = Metrics()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            values = self.build_pages(executor, metrics=metrics)
+        self.assertEqual(values, [self.expected, self.expected])
+        self.assertEqual(metrics.counters['pages'], 2)
+        self.assertEqual(metrics.snapshot()['stages']['header']['count'], 2 * 25)
+
+    def test_process_executor(self):
+        metrics = Metrics()
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            values = self.build_pages(executor, metrics=metrics)
+        self.assertEqual(values, [self.expected, self.expected])
+
+        # The metrics of the processes are merged
+        self.assertEqual(metrics.counters['pages'], 2)
+        self.assertEqual(metrics.snapshot()['stages']['build']['count'], 2)
+
+    def test_stats(self):
+        stats = CareerStats()
+        scrapper = AsyncMatchScrapper('test_page.html', stats=stats, metrics=Metrics(enabled=False))
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            scrapper.executor = executor
+            values = asyncio.run(scrapper.build(CRITERIA, player_name='Eugenie Bouchard'))
+        self.assertEqual(values, self.expected)
+        self.assertEqual(scrapper.tournaments, self.expected)
+        self.assertIn('Eugenie Bouchard', stats)
+
+    def test_errors(self):
+        for executor_class in (ThreadPoolExecutor, ProcessPoolExecutor):
+            with executor_class(max_workers=2) as executor:
+                with self.assertRaises(FileNotFoundError):
+                    self.build_pages(executor, filenames=['test_page.html', 'missing.html'])
+
+        with self.assertRaises(ValueError):
+            asyncio.run(AsyncMatchScrapper().build(CRITERIA))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+
+from wta_scrapper.batch import BatchRunner, Journal
+
+CRITERIA = 'player-matches__tournament'
+
+
+class FlakyBuild:
+    """
+    Fails the first `failures` calls for each page
+    """
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = []
+
+    def __call__(self, item, f, **kwargs):
+        self.calls.append(item)
+        if self.calls.count(item) <= self.failures:
+            raise ConnectionError('The page could not be read')
+        return [{'player_name': kwargs.get('player_name'), 'page': item}]
+
+
+class TestBatchRunner(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.output_dir = self.directory.name
+        self.journal = os.path.join(self.output_dir, 'journal.jsonl')
+        self.waits = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def get_runner(self, inputs, **kwargs):
+        kwargs.setdefault('sleep', self.waits.append)
+        return BatchRunner(inputs, CRITERIA, output_dir=self.output_dir, journal=self.journal, **kwargs)
+
+    def test_build_and_resume(self):
+        runner = self.get_runner(['test_page.html'], player_name='Eugenie Bouchard')
+        report = runner.run()
+        self.assertEqual(report['done'], 1)
+
+        with open(os.path.join(self.output_dir, 'test_page.json'), 'r') as f:
+            values = json.load(f)
+        self.assertEqual(values[-1]['player_name'], 'Eugenie Bouchard')
+        self.assertIsNotNone(runner.eta()[1])
+
+        # A restarted batch skips the completed page
+        report = self.get_runner(['test_page.html']).run()
+        self.assertEqual((report['done'], report['skipped']), (0, 1))
+
+        # An output that was modified is not trusted
+        with open(os.path.join(self.output_dir, 'test_page.json'), 'w') as f:
+            f.write('[')
+        build = FlakyBuild()
+        report = self.get_runner(['test_page.html'], build=build).run()
+        self.assertEqual(report['done'], 1)
+        self.assertEqual(build.calls, ['test_page.html'])
+
+    def test_retries(self):
+        build = FlakyBuild(failures=2)
+        report = self.get_runner(['test_page.html'], build=build, retries=2, backoff=0.5).run()
+        self.assertEqual(report['done'], 1)
+        self.assertEqual(self.waits, [0.5, 1])
+
+        journal = Journal(self.journal)
+        self.assertEqual(journal.get('test_page.html')['attempt'], 3)
+
+        with open(self.journal, 'r') as f:
+            statuses = [json.loads(line)['status'] for line in f]
+        self.assertEqual(statuses, ['started', 'failed'] * 2 + ['started', 'done'])
+
+    def test_failures(self):
+        build = FlakyBuild(failures=5)
+        report = self.get_runner(['test_page.html', 'missing.html'], build=build, retries=1).run()
+        self.assertEqual((report['done'], report['failed']), (0, 2))
+        # The missing page is not retried
+        self.assertEqual(build.calls, ['test_page.html'] * 2)
+        self.assertEqual(Journal(self.journal).summary(), {'started': 0, 'done': 0, 'failed': 2})
+
+    def test_incomplete_journal(self):
+        self.get_runner(['test_page.html'], build=FlakyBuild()).run()
+        with open(self.journal, 'a') as f:
+            f.write('{"input": "test_page.html", "sta')
+
+        journal = Journal(self.journal)
+        self.assertEqual(journal.get('test_page.html')['status'], 'done')
+        report = self.get_runner(['test_page.html'], build=FlakyBuild()).run()
+        self.assertEqual(report['skipped'], 1)
+
+        # The torn line is removed and the records
+        # written afterwards can be read back
+        journal.write('failed', 'other_page.html', None, attempt=0)
+        journal = Journal(self.journal)
+        self.assertEqual(journal.get('other_page.html')['status'], 'failed')
+        self.assertEqual(journal.get('test_page.html')['status'], 'done')
+        with open(self.journal, 'r') as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(records[-1]['input'], 'other_page.html')
+
+        # A record that only misses the end of its line is kept
+        with open(self.journal, 'a') as f:
+            f.write(json.dumps({'input': 'last_page.html', 'hash': None, 'status': 'started'}))
+        journal = Journal(self.journal)
+        journal.write('done', 'last_page.html', None, attempt=1)
+        journal = Journal(self.journal)
+        self.assertEqual(journal.get('last_page.html')['status'], 'done')
+        self.assertEqual(len(journal), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
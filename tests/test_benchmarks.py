@@ -0,0 +1,24 @@
+import unittest
+
+from wta_scrapper.benchmarks.suite import (compare, get_missing, get_values,
+                                          render_page)
+from wta_scrapper.utils import split_results
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_compare(self):
+        baselines = {'parse[small]': 1.0, 'score[small]': 1.0}
+        results = {'parse[small]': 1.2, 'score[small]': 1.5, 'json[small]': 3}
+        regressions = compare(results, baselines, threshold=0.25)
+        self.assertEqual(regressions, [('score[small]', 1.0, 1.5)])
+        self.assertEqual(get_missing(results, baselines), ['json[small]'])
+
+    def test_values(self):
+        tournaments, metadata = split_results(get_values(copies=2))
+        self.assertEqual(len(tournaments), 50)
+        self.assertIn('player_name', metadata)
+        self.assertIn('player-matches__tournament-footer', render_page(tournaments))
+
+
+if __name__ == "__main__":
+    unittest.main()
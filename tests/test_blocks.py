@@ -0,0 +1,102 @@
+import copy
+import os
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.blocks import find_blocks, read_block
+from wta_scrapper.generator import PageGenerator
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.spec import DEFAULT_SPEC, ParsePlan
+from wta_scrapper.utils import BASE_DIR
+
+
+class TestParallelParsing(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'page.html')
+        self.page = PageGenerator(number_of_tournaments=30, edge_cases=0.2).write(self.path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_find_blocks(self):
+        blocks = find_blocks(self.path)
+        self.assertEqual(len(blocks), 30)
+        start, end = blocks[0]
+        self.assertTrue(read_block(self.path, start, end).startswith('<div class="player-matches__tournament">'))
+
+    def test_same_values_as_soup(self):
+        scrapper = MatchScrapper(metrics=Metrics(enabled=False))
+        with open(self.path, 'r') as f:
+            scrapper.soup = BeautifulSoup(f, 'html.parser')
+        expected = scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            scrapper = MatchScrapper(metrics=Metrics(enabled=False), executor=executor)
+            scrapper.path = self.path
+            values = scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard')
+        self.assertEqual(values, expected)
+
+    def test_worker_metrics(self):
+        metrics = Metrics()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            scrapper = MatchScrapper(metrics=metrics, executor=executor)
+            scrapper.path = self.path
+            scrapper.build('player-matches__tournament')
+
+        stages = metrics.snapshot()['stages']
+        self.assertEqual(stages['header']['count'], 30)
+        self.assertEqual(stages['footer']['count'], 30)
+        self.assertIn('matches', stages)
+        self.assertEqual(stages['build']['count'], 1)
+
+    def test_plan(self):
+        expected = MatchScrapper(metrics=Metrics(enabled=False))
+        with open(self.path, 'r') as f:
+            expected.soup = BeautifulSoup(f, 'html.parser')
+        expected = expected.build('player-matches__tournament', player_name='Eugenie Bouchard')
+
+        # The layout changes and only the spec is updated
+        with open(self.path, 'r') as f:
+            page = f.read()
+        with open(self.path, 'w') as f:
+            f.write(page.replace('player-matches__tournament-footer', 'player-matches__tournament-summary'))
+        spec = copy.deepcopy(DEFAULT_SPEC)
+        spec['footer'] = {'tag': 'div', 'class_contains': 'summary'}
+
+        # The plan is sent to other processes
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            scrapper = MatchScrapper(metrics=Metrics(enabled=False), executor=executor, plan=ParsePlan(spec))
+            scrapper.path = self.path
+            values = scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard')
+        self.assertEqual(values, expected)
+
+        spec['tournament'] = {'tag': 'div', 'class_contains': 'tournament'}
+        scrapper = MatchScrapper(metrics=Metrics(enabled=False), workers=2, plan=ParsePlan(spec))
+        scrapper.path = self.path
+        with self.assertRaises(ValueError):
+            scrapper.build('player-matches__tournament')
+
+    def test_date_range(self):
+        path = os.path.join(BASE_DIR, 'html', 'test_page.html')
+        expected = MatchScrapper(filename='test_page.html', metrics=Metrics(enabled=False))
+        expected = expected.build('player-matches__tournament', since='2014-06-01')
+
+        metrics = Metrics()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            scrapper = MatchScrapper(metrics=metrics, executor=executor)
+            scrapper.path = path
+            values = scrapper.build('player-matches__tournament', since='2014-06-01')
+        self.assertEqual(values, expected)
+
+        # The blocks after the first older tournament are not parsed
+        blocks = find_blocks(path)
+        self.assertLess(metrics.snapshot()['stages']['header']['count'], len(blocks))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import json
+import os
+import tempfile
+import unittest
+
+from wta_scrapper.chunked import ChunkedQuery
+from wta_scrapper.models import Query
+from wta_scrapper.score import get_games
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestChunkedQuery(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+
+        self.folder = tempfile.TemporaryDirectory()
+        for name in ('Eugenie Bouchard', 'Other Player'):
+            data = [*self.data[:-1], {**self.data[-1], 'player_name': name}]
+            path = os.path.join(self.folder.name, f'{name.lower().replace(" ", "_")}.json')
+            with open(path, 'w') as f:
+                json.dump(data, f)
+        self.query = ChunkedQuery.from_folder(self.folder.name, chunk_size=10)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_chunks(self):
+        chunks = list(self.query.iter_chunks())
+        self.assertTrue(all(len(chunk) <= 10 for chunk in chunks))
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 152)
+        self.assertEqual(self.query.count(view='tournaments'), 50)
+
+    def test_filter(self):
+        matches = self.query.filter(player='Other Player', surface='Clay', columns=['player', 'surface'])
+        self.assertEqual(len(matches), 21)
+        self.assertEqual(set(matches['player']), {'Other Player'})
+        self.assertEqual(len(self.query.filter(limit=15)), 15)
+
+    def test_player_keys(self):
+        # The player is matched like in Query, by name, slug or link
+        expected = self.query.count(player='Eugenie Bouchard')
+        self.assertEqual(expected, 76)
+        self.assertEqual(self.query.count(player='eugenie-bouchard'), expected)
+        self.assertEqual(self.query.count(player=('eugenie bouchard', 'Nobody')), expected)
+        self.assertEqual(self.query.count(player='Other'), 0)
+
+        path = os.path.join(self.folder.name, 'simona_halep.json')
+        with open(path, 'w') as f:
+            json.dump([*self.data[:-1], {'player_link': '/players/314320/simona-halep'}], f)
+        query = ChunkedQuery.from_folder(self.folder.name)
+        self.assertEqual(query.count(player='314320'), 76)
+        self.assertEqual(query.count(player='//www.wtatennis.com/players/314320/simona-halep'), 76)
+
+    def test_aggregate(self):
+        result = self.query.aggregate('surface', player='Eugenie Bouchard')
+        expected = Query(self.data).aggregate('surface')
+        self.assertEqual(result['wins'].tolist(), expected['wins'].tolist())
+        self.assertEqual(result['losses'].tolist(), expected['losses'].tolist())
+
+        games = [get_games(match['details']['score']) for item in self.data[:-1]
+                 for details in item.values() for match in details['matches']]
+        self.assertEqual(result['games_won'].sum(), sum(item[0] for item in games))
+
+        result = self.query.aggregate(['player', 'year'])
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result['wins'].iloc[0], result['wins'].iloc[1])
+
+    def test_unknown_column(self):
+        with self.assertRaises(ValueError):
+            self.query.aggregate('opponent')
+
+
+if __name__ == "__main__":
+    unittest.main()
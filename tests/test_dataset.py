@@ -0,0 +1,120 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from wta_scrapper.dataset import UNKNOWN_PARTITION, Dataset
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestDataset(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+
+        # Move the first tournaments of the season to 2013
+        self.data = copy.deepcopy(self.data)
+        for tournament in self.data[-4:-1]:
+            for details in tournament.values():
+                details['date'] = details['date'].replace('2014', '2013')
+                details['year'] = 2013
+
+        self.other = copy.deepcopy(self.data[:2])
+        self.other.append({'player_name': 'Simona Halep', 'year': 2014, 'date_as_string': True})
+
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, 'dataset')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_write(self):
+        dataset = Dataset(self.root)
+        entries = dataset.write(self.data)
+        self.assertEqual([entry['year'] for entry in entries], [2014, 2013])
+        self.assertEqual(entries[1]['rows'], 9)
+        self.assertEqual(entries[1]['min_date'], '2013-01-10')
+        self.assertEqual(entries[1]['surfaces'], ['6M/0Q/2D', 'Hard'])
+        self.assertEqual(sum(entry['rows'] for entry in entries), 76)
+
+        # The manifest is read back when the dataset is opened
+        dataset = Dataset(self.root)
+        self.assertEqual(len(dataset), 2)
+        self.assertEqual(dataset.players, ['eugenie-bouchard'])
+
+        with self.assertRaises(ValueError):
+            Dataset(self.root, partition_by='season')
+
+    def test_rewrite_removes_partitions(self):
+        dataset = Dataset(self.root)
+        dataset.write(self.data)
+        dataset.write(self.data[:2] + self.data[-1:])
+        self.assertEqual(len(dataset), 1)
+        self.assertFalse(os.path.exists(os.path.join(self.root, 'player=eugenie-bouchard', 'year=2013')))
+
+    def test_pruning(self):
+        dataset = Dataset(self.root)
+        dataset.write(self.data)
+        dataset.write(self.other)
+        self.assertEqual(len(dataset), 3)
+
+        self.assertEqual(len(dataset.partitions(year=2013)), 1)
+        self.assertEqual(len(dataset.partitions(player='Simona Halep')), 1)
+        self.assertEqual(len(dataset.partitions(player='Eugenie Bouchard', surface='Clay')), 1)
+        self.assertEqual(len(dataset.partitions(year=2013, surface='Clay')), 0)
+        self.assertEqual(len(dataset.partitions(result='W')), 3)
+
+    def test_query(self):
+        dataset = Dataset(self.root)
+        dataset.write(self.data)
+        dataset.write(self.other)
+
+        query = dataset.query(player='Eugenie Bouchard', year=2013)
+        self.assertEqual(len(query.get_matches()), 9)
+        self.assertEqual(len(query.filter(year=2013)), 9)
+        self.assertEqual(len(dataset.query(player='Eugenie Bouchard').get_tournaments), 25)
+
+        with self.assertRaises(ValueError):
+            dataset.query(year=2014)
+
+        chunked = dataset.chunked(year=2014)
+        self.assertEqual(chunked.count(year=2014), 72)
+
+    def test_season(self):
+        dataset = Dataset(self.root, partition_by='season')
+        entries = dataset.write(self.data)
+        self.assertEqual([entry['season'] for entry in entries], [2014, 2013])
+        self.assertEqual(entries[1]['seasons'], [2013])
+        self.assertEqual(len(dataset.partitions(year=2013)), 1)
+        self.assertEqual(len(dataset.partitions(year=2012)), 0)
+
+    def test_unknown_partition(self):
+        data = copy.deepcopy(self.data)
+        for details in data[0].values():
+            details['date'] = None
+        for details in data[1].values():
+            details['date'] = 'Oct 2014'
+            details['year'] = None
+
+        dataset = Dataset(self.root)
+        entries = dataset.write(data)
+        self.assertEqual([entry['year'] for entry in entries], [UNKNOWN_PARTITION, 2014, 2013])
+        self.assertEqual(entries[0]['tournaments'], 2)
+        # The date that was not parsed is not compared with the others
+        self.assertIsNone(entries[0]['min_date'])
+        self.assertIsNone(entries[0]['max_date'])
+        self.assertEqual(entries[0]['seasons'], [2014])
+        self.assertEqual(sum(entry['rows'] for entry in entries), 76)
+        self.assertEqual(len(dataset.query(player='Eugenie Bouchard').get_tournaments), 25)
+
+        dataset = Dataset(os.path.join(self.directory.name, 'seasons'), partition_by='season')
+        entries = dataset.write(data)
+        self.assertEqual([entry['season'] for entry in entries], [2014, UNKNOWN_PARTITION, 2013])
+        self.assertEqual(entries[1]['seasons'], [])
+        self.assertEqual(len(dataset.partitions(year=2014)), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
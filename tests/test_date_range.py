@@ -0,0 +1,74 @@
+import datetime
+import unittest
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.spec import ParsePlan
+from wta_scrapper.utils import DateRange, split_results
+
+
+def build(plan=None, **kwargs):
+    metrics = Metrics()
+    scrapper = MatchScrapper(filename='test_page.html', metrics=metrics, plan=plan)
+    values = scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard', **kwargs)
+    tournaments, metadata = split_results(values)
+    return tournaments, metadata, metrics
+
+
+def get_dates(tournaments):
+    return [details['date'] for item in tournaments for details in item.values()]
+
+
+class TestDateRange(unittest.TestCase):
+    def test_range(self):
+        date_range = DateRange(since='2014-06-01', until='2014-08-31')
+        self.assertTrue(date_range.accepts(datetime.date(2014, 7, 5)))
+        self.assertFalse(date_range.accepts(datetime.date(2014, 9, 7)))
+        self.assertFalse(date_range.passed)
+        self.assertTrue(date_range.accepts(None))
+        self.assertFalse(date_range.accepts(datetime.date(2014, 5, 24)))
+        self.assertTrue(date_range.passed)
+
+        date_range = DateRange(since='2014-06-01', year=2014)
+        self.assertEqual(date_range.since, datetime.date(2014, 6, 1))
+        self.assertEqual(date_range.until, datetime.date(2014, 12, 31))
+
+    def test_since(self):
+        expected, _, _ = build()
+        tournaments, _, metrics = build(since='2014-06-01')
+        self.assertEqual(len(tournaments), 11)
+        self.assertEqual(get_dates(tournaments), get_dates(expected)[:11])
+
+        # The parsing stops at the first older tournament
+        self.assertEqual(metrics.counters['skipped_tournaments'], 1)
+
+    def test_until(self):
+        tournaments, _, metrics = build(since='2014-06-01', until='2014-08-31')
+        dates = get_dates(tournaments)
+        self.assertEqual(dates[0], '2014-08-23')
+        self.assertEqual(dates[-1], '2014-06-07')
+        self.assertEqual(metrics.counters['skipped_tournaments'], 6)
+
+    def test_year(self):
+        tournaments, metadata, _ = build(year=2014)
+        self.assertEqual(len(tournaments), 25)
+        self.assertEqual(metadata['year'], 2014)
+
+        # Every tournament is older which stops
+        # the parsing at the first one
+        tournaments, _, metrics = build(year=2015)
+        self.assertEqual(len(tournaments), 0)
+        self.assertEqual(metrics.counters['skipped_tournaments'], 1)
+
+        tournaments, _, metrics = build(year=2013)
+        self.assertEqual(len(tournaments), 0)
+        self.assertEqual(metrics.counters['skipped_tournaments'], 25)
+
+    def test_plan(self):
+        expected, _, _ = build(since='2014-06-01', until='2014-08-31')
+        tournaments, _, _ = build(plan=ParsePlan(), since='2014-06-01', until='2014-08-31')
+        self.assertEqual(tournaments, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,94 @@
+import copy
+import json
+import os
+import unittest
+
+from wta_scrapper.dedup import Deduplicator, get_fingerprint, normalize_score
+from wta_scrapper.utils import get_player_id
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+def mirror(player_link, player_name, opponent_name, opponent_link, tournament, match):
+    """
+    Return the page of the opponent containing the mirrored match
+    """
+    details = match['details']
+    # Flipping the games gives the score seen from the opponent's page
+    sets = normalize_score(details['score'], 'L')
+    mirrored = {
+        'opp_name': player_name,
+        'link': player_link,
+        'nationality': 'CAN',
+        'details': {
+            'round': details['round'],
+            'opp_rank': '5',
+            'result': 'W' if details['result'] == 'L' else 'L',
+            'score': sets.replace(' ', '')
+        },
+        'id': 1
+    }
+    values = {**copy.deepcopy(tournament), 'matches': [mirrored]}
+    return [{values['name']: values}, {'player_name': opponent_name, 'player_link': opponent_link}]
+
+
+class TestDeduplication(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+        self.data[-1]['player_link'] = '//www.wtatennis.com/players/316956/eugenie-bouchard'
+
+    def test_normalize_score(self):
+        self.assertEqual(normalize_score('2-66-17-65', 'W'), '2-6 6-1 7-6')
+        self.assertEqual(normalize_score('6-21-665-7', 'L'), '2-6 6-1 7-6')
+        self.assertEqual(normalize_score('6-25-2 Retired', 'W'), '6-2 5-2 Retired')
+        self.assertEqual(normalize_score('Walkover', 'L'), 'Walkover')
+
+    def test_mirrored_match(self):
+        tournament = self.data[0]['Singapore']
+        match = tournament['matches'][0]
+        opponent_page = mirror(
+            self.data[-1]['player_link'], 'Eugenie Bouchard',
+            match['opp_name'], match['link'], tournament, match
+        )
+
+        fingerprint = get_fingerprint('316956', tournament, match)
+        self.assertEqual(fingerprint, get_fingerprint('314320', tournament, opponent_page[0]['Singapore']['matches'][0]))
+
+        deduplicator = Deduplicator()
+        deduplicator.filter(self.data)
+        result = deduplicator.filter(opponent_page)
+        self.assertEqual(result[0]['Singapore']['matches'], [])
+        report = deduplicator.report()
+        self.assertEqual(report['merged'], 1)
+        self.assertEqual(report['collisions'][0]['kept_from'], '316956')
+
+    def test_pages_without_links(self):
+        # Both pages are built with player_name only, the
+        # players are matched through the links of the matches
+        del self.data[-1]['player_link']
+        tournament = self.data[0]['Singapore']
+        match = tournament['matches'][0]
+        bouchard = '//www.wtatennis.com/players/328560/eugenie-bouchard'
+        opponent_page = mirror(bouchard, 'Eugenie Bouchard', match['opp_name'], None, tournament, match)
+        del opponent_page[-1]['player_link']
+
+        for pages in ([self.data, opponent_page], [opponent_page, self.data]):
+            deduplicator = Deduplicator()
+            results = [deduplicator.filter(page) for page in pages]
+            report = deduplicator.report()
+            self.assertEqual(report['merged'], 1)
+            kept = sum(len(details['matches']) for page in results for item in page[:-1] for details in item.values())
+            self.assertEqual(kept, report['matches'] - 1)
+            self.assertEqual(sorted(report['collisions'][0]['players']), sorted(['328560', get_player_id(match['link'])]))
+            self.assertEqual(report['collisions'][0]['kept_from'], deduplicator.players.key_for(
+                deduplicator.players.resolve(pages[0][-1]['player_name'], create=False)
+            ))
+
+        # The opponent's page came first and the match is dropped from Bouchard's page
+        self.assertEqual(results[0][0]['Singapore']['matches'], opponent_page[0]['Singapore']['matches'])
+        self.assertEqual(len(results[1][0]['Singapore']['matches']), len(tournament['matches']) - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
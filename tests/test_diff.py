@@ -0,0 +1,81 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+
+from wta_scrapper.diff import Snapshot, diff, read_changes, write_changes
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestDiff(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+        self.current = copy.deepcopy(self.data)
+
+    def get_changes(self):
+        return list(diff(self.data, self.current))
+
+    def test_no_changes(self):
+        self.assertEqual(self.get_changes(), [])
+
+    def test_new_tournament(self):
+        # The new tournament is added at the top of the
+        # page which shifts the ids of every tournament
+        tournament = copy.deepcopy(self.current[0])
+        details = list(tournament.values())[0]
+        details['date'] = '2014-11-09'
+        self.current.insert(0, tournament)
+        for i, item in enumerate(self.current[:-1]):
+            for values in item.values():
+                values['id'] = len(self.current) - 1 - i
+
+        changes = self.get_changes()
+        types = [change['type'] for change in changes]
+        self.assertEqual(types.count('tournament_added'), 1)
+        self.assertEqual(types.count('match_added'), len(details['matches']))
+        self.assertEqual(len(changes), 1 + len(details['matches']))
+        self.assertEqual(changes[0]['date'], '2014-11-09')
+
+    def test_corrected_score(self):
+        match = list(self.current[1].values())[0]['matches'][0]
+        before = match['details']['score']
+        match['details']['score'] = '6-46-4'
+
+        changes = self.get_changes()
+        self.assertEqual(len(changes), 1)
+        self.assertEqual(changes[0]['type'], 'score_corrected')
+        self.assertEqual(changes[0]['before']['score'], before)
+        self.assertEqual(changes[0]['after']['score'], '6-46-4')
+        self.assertEqual(changes[0]['opponent'], match['opp_name'])
+
+    def test_ranking_and_removed_match(self):
+        details = list(self.current[2].values())[0]
+        details['ranking']['rank'] = 3
+        removed = details['matches'].pop()
+
+        changes = self.get_changes()
+        self.assertEqual([change['type'] for change in changes], ['ranking_updated', 'match_removed'])
+        self.assertEqual(changes[0]['after']['rank'], 3)
+        self.assertEqual(changes[1]['opponent'], removed['opp_name'])
+
+    def test_first_snapshot(self):
+        changes = list(diff(None, self.data))
+        self.assertEqual(sum(change['type'] == 'tournament_added' for change in changes), 25)
+        self.assertEqual(len(Snapshot(self.data)), 25)
+
+    def test_feed(self):
+        list(self.current[1].values())[0]['matches'][0]['details']['score'] = '6-46-4'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'changes.jsonl')
+            self.assertEqual(write_changes(diff(self.data, self.current), path), 1)
+            self.assertEqual(write_changes(diff(self.data, self.current), path), 1)
+            changes = list(read_changes(path))
+        self.assertEqual(len(changes), 2)
+        self.assertEqual(changes[0]['type'], 'score_corrected')
+
+
+if __name__ == "__main__":
+    unittest.main()
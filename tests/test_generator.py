@@ -0,0 +1,35 @@
+import unittest
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.generator import PageGenerator
+from wta_scrapper.metrics import Metrics
+
+
+class TestPageGenerator(unittest.TestCase):
+    def setUp(self):
+        self.generator = PageGenerator(number_of_tournaments=40, edge_cases=0.3, missing_fields=0.2)
+        self.page = self.generator.render()
+
+    def test_same_seed(self):
+        self.assertEqual(PageGenerator(number_of_tournaments=40, edge_cases=0.3, missing_fields=0.2).render(), self.page)
+        self.assertNotEqual(PageGenerator(number_of_tournaments=40, seed=1).render(), self.page)
+
+    def test_parsed_values(self):
+        scrapper = MatchScrapper(metrics=Metrics(enabled=False))
+        scrapper.soup = BeautifulSoup(self.page, 'html.parser')
+        values = scrapper.build('player-matches__tournament')
+        self.assertEqual(len(values) - 1, 40)
+
+        for expected, tournament in zip(self.generator.tournaments, values[:-1]):
+            details = list(tournament.values())[0]
+            self.assertEqual(details['date'], str(expected['date']))
+            self.assertEqual(len(details['matches']), len(expected['matches']))
+            self.assertEqual(details['ranking']['entered_as'], expected['ranking']['entered_as'])
+            if expected['country'] is None or expected['surface'] is None:
+                self.assertTrue(details['missing_fields'])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import copy
+import json
+import os
+import unittest
+
+import numpy
+
+from wta_scrapper.graph import PlayerGraph
+from wta_scrapper.h2h import HeadToHead
+from wta_scrapper.tests.test_h2h import get_opponent_page
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+HALEP = '//www.wtatennis.com/players/314320/simona-halep'
+
+
+def load_test_data():
+    with open(TEST_DATA, 'r') as f:
+        return json.load(f)
+
+
+class TestPlayerGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = PlayerGraph()
+        self.added = self.graph.add(load_test_data())
+
+    def test_csr(self):
+        self.assertEqual(self.added, 68)
+        self.assertEqual(self.graph.number_of_matches, 68)
+        self.assertEqual(len(self.graph.indptr), len(self.graph.players) + 1)
+        self.assertEqual(self.graph.indptr[-1], 2 * 68)
+
+        # The matches of each player are sorted by date
+        code = self.graph.players['eugenie-bouchard']
+        dates = self.graph.dates[self.graph.indptr[code]:self.graph.indptr[code + 1]]
+        self.assertTrue((numpy.diff(dates) >= 0).all())
+
+    def test_neighbours(self):
+        h2h = HeadToHead()
+        h2h.add(load_test_data())
+        self.assertEqual(
+            sorted(self.graph.neighbours('Eugenie Bouchard')),
+            sorted(h2h.get_opponents('Eugenie Bouchard'))
+        )
+        self.assertEqual(self.graph.neighbours(HALEP), ['eugenie-bouchard'])
+        self.assertEqual(self.graph.neighbours(HALEP, result='W'), ['eugenie-bouchard'])
+        self.assertIn('314320', self.graph.neighbours('Eugenie Bouchard', surface='Grass'))
+
+        autumn = self.graph.neighbours('Eugenie Bouchard', since='2014-10-01')
+        self.assertEqual(len(autumn), 5)
+        self.assertIn('314320', self.graph.neighbours('Eugenie Bouchard', until='2014-07-05'))
+
+        # Opponents are also found by name once their link was seen
+        self.assertEqual(self.graph.neighbours('Serena Williams'), ['eugenie-bouchard'])
+        with self.assertRaises(KeyError):
+            self.graph.neighbours('Steffi Graf')
+
+    def test_degrees(self):
+        code = self.graph.players['eugenie-bouchard']
+        self.assertEqual(self.graph.degrees()[code], 68)
+        self.assertEqual(self.graph.degrees(result='W')[code] + self.graph.degrees(result='L')[code], 68)
+
+    def test_common_neighbours_and_update(self):
+        # The same page as if it belonged to another player
+        other = copy.deepcopy(load_test_data())
+        other[-1] = {'player_name': 'Other Player', 'year': 2014}
+        before = self.graph.number_of_matches
+        self.assertEqual(self.graph.add(other), 68)
+        self.assertEqual(self.graph.number_of_matches, before + 68)
+
+        common = self.graph.common_neighbours('Eugenie Bouchard', 'Other Player')
+        self.assertEqual(len(common), 56)
+        self.assertEqual(self.graph.common_neighbours(HALEP, 'Other Player'), [])
+
+    def test_pages_of_both_players(self):
+        # The semi final of Wimbledon is on both pages
+        self.assertEqual(self.graph.add(get_opponent_page()), 0)
+        self.assertEqual(self.graph.number_of_matches, 68)
+        self.assertEqual(self.graph.players.number_of_players, 57)
+        self.assertEqual(self.graph.neighbours('Simona Halep'), ['328560'])
+        self.assertEqual(self.graph.degrees()[self.graph._get_code('Eugenie Bouchard')], 68)
+
+        # The page of the opponent comes first
+        graph = PlayerGraph()
+        self.assertEqual(graph.add(get_opponent_page()), 1)
+        self.assertEqual(graph.number_of_matches, 1)
+        self.assertEqual(graph.add(load_test_data()), 67)
+        self.assertEqual(graph.number_of_matches, 68)
+        self.assertEqual(graph.players.number_of_players, 57)
+        self.assertIn('57 players', repr(graph))
+
+        self.assertEqual(graph.neighbours('Simona Halep'), ['328560'])
+        self.assertIn('314320', graph.neighbours('Eugenie Bouchard', surface='Grass'))
+        self.assertEqual(graph.degrees()[graph._get_code(HALEP)], 3)
+        self.assertEqual(graph.shortest_path('Simona Halep', '328560'), ['314320', '328560'])
+
+    def test_paths(self):
+        self.assertEqual(self.graph.shortest_path(HALEP, 'Eugenie Bouchard'), ['314320', 'eugenie-bouchard'])
+
+        # Halep beat Bouchard who beat the players she won against
+        wins = self.graph.reachable('Eugenie Bouchard', result='W')
+        transitive = self.graph.reachable(HALEP, result='W')
+        self.assertEqual(transitive['eugenie-bouchard'], 1)
+        self.assertTrue(all(transitive[key] == 2 for key in wins if key != '314320'))
+
+        beaten = next(key for key in wins if key != '314320')
+        path = self.graph.shortest_path(HALEP, beaten, result='W')
+        self.assertEqual(path[:2], ['314320', 'eugenie-bouchard'])
+        self.assertEqual(len(self.graph.reachable(HALEP, max_depth=1)), 1)
+        self.assertIsNone(self.graph.shortest_path('Eugenie Bouchard', HALEP, result='W', surface='Clay'))
+
+
+if __name__ == "__main__":
+    unittest.main()
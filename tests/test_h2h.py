@@ -0,0 +1,79 @@
+import copy
+import json
+import os
+import unittest
+
+from wta_scrapper.h2h import HeadToHead
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+BOUCHARD = '//www.wtatennis.com/players/328560/eugenie-bouchard'
+
+
+def load_test_data():
+    with open(TEST_DATA, 'r') as f:
+        return json.load(f)
+
+
+def get_opponent_page():
+    """
+    Return the page of Simona Halep, built without her link,
+    with the semi final of Wimbledon against Eugenie Bouchard
+    """
+    tournament = copy.deepcopy(load_test_data()[8]['Wimbledon'])
+    tournament['matches'] = [{
+        'opp_name': 'Eugenie Bouchard',
+        'link': BOUCHARD,
+        'nationality': 'CAN',
+        'details': {'round': 'Semi', 'opp_rank': '13', 'result': 'L', 'score': '6-72-6'},
+        'id': 1
+    }]
+    return [{'Wimbledon': tournament}, {'player_name': 'Simona Halep', 'year': 2014}]
+
+
+class TestHeadToHead(unittest.TestCase):
+    def setUp(self):
+        self.h2h = HeadToHead()
+        self.added = self.h2h.add(load_test_data())
+
+    def test_skips_byes_and_walkovers(self):
+        self.assertEqual(self.added, 68)
+
+    def test_record(self):
+        result = self.h2h.record('Eugenie Bouchard', '//www.wtatennis.com/players/314320/simona-halep')
+        self.assertEqual(result, {'wins': 1, 'losses': 2})
+        result = self.h2h.record('314320', 'Eugenie Bouchard')
+        self.assertEqual(result, {'wins': 2, 'losses': 1})
+
+    def test_record_by_surface(self):
+        result = self.h2h.record('Eugenie Bouchard', '314320', surface='Grass')
+        self.assertEqual(result, {'wins': 1, 'losses': 0})
+
+    def test_incremental_update(self):
+        self.assertEqual(self.h2h.add(load_test_data()), 0)
+
+    def test_pages_of_both_players(self):
+        self.assertEqual(self.h2h.add(get_opponent_page()), 0)
+        self.assertEqual(self.h2h.record('Simona Halep', BOUCHARD), {'wins': 2, 'losses': 1})
+        self.assertEqual(self.h2h.record('Eugenie Bouchard', '328560'), {'wins': 0, 'losses': 0})
+        self.assertEqual(len(self.h2h), 57 - 1)
+
+        # The page of the opponent comes first
+        h2h = HeadToHead()
+        self.assertEqual(h2h.add(get_opponent_page()), 1)
+        self.assertEqual(h2h.add(load_test_data()), 67)
+        self.assertEqual(h2h.record('Eugenie Bouchard', 'Simona Halep'), {'wins': 1, 'losses': 2})
+        self.assertEqual(h2h.record('328560', '314320', surface='Grass'), {'wins': 1, 'losses': 0})
+        self.assertEqual(h2h.players.number_of_players, 57)
+        self.assertIn('328560', h2h.get_opponents('314320'))
+
+    def test_matrix(self):
+        rows, columns, wins = self.h2h.to_coo()
+        self.assertEqual(int(wins.sum()), self.added)
+        matrix = self.h2h.to_dense()
+        self.assertEqual(matrix.shape, (len(self.h2h.players), len(self.h2h.players)))
+
+
+if __name__ == "__main__":
+    unittest.main()
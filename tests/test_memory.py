@@ -0,0 +1,76 @@
+import tracemalloc
+import unittest
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.memory import MemoryLimitExceeded, MemoryTracker
+from wta_scrapper.metrics import Metrics
+
+
+def build(**kwargs):
+    scrapper = MatchScrapper(filename='test_page.html', metrics=Metrics(enabled=False), **kwargs)
+    values = scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard')
+    return scrapper, values
+
+
+class TestLowMemory(unittest.TestCase):
+    def test_same_values(self):
+        _, expected = build()
+        scrapper, values = build(low_memory=True)
+        self.assertEqual(values, expected)
+        self.assertIsNone(scrapper.soup)
+
+        with self.assertRaises(ValueError):
+            scrapper.build('player-matches__tournament')
+
+    def test_string_pool_is_scoped(self):
+        first, _ = build()
+        second, _ = build()
+        self.assertIsNot(first.string_pool, second.string_pool)
+        self.assertIn('Clay', first.string_pool.categories('surface'))
+
+        pool = first.string_pool
+        third, _ = build(string_pool=pool)
+        self.assertIs(third.string_pool, pool)
+
+    def test_report(self):
+        scrapper, _ = build(low_memory=True)
+        report = scrapper.memory_report
+        self.assertGreater(report['peak'], 0)
+        self.assertLess(report['current'], report['peak'])
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_memory_limit(self):
+        metrics = Metrics()
+        scrapper = MatchScrapper(filename='test_page.html', metrics=metrics, memory_limit=1000)
+        with self.assertRaises(MemoryLimitExceeded):
+            scrapper.build('player-matches__tournament')
+        self.assertEqual(metrics.counters['memory_limit_exceeded'], 1)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_stopped_without_build(self):
+        with self.assertRaises(FileNotFoundError):
+            MatchScrapper(filename='missing_page.html', metrics=Metrics(enabled=False), memory_limit=10 ** 9)
+        self.assertFalse(tracemalloc.is_tracing())
+
+        scrapper = MatchScrapper(filename='test_page.html', metrics=Metrics(enabled=False), low_memory=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        scrapper.close()
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreater(scrapper.memory_report['current'], 0)
+
+        with MatchScrapper(filename='test_page.html', metrics=Metrics(enabled=False), low_memory=True):
+            pass
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_tracker(self):
+        tracker = MemoryTracker(limit=10 ** 6)
+        tracker.start()
+        values = [bytes(1000) for _ in range(100)]
+        tracker.check()
+        report = tracker.stop()
+        self.assertGreaterEqual(report['peak'], 100000)
+        del values
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import json
+import unittest
+
+from wta_scrapper.metrics import Histogram, Metrics
+
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.metrics = Metrics()
+
+    def test_histogram(self):
+        histogram = Histogram(buckets=(1, 2, 3))
+        for value in (0.5, 1.5, 2.5, 10):
+            histogram.observe(value)
+        self.assertEqual(histogram.counts, [1, 1, 1, 1])
+        self.assertEqual(histogram.quantile(0.5), 2)
+        self.assertEqual(histogram.quantile(1), 10)
+
+    def test_snapshot(self):
+        self.metrics.increment('tournaments', 4)
+        self.metrics.increment('missing_fields')
+        with self.metrics.time('matches'):
+            pass
+        snapshot = json.loads(self.metrics.to_json())
+        self.assertEqual(snapshot['counters']['tournaments'], 4)
+        self.assertEqual(snapshot['rates']['missing_fields_rate'], 0.25)
+        self.assertEqual(snapshot['stages']['matches']['count'], 1)
+
+    def test_prometheus(self):
+        self.metrics.increment('pages')
+        self.metrics.observe('build', 0.2)
+        text = self.metrics.to_prometheus()
+        self.assertIn('wta_scrapper_pages_total 1', text)
+        self.assertIn('wta_scrapper_stage_seconds_bucket{stage="build",le="+Inf"} 1', text)
+
+    def test_disabled(self):
+        metrics = Metrics(enabled=False)
+        metrics.increment('pages')
+        with metrics.time('build'):
+            pass
+        self.assertEqual(metrics.snapshot()['counters'], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import copy
+import json
+import os
+import unittest
+
+from wta_scrapper.models import Query
+from wta_scrapper.pool import StringPool
+from wta_scrapper.utils import split_results
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestQuery(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+
+    def test_interned_values(self):
+        pool = StringPool()
+        pool.intern_values(self.data)
+        surfaces = [details['surface'] for item in self.data[:-1] for details in item.values()]
+        self.assertIs(surfaces[0], surfaces[1])
+        self.assertIn('Clay', pool.categories('surface'))
+
+        pool.clear()
+        self.assertEqual(len(pool), 0)
+        self.assertEqual(pool.categories('surface'), [])
+
+    def test_categorical_columns(self):
+        matches = Query(copy.deepcopy(self.data)).get_matches()
+        self.assertEqual(matches['surface'].dtype.name, 'category')
+        self.assertEqual(len(matches), 76)
+
+        matches = Query(copy.deepcopy(self.data), categorical=False).get_matches()
+        self.assertNotEqual(matches['surface'].dtype.name, 'category')
+
+
+class TestQueryCache(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.query = Query(json.load(f), cache_size=8)
+
+    def test_get_matches_is_repeatable(self):
+        first = self.query.get_matches()
+        second = self.query.get_matches(columns=['score'])
+        self.assertEqual(len(first), len(second))
+        self.assertEqual(len(self.query.get_tournaments), 25)
+
+    def test_filter(self):
+        matches = self.query.filter(surface='Clay', result='W')
+        self.assertTrue((matches['surface'] == 'Clay').all())
+        self.assertTrue((matches['result'] == 'W').all())
+
+        matches = self.query.filter(surface=['Clay', 'Grass'], columns=['opp_name', 'surface'])
+        self.assertEqual(list(matches.columns), ['opp_name', 'surface'])
+        self.assertEqual(set(matches['surface']), {'Clay', 'Grass'})
+
+        self.assertEqual(len(self.query.filter(player='Eugenie Bouchard')), 76)
+        self.assertEqual(len(self.query.filter(player='Simona Halep')), 0)
+        self.assertEqual(len(self.query.filter(year='2014')), 76)
+
+    def test_unknown_filter(self):
+        with self.assertRaises(ValueError):
+            self.query.filter(opponent='Simona Halep')
+
+    def test_aggregate(self):
+        result = self.query.aggregate('surface')
+        played = self.query.filter(result=['W', 'L'])
+        self.assertEqual(result['matches'].sum(), len(played))
+        self.assertTrue((result['win_rate'] <= 1).all())
+
+    def test_cache(self):
+        self.query.filter(surface='Clay', year=2014)
+        hits = self.query.cache.hits
+        self.query.filter(year='2014', surface=['Clay'])
+        self.assertEqual(self.query.cache.hits, hits + 1)
+
+        # Results are copies so modifying
+        # them does not alter the cache
+        matches = self.query.filter(surface='Clay')
+        matches['surface'] = None
+        self.assertTrue((self.query.filter(surface='Clay')['surface'] == 'Clay').all())
+
+        for year in range(2000, 2020):
+            self.query.filter(year=year)
+        self.assertLessEqual(len(self.query.cache), 8)
+
+    def test_version(self):
+        self.assertEqual(len(self.query.filter(surface='Clay')), 21)
+        tournaments, metadata = split_results(self.query)
+        self.query.tournaments = [tournaments[0], metadata]
+        self.assertEqual(len(self.query.filter(surface='Clay')), 0)
+        self.assertEqual(len(self.query.filter(surface='Hard')), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
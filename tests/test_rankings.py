@@ -0,0 +1,105 @@
+import json
+import os
+import unittest
+
+import numpy
+
+from wta_scrapper.rankings import RankingTimeline, TIMELINE_DTYPE
+from wta_scrapper.tests.test_h2h import BOUCHARD, get_opponent_page
+from wta_scrapper.utils import get_date_ordinal
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestRankingTimeline(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+        self.timeline = RankingTimeline()
+        self.timeline.add(self.data)
+
+    def test_sorted_timeline(self):
+        timeline = self.timeline.get('Eugenie Bouchard')
+        self.assertEqual(len(timeline), 25)
+        self.assertTrue((numpy.diff(timeline['date']) > 0).all())
+        self.assertEqual(timeline['rank'][0], 31)
+        self.assertEqual(timeline['rank'][-1], 5)
+
+    def test_rank_as_of(self):
+        self.assertEqual(self.timeline.rank_as_of('Eugenie Bouchard', '2014-07-05'), 13)
+        self.assertEqual(self.timeline.rank_as_of('Eugenie Bouchard', '2014-07-20'), 13)
+        self.assertEqual(self.timeline.rank_as_of('Eugenie Bouchard', '2015-01-01'), 5)
+        self.assertIsNone(self.timeline.rank_as_of('Eugenie Bouchard', '2013-12-31'))
+
+        ranks = self.timeline.ranks_as_of('eugenie-bouchard', ['2014-01-10', '2014-08-10'])
+        self.assertEqual(ranks.tolist(), [31, 8])
+
+    def test_resample(self):
+        series = self.timeline.resample('Eugenie Bouchard', start='2014-01-01', end='2014-12-31')
+        self.assertEqual(len(series), 53)
+        self.assertTrue(numpy.isnan(series.iloc[0]))
+        self.assertEqual(series.iloc[-1], 5)
+        self.assertTrue(all(day.weekday() == 0 for day in series.index))
+        self.assertEqual(str(series.index[-1].date()), '2014-12-29')
+
+        # A period that ends on a monday ends with that week
+        series = self.timeline.resample('Eugenie Bouchard', start='2014-01-01', end='2014-12-22')
+        self.assertEqual(str(series.index[-1].date()), '2014-12-22')
+
+    def test_unparsed_date(self):
+        data = json.loads(json.dumps(self.data))
+        list(data[0].values())[0]['date'] = 'Oct 2014'
+        timeline = RankingTimeline()
+        timeline.add(data)
+        self.assertEqual(len(timeline.get('Eugenie Bouchard')), 24)
+
+    def test_merge(self):
+        rows = numpy.array([
+            (get_date_ordinal('2014-01-06'), 1, 1, 0),
+            (get_date_ordinal('2014-10-26'), 2, 2, 0)
+        ], dtype=TIMELINE_DTYPE)
+        # Serena Williams is known by the link on the page of Bouchard
+        self.timeline.add_rows('serena-williams', rows)
+        frame = self.timeline.merge()
+        self.assertEqual(list(frame.columns), ['eugenie-bouchard', '230234'])
+        self.assertEqual(frame['230234'].iloc[-1], 2)
+
+    def test_duplicate_dates(self):
+        self.timeline.add(self.data)
+        self.assertEqual(len(self.timeline.get('Eugenie Bouchard')), 25)
+
+        rows = numpy.array([(get_date_ordinal('2014-10-26'), 4, 4, 0)], dtype=TIMELINE_DTYPE)
+        self.timeline.add_rows('eugenie-bouchard', rows)
+        self.assertEqual(self.timeline.rank_as_of('Eugenie Bouchard', '2014-10-26'), 4)
+
+    def test_empty_timeline(self):
+        # A page without dated tournaments
+        data = json.loads(json.dumps(self.data))
+        for tournament in data[:-1]:
+            for details in tournament.values():
+                details['date'] = None
+        data[-1] = {'player_name': 'Simona Halep'}
+
+        timeline = RankingTimeline()
+        self.assertEqual(timeline.add(data), 0)
+        self.assertIsNone(timeline.rank_as_of('Simona Halep', '2014-07-05'))
+        self.assertEqual(len(timeline.resample('Simona Halep')), 0)
+        self.assertEqual(len(timeline.resample('Simona Halep', start='2014-01-01', end='2014-01-31')), 5)
+
+        self.timeline.add(data)
+        frame = self.timeline.merge()
+        self.assertEqual(list(frame.columns), ['eugenie-bouchard', '314320'])
+        self.assertTrue(frame['314320'].isna().all())
+
+    def test_pages_of_both_players(self):
+        # The page of Halep gives the link of Bouchard
+        # whose timeline moves to the key of her link
+        self.timeline.add(get_opponent_page())
+        self.assertEqual(len(self.timeline.get(BOUCHARD)), 25)
+        self.assertIs(self.timeline.get('Eugenie Bouchard'), self.timeline.get('328560'))
+        self.assertIn('328560', self.timeline.merge().columns)
+        self.assertNotIn('eugenie-bouchard', self.timeline.merge().columns)
+
+
+if __name__ == "__main__":
+    unittest.main()
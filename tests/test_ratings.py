@@ -0,0 +1,90 @@
+import json
+import os
+import unittest
+
+import numpy
+
+from wta_scrapper.ratings import EloRatings, generate_matches
+from wta_scrapper.tests.test_h2h import BOUCHARD, get_opponent_page
+from wta_scrapper.utils import get_date_ordinal
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestEloRatings(unittest.TestCase):
+    def test_same_as_sequential_loop(self):
+        dates, rounds, winners, losers, surfaces = generate_matches(2000, 50, seed=1)
+        ratings = EloRatings()
+        for i in range(50):
+            ratings.players.add(str(i))
+        ratings.update(dates, rounds, winners, losers, surfaces)
+
+        expected = numpy.full(50, 1500.0)
+        for i in numpy.lexsort((rounds, dates)):
+            winner, loser = winners[i], losers[i]
+            delta = 32 * (1 - 1 / (1 + 10 ** ((expected[loser] - expected[winner]) / 400)))
+            expected[winner] += delta
+            expected[loser] -= delta
+        numpy.testing.assert_allclose(ratings.ratings[:50], expected)
+
+    def test_incremental(self):
+        with open(TEST_DATA, 'r') as f:
+            data = json.load(f)
+
+        ratings = EloRatings()
+        self.assertEqual(ratings.add(data), 68)
+        rating = ratings.rating('Eugenie Bouchard')
+        self.assertEqual(ratings.add(data), 0)
+        self.assertEqual(ratings.rating('Eugenie Bouchard'), rating)
+        self.assertNotEqual(ratings.rating('Eugenie Bouchard', surface='Clay'), 1500)
+
+    def test_unknown_surface(self):
+        ratings = EloRatings()
+        with open(TEST_DATA, 'r') as f:
+            ratings.add(json.load(f))
+        self.assertEqual(len(ratings.top(3, surface='Clay')), 3)
+        with self.assertRaises(ValueError):
+            ratings.top(surface='Sand')
+
+    def test_unparsed_date(self):
+        with open(TEST_DATA, 'r') as f:
+            data = json.load(f)
+        # The date is left as it was on the page when it cannot be parsed
+        data[0]['Singapore']['date'] = 'Oct 20 - 26, 2014'
+        self.assertEqual(get_date_ordinal('Oct 20 - 26, 2014'), 0)
+        self.assertEqual(EloRatings().add(data), 68)
+
+    def test_pages_of_both_players(self):
+        with open(TEST_DATA, 'r') as f:
+            data = json.load(f)
+
+        # The semi final of Wimbledon is on both pages
+        ratings = EloRatings()
+        self.assertEqual(ratings.add(data), 68)
+        self.assertEqual(ratings.add(get_opponent_page()), 0)
+        self.assertEqual(ratings.number_of_matches, 68)
+        self.assertEqual(ratings.players.number_of_players, 57)
+
+        # The page of the opponent comes first
+        ratings = EloRatings()
+        self.assertEqual(ratings.add(get_opponent_page()), 1)
+        self.assertEqual(ratings.add(data), 67)
+        self.assertEqual(ratings.number_of_matches, 68)
+        self.assertEqual(ratings.players.number_of_players, 57)
+        self.assertEqual(ratings.rating('Eugenie Bouchard'), ratings.rating(BOUCHARD))
+
+        # The win of Halep on her page stays in her rating once
+        # her name is merged in the code of her link
+        code = ratings.players.resolve('Simona Halep', create=False)
+        self.assertEqual(ratings.players.key_for(code), '314320')
+        self.assertEqual(ratings.matches_played[code], 3)
+        self.assertEqual(int(ratings.matches_played.sum()), 2 * 68)
+        self.assertAlmostEqual(float(ratings.ratings[:len(ratings.players)].sum()), 1500 * len(ratings.players))
+
+        keys = [key for key, _ in ratings.top(100)]
+        self.assertEqual(len(keys), 57)
+        self.assertEqual(len(set(keys)), 57)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,10 @@
+import json
+import os
+import shutil
+import tempfile
 import unittest
 from wta_scrapper.app import Score
+from wta_scrapper.score import expand_scores_file, split_sets
 
 class TwoSetsLost(unittest.TestCase):
     def setUp(self):
@@ -95,6 +100,39 @@ class RetiredScore(unittest.TestCase):
         self.assertEqual(self.score.games_won, 7)
 
 
+class TieBreakScore(unittest.TestCase):
+    def test_split_sets(self):
+        self.assertEqual(split_sets('7-656-2'), ['7-6', '6-2'])
+        self.assertEqual(split_sets('6-262-76-4'), ['6-2', '6-7', '6-4'])
+        self.assertEqual(split_sets('Walkover'), [])
+
+    def test_checks(self):
+        score = Score('7-656-2')
+        self.assertEqual(score.score_as_string, '7-6 6-2')
+        self.assertEqual(score.number_of_tie_breaks, 1)
+
+
+class ExpandScoresFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.filename = os.path.join(self.directory, 'result.json')
+        shutil.copy(os.path.join(os.path.dirname(__file__), 'test_data.json'), self.filename)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_file_is_updated(self):
+        _, matches = expand_scores_file(self.filename)
+        self.assertEqual(matches, 76)
+        self.assertEqual(os.listdir(self.directory), ['result.json'])
+
+        with open(self.filename, 'r') as f:
+            data = json.load(f)
+        details = data[0]['Singapore']['matches'][0]['details']
+        self.assertEqual(details['total_games'], 17)
+        self.assertEqual(details['sets_literal'], 'two')
+        self.assertIn('player_name', data[-1])
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,61 @@
+import json
+import os
+import threading
+import unittest
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+from wta_scrapper.server import Corpus, create_server
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestQueryServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = create_server(Corpus.from_files(TEST_DATA), port=0)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def get(self, path):
+        with urlopen(f'{self.url}{path}') as response:
+            return json.loads(response.read())
+
+    def test_matches(self):
+        matches = self.get('/matches?surface=Grass&columns=opp_name,result')
+        self.assertEqual(len(matches), 8)
+        self.assertEqual(set(matches[0].keys()), {'opp_name', 'result'})
+
+    def test_tournaments(self):
+        tournaments = self.get('/tournaments?year=2014&surface=Clay')
+        self.assertEqual(len(tournaments), 6)
+
+    def test_aggregates(self):
+        rows = self.get('/aggregates?group_by=surface')
+        grass = [row for row in rows if row['surface'] == 'Grass'][0]
+        self.assertEqual(grass['wins'], 6)
+
+    def test_cache(self):
+        self.get('/matches?round=Final')
+        hits = self.server.cache.hits
+        self.get('/matches?round=Final')
+        self.assertEqual(self.server.cache.hits, hits + 1)
+
+    def test_errors(self):
+        with self.assertRaises(HTTPError) as context:
+            self.get('/unknown')
+        self.assertEqual(context.exception.code, 404)
+
+        with self.assertRaises(HTTPError) as context:
+            self.get('/matches?columns=unknown')
+        self.assertEqual(context.exception.code, 400)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas
+
+from wta_scrapper.models import Query
+from wta_scrapper.shared import SharedCorpus, SharedQuery, encode_column
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+def count_wins(name, surface):
+    query = SharedQuery.attach(name)
+    try:
+        return len(query.filter(surface=surface, result='W'))
+    finally:
+        query.close()
+
+
+class TestSharedCorpus(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.query = Query(json.load(f))
+        self.corpus = SharedCorpus(self.query)
+
+    def tearDown(self):
+        self.corpus.close()
+
+    def test_attach(self):
+        query = SharedQuery.attach(self.corpus.name)
+        expected = self.query.get_matches()
+        matches = query.get_matches()
+        self.assertEqual(len(matches), len(expected))
+        self.assertEqual(matches['opp_name'].tolist(), expected['opp_name'].tolist())
+        self.assertEqual(matches['rank'].tolist(), expected['rank'].tolist())
+        self.assertEqual(len(query.get_tournaments), 25)
+
+        # Lists cannot be stored in the buffers
+        self.assertNotIn('missing_fields', matches.columns)
+
+        self.assertEqual(
+            query.aggregate('surface').to_dict('records'),
+            self.query.aggregate('surface').to_dict('records')
+        )
+        self.assertEqual(len(query.filter(player='Eugenie Bouchard')), 76)
+        query.close()
+
+    def test_mixed_column(self):
+        values, description = encode_column(pandas.Series([['Hard'], None, ['Clay']], name='items'))
+        self.assertIsNone(values)
+        self.assertIsNone(description)
+
+        with self.assertRaises(ValueError):
+            encode_column(pandas.Series(['Hard', ['Clay']], name='surface'))
+
+    def test_attach_in_other_process(self):
+        # The block remains once a process that was not
+        # started by multiprocessing attached and exited
+        code = (
+            'from wta_scrapper.shared import SharedQuery;'
+            f"SharedQuery.attach('{self.corpus.name}').close()"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        subprocess.run([sys.executable, '-c', code], check=True, env={**os.environ, 'PYTHONPATH': root})
+
+        query = SharedQuery.attach(self.corpus.name)
+        self.assertEqual(len(query.get_tournaments), 25)
+        query.close()
+
+    def test_read_only(self):
+        query = SharedQuery.attach(self.corpus.name)
+        values = query.frames['matches']['rank'].to_numpy()
+        self.assertFalse(values.flags.writeable)
+        with self.assertRaises(ValueError):
+            values[0] = 1
+        del values
+        query.close()
+
+    def test_workers(self):
+        surfaces = ['Hard', 'Clay', 'Grass']
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            results = list(executor.map(count_wins, [self.corpus.name] * 3, surfaces))
+
+        expected = [len(self.query.filter(surface=item, result='W')) for item in surfaces]
+        self.assertEqual(results, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import copy
+import os
+import unittest
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.generator import PageGenerator
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.spec import DEFAULT_SPEC, ParsePlan
+from wta_scrapper.utils import BASE_DIR
+
+TEST_PAGE = os.path.join(BASE_DIR, 'html', 'test_page.html')
+
+
+def build(page, plan=None):
+    scrapper = MatchScrapper(metrics=Metrics(enabled=False), plan=plan)
+    scrapper.soup = BeautifulSoup(page, 'html.parser')
+    return scrapper.build('player-matches__tournament', player_name='Eugenie Bouchard')
+
+
+class TestParsePlan(unittest.TestCase):
+    def setUp(self):
+        self.plan = ParsePlan()
+
+    def test_same_values_as_filtering(self):
+        with open(TEST_PAGE, 'r') as f:
+            page = f.read()
+        self.assertEqual(build(page, plan=self.plan), build(page))
+
+        page = PageGenerator(number_of_tournaments=40, edge_cases=0.3, seed=4).render()
+        self.assertEqual(build(page, plan=self.plan), build(page))
+
+    def test_same_metrics_as_filtering(self):
+        page = PageGenerator(number_of_tournaments=10, seed=2).render()
+        stages = []
+        for plan in (None, self.plan):
+            metrics = Metrics()
+            scrapper = MatchScrapper(metrics=metrics, plan=plan)
+            scrapper.soup = BeautifulSoup(page, 'html.parser')
+            scrapper.build('player-matches__tournament')
+            stages.append({name: item.count for name, item in metrics.histograms.items()})
+
+        self.assertEqual(stages[0], stages[1])
+        self.assertEqual(stages[1]['header'], 10)
+        self.assertEqual(stages[1]['matches'], 10)
+
+    def test_first_class(self):
+        # Like the filtering of the scrapper, only
+        # the first class of the header is checked
+        page = PageGenerator(number_of_tournaments=3, seed=3).render()
+        page = page.replace(
+            'class="player-matches__tournament-header',
+            'class="player-matches__tournament-top player-matches__tournament-header'
+        )
+        self.assertEqual(build(page, plan=self.plan), build(page))
+        self.assertEqual(len(build(page, plan=self.plan)), 1)
+
+    def test_edited_spec(self):
+        page = PageGenerator(number_of_tournaments=5, seed=1).render()
+        expected = build(page)
+
+        # The layout changes and only the spec is updated
+        page = page.replace('player-matches__tournament-footer', 'player-matches__tournament-summary')
+        spec = copy.deepcopy(DEFAULT_SPEC)
+        spec['footer'] = {'tag': 'div', 'class_contains': 'summary'}
+        self.assertEqual(build(page, plan=ParsePlan(spec)), expected)
+
+    def test_invalid_spec(self):
+        spec = copy.deepcopy(DEFAULT_SPEC)
+        spec['cells'][0]['take'] = 'html'
+        with self.assertRaises(ValueError):
+            ParsePlan(spec)
+
+        spec = copy.deepcopy(DEFAULT_SPEC)
+        del spec['footer']
+        with self.assertRaises(ValueError):
+            ParsePlan(spec)
+
+        with self.assertRaises(ValueError):
+            ParsePlan({**DEFAULT_SPEC, 'header': {'tag': 'div', 'id': 'header'}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import json
+import os
+import unittest
+
+from wta_scrapper.app import MatchScrapper
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.stats import CareerStats
+from wta_scrapper.tests.test_h2h import BOUCHARD, get_opponent_page
+
+TEST_DATA = os.path.join(os.path.dirname(__file__), 'test_data.json')
+
+
+class TestCareerStats(unittest.TestCase):
+    def setUp(self):
+        with open(TEST_DATA, 'r') as f:
+            self.data = json.load(f)
+        self.stats = CareerStats()
+        self.added = self.stats.add(self.data)
+
+    def test_overall(self):
+        overall = self.stats.get('Eugenie Bouchard')['all']
+        self.assertEqual(overall['wins'] + overall['losses'], self.added)
+
+    def test_views(self):
+        surfaces = self.stats.get('Eugenie Bouchard', view='surface')
+        self.assertIn('Grass', surfaces)
+        self.assertEqual(surfaces['Grass']['wins'], 6)
+        years = self.stats.get('Eugenie Bouchard', view='year')
+        self.assertEqual(list(years.keys()), [2014])
+
+    def test_tie_breaks(self):
+        tie_breaks = self.stats.get('Eugenie Bouchard', view='tie_breaks')['all']
+        self.assertGreater(tie_breaks['wins'] + tie_breaks['losses'], 0)
+
+    def test_incremental(self):
+        self.assertEqual(self.stats.add(self.data), 0)
+        self.data[0]['Singapore']['date'] = '2015-10-26'
+        self.assertEqual(self.stats.add(self.data), 3)
+
+    def test_pages_of_both_players(self):
+        # The page of the opponent gives the link of Bouchard
+        # and her page built with the link updates the same views
+        self.stats.add(get_opponent_page())
+        data = [*self.data[:-1], {'player_link': BOUCHARD}]
+        self.data[0]['Singapore']['date'] = '2015-10-26'
+        self.assertEqual(self.stats.add(data), 3)
+
+        overall = self.stats.get(BOUCHARD)['all']
+        self.assertEqual(overall, self.stats.get('Eugenie Bouchard')['all'])
+        self.assertEqual(overall['wins'] + overall['losses'], self.added + 3)
+        self.assertEqual(len(self.stats.views), 2)
+
+    def test_merged_codes(self):
+        # Both codes have the same tournaments which are counted once
+        stats = CareerStats()
+        stats.add(self.data)
+        stats.add([*self.data[:-1], {'player_link': BOUCHARD}])
+        stats.add(get_opponent_page())
+        self.assertEqual(stats.players.number_of_players, 57)
+        overall = stats.get('328560')['all']
+        self.assertEqual(overall['wins'] + overall['losses'], self.added)
+
+    def test_build_without_player(self):
+        stats = CareerStats()
+        scrapper = MatchScrapper(filename='test_page.html', stats=stats, metrics=Metrics(enabled=False))
+        with self.assertLogs(scrapper.logger, level='WARNING'):
+            values = scrapper.build('player-matches__tournament')
+        self.assertGreater(len(values), 1)
+        self.assertEqual(len(stats.views), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import json
+import os
+import tempfile
+import unittest
+
+from bs4 import BeautifulSoup
+
+from wta_scrapper.app import MatchScrapper, _get_span_tournament
+from wta_scrapper.generator import PageGenerator
+from wta_scrapper.metrics import Metrics
+from wta_scrapper.tracing import Tracer
+
+
+def read_trace(path):
+    with open(path, 'r') as f:
+        return json.loads(f.read().rstrip().rstrip(',') + ']')
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'trace.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_spans(self):
+        tracer = Tracer(self.path)
+        scrapper = MatchScrapper(metrics=Metrics(enabled=False), tracer=tracer)
+        scrapper.soup = BeautifulSoup(PageGenerator(number_of_tournaments=3).render(), 'html.parser')
+        scrapper.build('player-matches__tournament')
+        tracer.close()
+
+        events = read_trace(self.path)
+        names = [event['name'] for event in events]
+        self.assertEqual(names.count('header'), 3)
+        self.assertEqual(names[-1], 'build')
+        self.assertEqual(events[-1]['args']['tournaments'], 3)
+
+        matches = [event for event in events if event['name'] == 'matches']
+        self.assertIn('tournament', matches[0]['args'])
+        self.assertIn('matches', matches[0]['args'])
+
+    def test_footer_without_tournament(self):
+        self.assertEqual(_get_span_tournament({'rank': 4, 'entered_as': None, 'seed_title': None}), {})
+        self.assertEqual(_get_span_tournament(False), {})
+        self.assertEqual(_get_span_tournament({'matches': [], 'Wimbledon': {'name': 'Wimbledon'}}), {'tournament': 'Wimbledon'})
+
+    def test_sampling(self):
+        tracer = Tracer(self.path, sample_rate=0)
+        scrapper = MatchScrapper(metrics=Metrics(enabled=False), tracer=tracer)
+        self.assertIsNone(scrapper.trace)
+
+
+if __name__ == "__main__":
+    unittest.main()
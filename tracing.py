@@ -0,0 +1,160 @@
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+
+class Trace:
+    """
+    The spans of a single sampled page
+    """
+    def __init__(self, tracer, name, **attributes):
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name})'
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """
+        Record the duration of the block as a complete event. The
+        attributes can be updated within the block
+        """
+        attributes = {**self.attributes, **attributes}
+        start = self.tracer.now()
+        try:
+            yield attributes
+        finally:
+            self.tracer.add_event(name, start, self.tracer.now() - start, attributes)
+
+
+class Tracer:
+    """
+    Records spans around the stages of the scrapper and writes them
+    in the Chrome trace event format which can be opened in
+    about://tracing or in Perfetto
+
+    Only a fraction of the pages are traced so that the cost of
+    tracing stays negligible when the scrapper runs in production
+
+    Parameters
+
+        path (str, optional): the trace file. Defaults to trace.json in the current folder
+        sample_rate (float, optional): fraction of the pages to trace. Defaults to 1
+        buffer_size (int, optional): number of events kept in memory before
+        they are written to the file. Defaults to 1000
+        seed (int, optional): seed used for sampling the pages
+    """
+    def __init__(self, path='trace.json', sample_rate=1.0, buffer_size=1000, seed=None):
+        self.path = path
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.random = random.Random(seed)
+        self.events = []
+        self.number_of_events = 0
+        self.started_at = time.perf_counter_ns()
+        self._lock = threading.Lock()
+        self._has_header = False
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.path}, sample_rate={self.sample_rate})'
+
+    def now(self):
+        """
+        Microseconds since the creation of the tracer
+        """
+        return (time.perf_counter_ns() - self.started_at) // 1000
+
+    def start_trace(self, name, **attributes):
+        """
+        Return a new trace or None if the page is not sampled
+        """
+        if self.sample_rate <= 0 or self.random.random() >= self.sample_rate:
+            return None
+        return Trace(self, name, **attributes)
+
+    def add_event(self, name, start, duration, attributes):
+        event = {
+            'name': name,
+            'cat': 'wta_scrapper',
+            'ph': 'X',
+            'ts': start,
+            'dur': duration,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': attributes
+        }
+        with self._lock:
+            self.events.append(event)
+            self.number_of_events += 1
+            should_flush = len(self.events) >= self.buffer_size
+
+        if should_flush:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the buffered events to the trace file. The file uses
+        the JSON array format in which the closing bracket is optional
+        which means that it can be opened at any time
+        """
+        with self._lock:
+            events, self.events = self.events, []
+            if not events:
+                return self.path
+
+            mode = 'a' if self._has_header else 'w'
+            with open(self.path, mode) as f:
+                if not self._has_header:
+                    f.write('[\n')
+                    self._has_header = True
+
+                for event in events:
+                    f.write(json.dumps(event, default=str))
+                    f.write(',\n')
+        return self.path
+
+    def close(self):
+        self.flush()
+
+
+def get_span(instance, name, **attributes):
+    """
+    Return a span of the trace of the instance or a context
+    that does nothing when the page is not traced
+    """
+    trace = getattr(instance, 'trace', None)
+    if trace is None:
+        return nullcontext({})
+    return trace.span(name, **attributes)
+
+
+def traced(name, attributes=None):
+    """
+    Record a span around a method of an instance that has
+    a `trace` attribute
+
+    Parameters
+
+        name (str): name of the span
+        attributes (callable, optional): called with the instance and the value
+        returned by the method and returns attributes to add to the span
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            if getattr(self, 'trace', None) is None:
+                return func(self, *args, **kwargs)
+
+            with self.trace.span(name) as span_attributes:
+                result = func(self, *args, **kwargs)
+                if attributes is not None:
+                    span_attributes.update(attributes(self, result))
+                return result
+        return wrapper
+    return decorator
@@ -1,6 +1,9 @@
+import datetime
 import json
 import os
+import re
 import secrets
+import tempfile
 from functools import lru_cache
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -49,3 +52,218 @@ def write_new_file(values, update_for, filename=secrets.token_hex(5)):
     with open(file_path, 'w') as f:
         json.dump(values, f, indent=4)
     return True
+
+
+def write_json_atomically(path, values, **kwargs):
+    """
+    Write values to a JSON file by writing them to a temporary
+    file in the same folder first and then renaming it so that
+    readers never see a partially written file
+
+    Parameters
+
+        path (str): the file to write
+        values (list, dict): the values to serialize
+        kwargs: passed to json.dump. Defaults to indent=4
+    """
+    kwargs.setdefault('indent', 4)
+    directory = os.path.dirname(os.path.abspath(path))
+    descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(descriptor, 'w') as f:
+            json.dump(values, f, **kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary_path, path)
+    except:
+        os.remove(temporary_path)
+        raise
+    return path
+
+
+def get_date_ordinal(d):
+    """
+    Return the ordinal of a date or 0 when the date is missing or
+    is a string that `_finalize` could not parse e.g. 'Jan 2014'
+    """
+    if d is None:
+        return 0
+    if isinstance(d, str):
+        try:
+            d = datetime.date.fromisoformat(d)
+        except ValueError:
+            return 0
+    return d.toordinal()
+
+
+PLAYER_LINK_REGEX = re.compile(r'/players/(?P<player_id>\d+)(?:/(?P<slug>[\w\-]+))?')
+
+
+def get_player_id(link):
+    """
+    Extract the stable WTA player id from an opponent link
+    e.g. //www.wtatennis.com/players/314320/simona-halep -> 314320
+
+    Returns None when the link is missing or does not match
+    """
+    if not link:
+        return None
+    result = PLAYER_LINK_REGEX.search(link)
+    if result:
+        return result.group('player_id')
+    return None
+
+
+def get_player_key(link=None, name=None):
+    """
+    Returns a key that identifies a player across result files.
+    The numeric id from the link is preferred and the slugified
+    name is used as a fallback for players without a link
+    """
+    if link is not None and str(link).isnumeric():
+        return str(link)
+
+    player_id = get_player_id(link)
+    if player_id is not None:
+        return player_id
+
+    if name:
+        return '-'.join(name.lower().split())
+    return None
+
+
+def split_results(values):
+    """
+    Split the values returned by `MatchScrapper.build` or loaded
+    from a result file into the list of tournaments and the
+    trailing dictionnary of metadata
+
+    Parameters
+
+        values (list, Query, MatchScrapper): the result values
+
+    Returns
+
+        tuple: (tournaments, metadata)
+    """
+    if hasattr(values, 'tournaments'):
+        values = values.tournaments
+
+    tournaments = []
+    metadata = {}
+    for item in values:
+        is_tournament = all(
+            isinstance(value, dict) and 'matches' in value
+            for value in item.values()
+        )
+        if item and is_tournament:
+            tournaments.append(item)
+        else:
+            metadata = item
+    return tournaments, metadata
+
+
+def iter_matches(values):
+    """
+    Iterate over each match of a result and return the
+    tournament in which it was played alongside the match
+
+    Yields
+
+        tuple: (tournament, match)
+    """
+    tournaments, _ = split_results(values)
+    for tournament in tournaments:
+        for details in tournament.values():
+            for match in details['matches']:
+                yield details, match
+
+
+def get_owner_key(metadata):
+    """
+    Returns the key of the player to whom a result file belongs
+    using the values that were passed to `MatchScrapper.build`
+    e.g. player_link='/players/328560/eugenie-bouchard' or player_name
+    """
+    return get_player_key(
+        link=metadata.get('player_link', metadata.get('player_id')),
+        name=metadata.get('player_name')
+    )
+
+
+def is_owner(metadata, player):
+    """
+    Whether a result file belongs to the player or to one of the
+    players of a tuple. The player can be given by link, id or name
+    """
+    keys = {
+        get_owner_key(metadata),
+        get_player_key(name=metadata.get('player_name'))
+    }
+    values = player if isinstance(player, tuple) else (player,)
+    return any(get_player_key(link=item, name=item) in keys for item in values)
+
+
+class DateRange:
+    """
+    The dates of the tournaments to keep when building a page. As
+    the tournaments of a page go from the most recent to the oldest,
+    the range is passed as soon as a tournament ends before `since`
+
+    Parameters
+
+        since (str, date, optional): first date to keep e.g. 2021-01-01
+        until (str, date, optional): last date to keep
+        year (int, optional): only keep the tournaments of that year
+    """
+    def __init__(self, since=None, until=None, year=None):
+        self.since = self._as_date(since)
+        self.until = self._as_date(until)
+        if year is not None:
+            start = datetime.date(int(year), 1, 1)
+            end = datetime.date(int(year), 12, 31)
+            self.since = max(self.since, start) if self.since else start
+            self.until = min(self.until, end) if self.until else end
+        self.passed = False
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.since}, {self.until})'
+
+    @staticmethod
+    def _as_date(value):
+        if value is None or isinstance(value, datetime.date):
+            return value
+        return datetime.date.fromisoformat(str(value))
+
+    def accepts(self, date):
+        """
+        Return whether a tournament ending at the date should be
+        kept. Tournaments without a date are always kept
+        """
+        if date is None:
+            return True
+
+        if isinstance(date, datetime.datetime):
+            date = date.date()
+
+        if self.since is not None and date < self.since:
+            self.passed = True
+            return False
+
+        if self.until is not None and date > self.until:
+            return False
+        return True
+
+
+def get_match_fingerprint(date, round, player, opponent):
+    """
+    Return the fingerprint of a match which is the same on the
+    pages of both players. The players can be given as keys or
+    as codes as long as both pages use the same kind
+
+    Returns
+
+        tuple: (date, round, low player, high player)
+    """
+    low, high = (player, opponent) if player <= opponent else (opponent, player)
+    return (str(date), round, low, high)